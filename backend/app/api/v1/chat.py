@@ -1,15 +1,30 @@
 """
 Chat endpoint for natural language event search.
 Interprets user queries via LLM and returns ranked event recommendations.
+Served by the async handler unless ASYNC_ENDPOINTS is turned off.
+POST /chat/stream streams provisional results first, then LLM-refined ones.
 """
 
+import json
+import time
+
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.services.llm_interpreter import interpret_with_llm
+from app.core.config import ASYNC_ENDPOINTS
+from app.core.database import SessionLocal, get_db
+from app.services.llm_interpreter import (
+    ask_llm_async,
+    interpret_with_llm,
+    interpret_with_llm_async,
+    interpret_without_llm,
+    manual_fallback_parse,
+)
 from app.services.recommender import EventRecommender
 
 router = APIRouter()
@@ -60,7 +75,6 @@ def generate_weights(priority: str | None) -> dict:
     return weights
 
 
-@router.post("/")
 def chat_query(data: ChatRequest, db: Session = Depends(get_db)):
     """
     Main chat endpoint. Accepts a natural language message,
@@ -77,6 +91,82 @@ def chat_query(data: ChatRequest, db: Session = Depends(get_db)):
     parsed = interpret_with_llm(data.message)
     print(f"[Chat] Parsed preferences: {parsed}")
 
+    return _respond(db, data, parsed)
+
+
+async def chat_query_async(data: ChatRequest, db: Session = Depends(get_db)):
+    """
+    Async chat_query(). Awaits the LLM on an async HTTP client, so a single
+    worker can hold many chat sessions open while the model is thinking,
+    then runs the recommender in the threadpool, off the event loop.
+    """
+    print(f"[Chat] Received message: {data.message}")
+    print(f"[Chat] User location: lat={data.latitude}, lng={data.longitude}")
+
+    # --- Parse user message ---
+    parsed = await interpret_with_llm_async(data.message)
+    print(f"[Chat] Parsed preferences: {parsed}")
+
+    return await run_in_threadpool(_respond, db, data, parsed)
+
+
+@router.post("/stream")
+async def chat_stream(data: ChatRequest):
+    """
+    Streaming chat endpoint (NDJSON — one JSON object per line).
+
+    Lines carry a "stage" plus the same fields as the /chat response:
+        provisional — rule-parser interpretation and first results, sent
+                      straight away while the LLM is still working
+        final       — LLM-refined interpretation with re-ranked results
+
+    Queries the rule fast path or the interpretation cache can answer
+    skip the LLM and get a single "final" line.
+    """
+    print(f"[Chat] Streaming message: {data.message}")
+    return StreamingResponse(_stream_chat(data), media_type="application/x-ndjson")
+
+
+async def _stream_chat(data: ChatRequest):
+    started = time.perf_counter()
+
+    def line(stage: str, response: dict) -> str:
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        body = {"stage": stage, "elapsed_ms": elapsed_ms, **jsonable_encoder(response)}
+        return json.dumps(body) + "\n"
+
+    # --- Answerable without the LLM → single final line ---
+    parsed = interpret_without_llm(data.message)
+    if parsed is not None:
+        yield line("final", await run_in_threadpool(_respond_with_own_session, data, parsed))
+        return
+
+    # --- Provisional results from the rule parser ---
+    provisional = manual_fallback_parse(data.message)
+    if not provisional["needs_clarification"]:
+        yield line("provisional", await run_in_threadpool(_respond_with_own_session, data, provisional))
+
+    # --- LLM refinement ---
+    parsed = await ask_llm_async(data.message, stream=True)
+    print(f"[Chat] Parsed preferences: {parsed}")
+    yield line("final", await run_in_threadpool(_respond_with_own_session, data, parsed))
+
+
+def _respond_with_own_session(data: ChatRequest, parsed: dict) -> dict:
+    """
+    _respond() on a session of its own. A streaming body outlives the
+    request's dependencies, so get_db's session is closed by the time
+    later stages run.
+    """
+    db = SessionLocal()
+    try:
+        return _respond(db, data, parsed)
+    finally:
+        db.close()
+
+
+def _respond(db: Session, data: ChatRequest, parsed: dict) -> dict:
+    """Turn parsed preferences into the chat response (clarification or results)."""
     # --- Clarification needed ---
     if parsed.get("needs_clarification", False):
         return {
@@ -164,3 +254,10 @@ def chat_query(data: ChatRequest, db: Session = Depends(get_db)):
         )
 
     return response
+
+
+router.add_api_route(
+    "/",
+    chat_query_async if ASYNC_ENDPOINTS else chat_query,
+    methods=["POST"],
+)
@@ -1,11 +1,14 @@
 """
 Recommendations endpoint.
 Accepts structured user preferences and returns ranked events from PostgreSQL.
+Served by the async handler unless ASYNC_ENDPOINTS is turned off.
 """
 
 from fastapi import Query, Depends, APIRouter
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.core.config import ASYNC_ENDPOINTS
 from app.core.database import get_db
 from app.services.recommender import EventRecommender
 from app.schemas.recommendation import RecommendationRequest
@@ -13,7 +16,6 @@ from app.schemas.recommendation import RecommendationRequest
 router = APIRouter()
 
 
-@router.post("/")
 def get_recommendations(
     payload: RecommendationRequest,
     sort_by: str = Query(default="best"),
@@ -32,6 +34,29 @@ def get_recommendations(
     Returns:
         List of ranked recommendation dicts
     """
+    return _recommend(db, payload, sort_by, max_distance_km)
+
+
+async def get_recommendations_async(
+    payload: RecommendationRequest,
+    sort_by: str = Query(default="best"),
+    max_distance_km: float | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Async get_recommendations(). Scoring is CPU-bound and the recommender's
+    queries are synchronous, so the whole call runs in the threadpool and
+    never holds up the event loop for other in-flight requests.
+    """
+    return await run_in_threadpool(_recommend, db, payload, sort_by, max_distance_km)
+
+
+def _recommend(
+    db: Session,
+    payload: RecommendationRequest,
+    sort_by: str,
+    max_distance_km: float | None,
+) -> dict:
     # EventRecommender now only takes db — no CSV path
     recommender = EventRecommender(db=db)
 
@@ -51,4 +76,11 @@ def get_recommendations(
             "message": "No events found matching your criteria. Try broadening your search."
         }
 
-    return {"results": results}
\ No newline at end of file
+    return {"results": results}
+
+
+router.add_api_route(
+    "/",
+    get_recommendations_async if ASYNC_ENDPOINTS else get_recommendations,
+    methods=["POST"],
+)
@@ -0,0 +1,105 @@
+"""
+Runtime settings.
+Read from environment variables (set in your .env file) with safe defaults.
+"""
+
+import os
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean flag such as "1", "true" or "yes" from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# ------------------------------------------------------------------
+# Event catalog — in-memory columns the recommender scores from
+# ------------------------------------------------------------------
+EVENT_CATALOG_ENABLED = _env_flag("EVENT_CATALOG_ENABLED", True)
+
+# Seconds between incremental refresh checks against Event.updated_at
+EVENT_CATALOG_REFRESH_SECONDS = float(os.getenv("EVENT_CATALOG_REFRESH_SECONDS", "30"))
+
+# When the catalog is disabled, recommend() prefilters in SQL. Set this on
+# PostgreSQL databases with the PostGIS extension to add an exact
+# ST_DWithin distance check on top of the bounding box.
+EVENT_PREFILTER_POSTGIS = _env_flag("EVENT_PREFILTER_POSTGIS", False)
+
+# ------------------------------------------------------------------
+# User preference profiles — per-user cache (LRU + TTL)
+# ------------------------------------------------------------------
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "1024"))
+
+# Upper bound on staleness from writes this process doesn't see
+# (other workers, genre reclassification)
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+
+# Interaction ids are handed out before their transaction commits, so a lower
+# id can show up after a higher one. Profiles only move last_interaction_id
+# past interactions older than this, and track newer ones by id.
+INTERACTION_SETTLE_SECONDS = float(os.getenv("INTERACTION_SETTLE_SECONDS", "60"))
+
+# Profile writes in flight at once. Each takes a second pooled connection
+# while the request holds its own, so keep this well below the pool size;
+# past it, a load skips its write and the next load repeats the fold.
+PROFILE_WRITE_CONCURRENCY = int(os.getenv("PROFILE_WRITE_CONCURRENCY", "4"))
+
+# ------------------------------------------------------------------
+# API — async endpoints
+# ------------------------------------------------------------------
+# Serve /recommendations and /chat from async handlers: the LLM is awaited
+# on an async HTTP client and the recommender runs in the threadpool.
+# Needs no extra DB driver. Set to 0 to use the sync handlers.
+ASYNC_ENDPOINTS = _env_flag("ASYNC_ENDPOINTS", True)
+
+# ------------------------------------------------------------------
+# Ollama — local LLM used for chat interpretation and genre fallback
+# ------------------------------------------------------------------
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
+OLLAMA_MODEL    = os.getenv("OLLAMA_MODEL", "qwen2.5:1.5b")
+
+# Per-request timeouts (seconds). Call sites may pass a longer read timeout.
+OLLAMA_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_CONNECT_TIMEOUT_SECONDS", "5"))
+OLLAMA_READ_TIMEOUT_SECONDS    = float(os.getenv("OLLAMA_READ_TIMEOUT_SECONDS", "30"))
+
+# Requests sent to Ollama at once, sync and async callers combined; extra
+# callers wait for a free slot.
+# Also the size of the keep-alive connection pool.
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+
+# ------------------------------------------------------------------
+# Chat interpretation cache — parsed preferences per normalized query
+# ------------------------------------------------------------------
+LLM_CACHE_SIZE        = int(os.getenv("LLM_CACHE_SIZE", "2048"))
+LLM_CACHE_MAX_BYTES   = int(os.getenv("LLM_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# SQLite file for a persistent second tier that survives restarts
+# (e.g. "llm_cache.sqlite3"). Empty = in-memory only.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+
+# ------------------------------------------------------------------
+# Chat rule fast path — answer clear queries without the LLM
+# ------------------------------------------------------------------
+CHAT_FAST_PATH_ENABLED = _env_flag("CHAT_FAST_PATH_ENABLED", True)
+
+# Rule confidence is 0.55 for one extracted slot (budget, genres,
+# distance, food) plus 0.1 per extra slot; 0.65 = at least two slots
+CHAT_FAST_PATH_MIN_CONFIDENCE = float(os.getenv("CHAT_FAST_PATH_MIN_CONFIDENCE", "0.65"))
+
+# ------------------------------------------------------------------
+# Scraper — Allevents city pages (Playwright)
+# ------------------------------------------------------------------
+# Browser contexts scraping cities in parallel (one page each)
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "3"))
+
+# Set to 0 to watch the browser while debugging selectors
+SCRAPER_HEADLESS = _env_flag("SCRAPER_HEADLESS", True)
+
+# Delay between browser actions — only applied when not headless
+SCRAPER_SLOW_MO_MS = int(os.getenv("SCRAPER_SLOW_MO_MS", "50"))
+
+# Event pages fetched at once for the og:image poster fallback
+SCRAPER_OG_CONCURRENCY = int(os.getenv("SCRAPER_OG_CONCURRENCY", "8"))
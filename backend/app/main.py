@@ -2,11 +2,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI, Depends
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-import requests as http_requests
 
 from app.core.database import Base, engine, SessionLocal, get_db
-from app.models import event_interaction
+from app.models import event_interaction, event_interest_count, genre_cache, user_profile
 from app.models.user import User
 from app.models.event import Event
 from fastapi.middleware.cors import CORSMiddleware
@@ -14,7 +14,13 @@ from app.api.v1 import interactions, crowd, recommendations, saved_events, event
 from app.api.v1.auth import router as auth_router
 from fastapi.staticfiles import StaticFiles
 from app.services.scrapers.scheduler import start_scheduler, stop_scheduler, trigger_manual_scrape
-from app.services.genre_classifier import GenreClassifier
+from app.services.genre_cache import cache_stats, clear_cache
+from app.services.genre_classifier import GenreClassifier, KEYWORDS_VERSION
+from app.services.event_catalog import event_catalog
+from app.services.learning.user_profile import profile_cache, rebuild_profiles_for_events
+from app.services.llm_cache import interpret_cache
+from app.services.llm_interpreter import fast_path_stats
+from app.services.ollama_client import ollama_client
 
 
 app = FastAPI(title="AI Events Recommender")
@@ -47,6 +53,12 @@ def shutdown():
     stop_scheduler()
 
 
+@app.on_event("shutdown")
+async def close_async_resources():
+    """Close the async Ollama client."""
+    await ollama_client.aclose()
+
+
 # ------------------------------------------------------------------
 # Admin endpoint — manually trigger a scrape without waiting for schedule
 # ------------------------------------------------------------------
@@ -67,10 +79,75 @@ def reclassify_genres(db: Session = Depends(get_db)):
     Retroactively classify genres for all events in the DB that have
     genre=null. Run this once after the first scrape.
     """
+    # Events whose genre may change — profiles built from them are rebuilt below
+    reclassified_ids = [
+        event_id for (event_id,) in
+        db.query(Event.id).filter(or_(Event.genre.is_(None), Event.genre == "Technology"))
+    ]
+
     summary = GenreClassifier.reclassify_db(db)
+    db.commit()
+
+    # Noise events may have been deleted — deletes need a full catalog reload
+    if summary["removed"]:
+        event_catalog.invalidate()
+    else:
+        event_catalog.mark_stale()
+
+    # Preference profiles aggregate by genre — rebuild the materialized rows
+    # that counted these events, and drop every cached profile
+    summary["profiles_rebuilt"] = rebuild_profiles_for_events(db, reclassified_ids)
+    profile_cache.clear()
+
     return {"status": "complete", "summary": summary}
 
 
+@app.get("/api/v1/admin/ollama-metrics", tags=["Admin"])
+def ollama_metrics():
+    """Request counts, failures, timeouts and latency of LLM calls, per call site."""
+    return {
+        "url":             ollama_client.url,
+        "model":           ollama_client.model,
+        "max_concurrency": ollama_client.max_concurrency,
+        "calls":           ollama_client.metrics.snapshot(),
+    }
+
+
+@app.get("/api/v1/admin/genre-cache", tags=["Admin"])
+def genre_cache_stats(db: Session = Depends(get_db)):
+    """Number of cached LLM genres, and how many are stale."""
+    return cache_stats(db, KEYWORDS_VERSION)
+
+
+@app.delete("/api/v1/admin/genre-cache", tags=["Admin"])
+def invalidate_genre_cache(stale_only: bool = False, db: Session = Depends(get_db)):
+    """
+    Drop cached event genres — e.g. after changing the LLM prompt or model.
+    stale_only=true only drops entries stored under older GENRE_KEYWORDS.
+    """
+    deleted = clear_cache(db, keep_version=KEYWORDS_VERSION if stale_only else None)
+    return {"status": "cleared", "deleted": deleted}
+
+
+@app.get("/api/v1/admin/llm-cache", tags=["Admin"])
+def llm_cache_stats():
+    """Size and hit/miss counters of the chat interpretation cache."""
+    return interpret_cache.stats()
+
+
+@app.delete("/api/v1/admin/llm-cache", tags=["Admin"])
+def clear_llm_cache():
+    """Drop every cached interpretation, e.g. after changing the prompt or model."""
+    interpret_cache.clear()
+    return {"status": "cleared"}
+
+
+@app.get("/api/v1/admin/chat-fast-path", tags=["Admin"])
+def chat_fast_path_stats():
+    """Fraction of chat queries answered by the rule parser without the LLM."""
+    return fast_path_stats()
+
+
 @app.on_event("startup")
 def startup():
     start_scheduler(SessionLocal)
@@ -80,15 +157,8 @@ def _warmup_llm():
     """Pre-load the LLM into RAM so the first user request is fast."""
     try:
         print("[LLM] Warming up model...")
-        http_requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "qwen2.5:1.5b",
-                "prompt": "hi",
-                "stream": False,
-                "options": {"temperature": 0}
-            },
-            timeout=120
+        ollama_client.generate(
+            "hi", purpose="warmup", options={"temperature": 0}, timeout=120
         )
         print("[LLM] Model warmed up and ready.")
     except Exception as e:
@@ -6,7 +6,7 @@ Replaces the old dataclass — events are now stored in PostgreSQL.
 from datetime import datetime, timezone
 from sqlalchemy import (
     Column, String, Float, Boolean,
-    DateTime, Text, JSON, Integer
+    DateTime, Text, JSON, Integer, Index, func
 )
 from app.core.database import Base
 
@@ -93,7 +93,19 @@ class Event(Base):
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
-        nullable=False
+        nullable=False,
+        index=True,   # event catalog refreshes incrementally from this
+    )
+
+    # ------------------------------------------------------------------
+    # Indexes for the recommendation prefilter
+    # (bounding box on coordinates, case-insensitive genre match)
+    # create_all() skips these on an existing table — add them with
+    # python -m app.scripts.create_event_indexes
+    # ------------------------------------------------------------------
+    __table_args__ = (
+        Index("ix_events_lat_lng", latitude, longitude),
+        Index("ix_events_genre_lower", func.lower(genre)),
     )
 
     def __repr__(self):
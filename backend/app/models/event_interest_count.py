@@ -0,0 +1,22 @@
+"""
+Per-event INTERESTED counter.
+Maintained by log_interaction() so crowd estimates are a primary-key lookup
+instead of a COUNT(*) over event_interactions.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime
+from app.core.database import Base
+
+
+class EventInterestCount(Base):
+    __tablename__ = "event_interest_counts"
+
+    event_id       = Column(String, primary_key=True)   # matches Event.id (String)
+    interest_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
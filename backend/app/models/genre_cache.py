@@ -0,0 +1,23 @@
+"""
+Cached genre per normalized event text.
+Recurring events are re-scraped every week with the same name and
+description; GenreClassifier looks them up here before calling the LLM.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+
+class GenreCacheEntry(Base):
+    __tablename__ = "genre_cache"
+
+    text_hash        = Column(String(64), primary_key=True)    # sha256 of normalized name + description
+    genre            = Column(String(100), nullable=False)
+    keywords_version = Column(String(16), nullable=False)      # KEYWORDS_VERSION when stored
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
@@ -0,0 +1,27 @@
+"""
+Materialized user preference profile.
+One row per user, aggregated from event_interactions joined with events,
+so every worker reads a profile with a single primary-key lookup.
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, Float, DateTime, JSON
+from app.core.database import Base
+
+
+class UserProfile(Base):
+    __tablename__ = "user_profiles"
+
+    user_id                = Column(Integer, primary_key=True)
+    genre_bias             = Column(JSON, nullable=False, default=dict)    # genre → bias score
+    crowd_bias             = Column(Float, nullable=False, default=0.0)    # unclamped running total
+    interest_count         = Column(Integer, nullable=False, default=0)
+    dislike_count          = Column(Integer, nullable=False, default=0)
+    last_interaction_id    = Column(Integer, nullable=False, default=0)    # every EventInteraction.id up to here is folded in
+    recent_interaction_ids = Column(JSON, nullable=False, default=list)    # ids above it that are folded in too
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
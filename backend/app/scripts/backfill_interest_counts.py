@@ -0,0 +1,46 @@
+"""
+Backfill script — rebuilds event_interest_counts from event_interactions.
+
+Run from your project root:
+    python -m app.scripts.backfill_interest_counts
+
+Safe to run multiple times — the counter table is replaced with a fresh
+grouped count. Needed once for interactions logged before the counter
+table existed.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Load .env BEFORE importing anything from app
+from dotenv import load_dotenv
+from pathlib import Path
+
+env_path = Path(__file__).resolve().parent.parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.event_interest_count import EventInterestCount
+from app.services.crowd import CrowdEstimator
+
+
+def backfill_interest_counts():
+    # Make sure the event_interest_counts table exists
+    Base.metadata.create_all(bind=engine, tables=[EventInterestCount.__table__])
+
+    db = SessionLocal()
+    try:
+        events = CrowdEstimator.rebuild_counts(db)
+        print(f"[Backfill] Done — events with interest: {events}")
+
+    except Exception as e:
+        db.rollback()
+        print(f"[Backfill] Fatal error: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_interest_counts()
@@ -0,0 +1,66 @@
+"""
+Backfill script — materializes user_profiles for every user with interactions.
+
+Run from your project root:
+    python -m app.scripts.backfill_user_profiles            # catch up existing rows
+    python -m app.scripts.backfill_user_profiles --rebuild  # recompute from scratch
+
+Safe to run multiple times. Without --rebuild each profile is advanced from
+its last_interaction_id; use --rebuild after bulk genre/crowd changes, since
+already-aggregated interactions keep the genre they were counted under.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Load .env BEFORE importing anything from app
+from dotenv import load_dotenv
+from pathlib import Path
+
+env_path = Path(__file__).resolve().parent.parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+import argparse
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.event_interaction import EventInteraction
+from app.models.user_profile import UserProfile
+from app.services.learning.user_profile import UserPreferenceProfile
+
+
+def backfill_user_profiles(rebuild: bool = False):
+    # Make sure the user_profiles table exists
+    Base.metadata.create_all(bind=engine, tables=[UserProfile.__table__])
+
+    db = SessionLocal()
+    processed = failed = 0
+
+    try:
+        user_ids = [
+            user_id for (user_id,) in
+            db.query(EventInteraction.user_id).distinct().order_by(EventInteraction.user_id)
+        ]
+        print(f"[Backfill] {len(user_ids)} users with interactions")
+
+        for user_id in user_ids:
+            try:
+                UserPreferenceProfile(db, user_id, rebuild=rebuild)
+                processed += 1
+            except Exception as e:
+                print(f"[Backfill] Failed for user {user_id}: {e}")
+                db.rollback()
+                failed += 1
+
+        print(f"[Backfill] Done — profiles: {processed}, failed: {failed}")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Materialize user_profiles from event_interactions")
+    parser.add_argument("--rebuild", action="store_true", help="ignore stored rows and aggregate full history")
+    args = parser.parse_args()
+
+    backfill_user_profiles(rebuild=args.rebuild)
@@ -0,0 +1,160 @@
+"""
+Micro-benchmark — per-keyword regex scan vs compiled keyword matcher.
+
+Compares, over a few thousand event titles:
+    per-keyword  one re.search(r"\\b...\\b") per keyword, genre by genre
+                 (the old GenreClassifier.classify / substring is_noise)
+    compiled     GenreClassifier.classify / is_noise, one automaton pass
+
+Titles come from the events table when it holds at least MIN_DB_TITLES
+rows, otherwise from a synthetic set built out of the keyword tables.
+Both implementations must agree on every title before timings are shown.
+
+Run from your project root:
+    python -m app.scripts.benchmark_genre_classifier
+    python -m app.scripts.benchmark_genre_classifier --synthetic
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Load .env BEFORE importing anything from app
+from dotenv import load_dotenv
+from pathlib import Path
+
+env_path = Path(__file__).resolve().parent.parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+import argparse
+import random
+import re
+import timeit
+
+from app.services.genre_classifier import (
+    GENRE_KEYWORDS,
+    NOISE_KEYWORDS,
+    NOISE_VENUES,
+    GenreClassifier,
+)
+
+TITLES        = 5_000
+MIN_DB_TITLES = 1_000
+REPEATS       = 5
+
+FILLER = [
+    "nairobi", "mombasa", "kisumu", "night", "edition", "2026", "annual",
+    "grand", "weekend", "special", "friday", "show", "presents", "the",
+    "with", "at", "kes", "500", "westlands", "karen", "vol", "2",
+]
+
+
+# ------------------------------------------------------------------
+# Old implementation, kept here as the reference
+# ------------------------------------------------------------------
+
+def _classify_per_keyword(name: str, description: str = ""):
+    text = f"{name} {description}".lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+
+    for genre, keywords in GENRE_KEYWORDS.items():
+        for keyword in keywords:
+            pattern = r"\b" + re.escape(keyword.lower()) + r"\b"
+            if re.search(pattern, text):
+                return genre
+    return None
+
+
+def _is_noise_per_keyword(name: str, venue: str = "") -> bool:
+    text = f"{name} {venue}".lower()
+    return any(keyword.lower() in text for keyword in NOISE_KEYWORDS + NOISE_VENUES)
+
+
+# ------------------------------------------------------------------
+# Titles
+# ------------------------------------------------------------------
+
+def _db_titles() -> list[tuple[str, str, str]]:
+    """(name, description, venue) for up to TITLES events, [] if the DB is unavailable."""
+    try:
+        from app.core.database import SessionLocal
+        from app.models.event import Event
+
+        db = SessionLocal()
+        try:
+            rows = db.query(Event.name, Event.description, Event.venue_name).limit(TITLES).all()
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"[Benchmark] Could not read events: {e}")
+        return []
+
+    return [(name or "", description or "", venue or "") for name, description, venue in rows]
+
+
+def _synthetic_titles() -> list[tuple[str, str, str]]:
+    """Titles mixing keywords (some with punctuation) and filler words."""
+    rng   = random.Random(42)
+    words = [k for keywords in GENRE_KEYWORDS.values() for k in keywords] + FILLER * 20
+    noise = NOISE_KEYWORDS + NOISE_VENUES
+
+    titles = []
+    for _ in range(TITLES):
+        name = " ".join(rng.choice(words) for _ in range(rng.randint(2, 8))).title()
+        name += rng.choice(["", "!", " - KES 1,500", " @ Sarit Centre", " (Day 2)"])
+        description = rng.choice(["", " ".join(rng.choice(words) for _ in range(30))])
+        venue = rng.choice(noise) if rng.random() < 0.05 else rng.choice(["KICC", "Carnivore", ""])
+        titles.append((name, description, venue))
+    return titles
+
+
+# ------------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------------
+
+def _best_ms(fn) -> float:
+    """Best-of-REPEATS wall time for one pass over all titles, in milliseconds."""
+    return min(timeit.repeat(fn, number=1, repeat=REPEATS)) * 1000
+
+
+def run_benchmark(synthetic: bool = False):
+    titles = [] if synthetic else _db_titles()
+    source = "events table"
+    if len(titles) < MIN_DB_TITLES:
+        titles = _synthetic_titles()
+        source = "synthetic"
+    print(f"[Benchmark] {len(titles)} titles ({source})")
+
+    # Sanity check — same genre and noise verdict for every title
+    for name, description, venue in titles:
+        assert _classify_per_keyword(name, description) == GenreClassifier.classify(name, description), name
+        assert _is_noise_per_keyword(name, venue) == GenreClassifier.is_noise(name, venue), name
+
+    rows = [
+        (
+            "classify",
+            _best_ms(lambda: [_classify_per_keyword(n, d) for n, d, _ in titles]),
+            _best_ms(lambda: [GenreClassifier.classify(n, d) for n, d, _ in titles]),
+        ),
+        (
+            "is_noise",
+            _best_ms(lambda: [_is_noise_per_keyword(n, v) for n, _, v in titles]),
+            _best_ms(lambda: [GenreClassifier.is_noise(n, v) for n, _, v in titles]),
+        ),
+    ]
+
+    print(f"{'check':>9} | {'per-kw ms':>10} | {'compiled ms':>11} | {'µs/title':>8} | {'speed-up':>8}")
+    print("-" * 60)
+    for check, old_ms, new_ms in rows:
+        print(
+            f"{check:>9} | {old_ms:>10.1f} | {new_ms:>11.1f} | "
+            f"{new_ms * 1000 / len(titles):>8.1f} | {old_ms / new_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark GenreClassifier keyword matching")
+    parser.add_argument("--synthetic", action="store_true", help="skip the events table")
+    args = parser.parse_args()
+
+    run_benchmark(synthetic=args.synthetic)
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark — scalar vs vectorised Haversine distance.
+
+Compares, for one user point against N event points:
+    scalar      haversine_distance() in a Python loop (old per-event path)
+    vectorised  haversine_distance_array() from degrees
+    precomputed haversine_distance_from_radians() with radians/cos(lat)
+                computed up front, as the event catalog does
+
+Run from your project root:
+    python -m app.scripts.benchmark_haversine
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import timeit
+
+import numpy as np
+
+from app.utils.distance import (
+    haversine_distance,
+    haversine_distance_array,
+    haversine_distance_from_radians,
+)
+
+SIZES   = [1_000, 10_000, 100_000]
+REPEATS = 5
+
+# User in Nairobi CBD, events spread over Kenya
+USER_LAT, USER_LNG = -1.286389, 36.817223
+
+
+def _best_ms(fn, number: int) -> float:
+    """Best-of-REPEATS wall time per call, in milliseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=REPEATS)) / number * 1000
+
+
+def run_benchmark():
+    rng  = np.random.default_rng(42)
+    rows = []
+
+    for n in SIZES:
+        lats = rng.uniform(-4.7, 4.6, n)
+        lngs = rng.uniform(33.9, 41.9, n)
+
+        lat_list, lng_list = lats.tolist(), lngs.tolist()
+        lat_rad = np.radians(lats)
+        lng_rad = np.radians(lngs)
+        cos_lat = np.cos(lat_rad)
+
+        # Sanity check — all three agree
+        scalar = np.array([
+            haversine_distance(USER_LAT, USER_LNG, la, lo)
+            for la, lo in zip(lat_list, lng_list)
+        ])
+        assert np.allclose(scalar, haversine_distance_array(USER_LAT, USER_LNG, lats, lngs))
+        assert np.allclose(
+            scalar,
+            haversine_distance_from_radians(USER_LAT, USER_LNG, lat_rad, lng_rad, cos_lat),
+        )
+
+        number = max(1, 100_000 // n)
+        scalar_ms = _best_ms(
+            lambda: [haversine_distance(USER_LAT, USER_LNG, la, lo)
+                     for la, lo in zip(lat_list, lng_list)],
+            number,
+        )
+        vector_ms = _best_ms(
+            lambda: haversine_distance_array(USER_LAT, USER_LNG, lats, lngs),
+            number * 10,
+        )
+        precomputed_ms = _best_ms(
+            lambda: haversine_distance_from_radians(USER_LAT, USER_LNG, lat_rad, lng_rad, cos_lat),
+            number * 10,
+        )
+        rows.append((n, scalar_ms, vector_ms, precomputed_ms))
+
+    print(f"{'events':>8} | {'scalar ms':>10} | {'vector ms':>10} | {'precomp ms':>10} | {'speed-up':>8}")
+    print("-" * 60)
+    for n, scalar_ms, vector_ms, precomputed_ms in rows:
+        print(
+            f"{n:>8} | {scalar_ms:>10.3f} | {vector_ms:>10.3f} | "
+            f"{precomputed_ms:>10.3f} | {scalar_ms / precomputed_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,52 @@
+"""
+Migration script — adds the events indexes to an existing events table.
+
+Base.metadata.create_all() only creates missing tables; it does not add
+new indexes to a table that already exists. Databases created before the
+recommendation prefilter and the incremental event catalog need:
+
+    ix_events_updated_at    catalog refresh (updated_at >= watermark)
+    ix_events_lat_lng       prefilter: distance bounding box
+    ix_events_genre_lower   prefilter: case-insensitive genre match
+
+Run from your project root:
+    python -m app.scripts.create_event_indexes
+
+Safe to run multiple times — indexes that already exist are skipped.
+On PostgreSQL each CREATE INDEX locks the events table against writes
+while it builds, so run it outside the weekly scrape.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Load .env BEFORE importing anything from app
+from dotenv import load_dotenv
+from pathlib import Path
+
+env_path = Path(__file__).resolve().parent.parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+from sqlalchemy.schema import CreateIndex
+
+from app.core.database import engine
+from app.models.event import Event
+
+
+def create_event_indexes():
+    indexes = sorted(Event.__table__.indexes, key=lambda index: index.name)
+
+    # IF NOT EXISTS rather than reflection — expression indexes such as
+    # lower(genre) are not reflected on every backend
+    with engine.begin() as conn:
+        for index in indexes:
+            statement = CreateIndex(index, if_not_exists=True)
+            print(f"[Indexes] {statement.compile(conn)}")
+            conn.execute(statement)
+
+    print(f"[Indexes] Done — {len(indexes)} indexes on {Event.__tablename__}")
+
+
+if __name__ == "__main__":
+    create_event_indexes()
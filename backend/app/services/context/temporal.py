@@ -1,4 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
+
+import numpy as np
+
+# Day ordinal used for missing or unparseable event dates (real ordinals start at 1)
+UNKNOWN_DATE_ORDINAL = 0
 
 
 class TemporalContextService:
@@ -8,7 +13,7 @@ class TemporalContextService:
     """
 
     @staticmethod
-    def score(event_date: str) -> float:
+    def score(event_date: str, today: date | None = None) -> float:
         """
         Score an event based on days until it occurs.
 
@@ -22,17 +27,59 @@ class TemporalContextService:
 
         Args:
             event_date: Date string in YYYY-MM-DD format.
+            today: Reference date. Defaults to the current UTC date; pass one
+                   value for a whole request so scores agree across midnight.
 
         Returns:
             Float score between 0.0 and 1.0.
         """
-        try:
-            event_dt = datetime.strptime(event_date, "%Y-%m-%d")
-        except (ValueError, TypeError):
+        ordinal = TemporalContextService.date_ordinal(event_date)
+        if ordinal == UNKNOWN_DATE_ORDINAL:
             return 0.5  # unknown format → neutral score
 
-        days_until = (event_dt.date() - datetime.utcnow().date()).days
+        today = today or datetime.utcnow().date()
+        return TemporalContextService._score_days(ordinal - today.toordinal())
+
+    @staticmethod
+    def score_ordinals(ordinals: np.ndarray, today: date) -> np.ndarray:
+        """
+        Vectorised score() over day ordinals (see date_ordinal).
+
+        Args:
+            ordinals: Integer array of event day ordinals.
+            today: Reference date for the whole batch.
+
+        Returns:
+            Float array of scores, same curve as score().
+        """
+        days_until = ordinals - today.toordinal()
+
+        scores = np.select(
+            [days_until < 0, days_until == 0, days_until <= 7, days_until <= 30, days_until <= 60],
+            [
+                0.0,
+                1.0,
+                np.minimum(1.0, 0.5 + days_until / 14),
+                0.9,
+                np.maximum(0.3, 0.9 - (days_until - 30) / 100),
+            ],
+            default=0.1,
+        )
+        return np.where(ordinals == UNKNOWN_DATE_ORDINAL, 0.5, scores)
+
+    @staticmethod
+    def date_ordinal(event_date: str) -> int:
+        """
+        Parse a YYYY-MM-DD string into a proleptic Gregorian day ordinal.
+        Returns UNKNOWN_DATE_ORDINAL for missing or unparseable dates.
+        """
+        try:
+            return datetime.strptime(event_date, "%Y-%m-%d").date().toordinal()
+        except (ValueError, TypeError):
+            return UNKNOWN_DATE_ORDINAL
 
+    @staticmethod
+    def _score_days(days_until: int) -> float:
         if days_until < 0:
             return 0.0
         if days_until == 0:
@@ -1,27 +1,90 @@
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models.event_interaction import EventInteraction
+from app.models.event_interest_count import EventInterestCount
 
 
 class CrowdEstimator:
     """
     Estimates how crowded an event is based on user interest signals.
+
+    Interest counts come from the event_interest_counts table, which
+    log_interaction() keeps up to date (see increment_interest_count).
     """
 
+    # INTERESTED interactions at which an event counts as fully crowded
+    FULL_CROWD_INTERESTS = 50
+
+    # Interests needed before an estimate replaces the event's stored crowd
+    # level — the count where the estimate reaches MEDIUM. Below it the
+    # estimate can only say LOW, which would rank a few interests as quieter
+    # than no signal at all (stored levels default to MEDIUM).
+    MIN_INTERESTS_TO_OVERRIDE = 15
+
+    # Event ids per IN (...) lookup
+    LOOKUP_CHUNK_SIZE = 1000
+
     def __init__(self, db: Session):
         self.db = db
 
     def estimate_crowd(self, event_id: int) -> dict:
-        interest_count = (
-            self.db.query(func.count(EventInteraction.id))
-            .filter(
-                EventInteraction.event_id == event_id,
-                EventInteraction.interaction_type == "INTERESTED",
-            )
-            .scalar()
+        return self.estimate_crowds([event_id])[str(event_id)]
+
+    def estimate_crowds(self, event_ids: list | None = None) -> dict:
+        """
+        Estimate crowd levels for many events with a single query.
+
+        Args:
+            event_ids: Events to estimate. None means every event with at
+                       least one INTERESTED interaction.
+
+        Returns:
+            Dict mapping event id → {"score", "level", "interest_count"}.
+            Requested events without interactions are included with a count of 0.
+        """
+        query = self.db.query(EventInterestCount.event_id, EventInterestCount.interest_count)
+        if event_ids is None:
+            query = query.filter(EventInterestCount.interest_count > 0)
+            counts = dict(query.all())
+        else:
+            event_ids = [str(event_id) for event_id in event_ids]
+            counts = dict.fromkeys(event_ids, 0)
+            counts.update(query.filter(EventInterestCount.event_id.in_(event_ids)).all())
+
+        return {
+            event_id: self._estimate(interest_count)
+            for event_id, interest_count in counts.items()
+        }
+
+    def crowd_levels(self, event_ids: list | None = None) -> dict:
+        """
+        Estimated crowd levels to use in place of the stored ones — only for
+        events with at least MIN_INTERESTS_TO_OVERRIDE interests.
+
+        Args:
+            event_ids: Events to look up. None means every event over the threshold.
+
+        Returns:
+            Dict mapping event id → "MEDIUM" | "HIGH".
+        """
+        query = self.db.query(EventInterestCount.event_id, EventInterestCount.interest_count).filter(
+            EventInterestCount.interest_count >= self.MIN_INTERESTS_TO_OVERRIDE
         )
+        if event_ids is None:
+            rows = query.all()
+        else:
+            event_ids = [str(event_id) for event_id in event_ids]
+            rows = []
+            for i in range(0, len(event_ids), self.LOOKUP_CHUNK_SIZE):
+                chunk = event_ids[i:i + self.LOOKUP_CHUNK_SIZE]
+                rows.extend(query.filter(EventInterestCount.event_id.in_(chunk)).all())
 
-        crowd_score = min(interest_count / 50, 1.0)
+        return {event_id: self._estimate(interest_count)["level"] for event_id, interest_count in rows}
+
+    @classmethod
+    def _estimate(cls, interest_count: int) -> dict:
+        crowd_score = min(interest_count / cls.FULL_CROWD_INTERESTS, 1.0)
 
         if crowd_score < 0.3:
             level = "LOW"
@@ -35,3 +98,56 @@ class CrowdEstimator:
             "level": level,
             "interest_count": interest_count,
         }
+
+    # ------------------------------------------------------------------
+    # Counter maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def rebuild_counts(db: Session) -> int:
+        """
+        Recompute event_interest_counts from event_interactions with one
+        grouped aggregate. Returns the number of events with interest.
+        """
+        grouped = (
+            db.query(EventInteraction.event_id, func.count(EventInteraction.id))
+            .filter(EventInteraction.interaction_type == "INTERESTED")
+            .group_by(EventInteraction.event_id)
+            .all()
+        )
+
+        db.query(EventInterestCount).delete(synchronize_session=False)
+        db.add_all(
+            EventInterestCount(event_id=event_id, interest_count=count)
+            for event_id, count in grouped
+        )
+        db.commit()
+        return len(grouped)
+
+
+def increment_interest_count(db: Session, event_id: str) -> None:
+    """
+    Add one INTERESTED interaction to the event's counter, in the caller's
+    transaction. A concurrent insert of the same counter row is retried as
+    an update, so the caller's commit never fails on it.
+    """
+    if _bump(db, event_id):
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(EventInterestCount(event_id=event_id, interest_count=1))
+    except IntegrityError:
+        _bump(db, event_id)
+
+
+def _bump(db: Session, event_id: str) -> bool:
+    updated = (
+        db.query(EventInterestCount)
+        .filter(EventInterestCount.event_id == event_id)
+        .update(
+            {EventInterestCount.interest_count: EventInterestCount.interest_count + 1},
+            synchronize_session=False,
+        )
+    )
+    return updated > 0
@@ -0,0 +1,376 @@
+"""
+In-memory columnar event catalog.
+
+Holds the fields the recommender scores on (genre, price, location, food,
+date, event type, crowd level) as NumPy columns, so recommend() reads from
+RAM instead of hydrating every Event row from PostgreSQL per request.
+Each snapshot carries a GeoGridIndex over the event coordinates for
+distance-capped queries.
+
+The catalog refreshes incrementally: it remembers the newest
+Event.updated_at it has seen and only re-reads rows changed since then.
+Each refresh also compares the table's row count with the catalog's, so
+events deleted by any worker drop out within one refresh interval.
+Writers in this process (scraper upserts, genre reclassify) call
+mark_stale() / invalidate() so their changes show up on the next request.
+Crowd levels estimated from interest counts are re-read on the same
+schedule and overlaid on the stored ones, so requests never query them.
+
+When the catalog is disabled, query_candidates() builds a one-off snapshot
+from a prefiltered SQL query instead of reading the whole table.
+
+Usage:
+    from app.services.event_catalog import event_catalog
+    snapshot = event_catalog.snapshot(db)
+"""
+
+import copy
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import EVENT_CATALOG_REFRESH_SECONDS, EVENT_PREFILTER_POSTGIS
+from app.models.event import Event
+from app.services.crowd import CrowdEstimator
+from app.services.context.temporal import TemporalContextService
+from app.services.scoring import Factorized
+from app.utils.spatial_index import GeoGridIndex, KM_PER_DEGREE
+
+logger = logging.getLogger(__name__)
+
+# Columns loaded for scoring — CatalogSnapshot reads rows by position
+CATALOG_COLUMNS = (
+    Event.id,
+    Event.genre,
+    Event.ticket_price,
+    Event.latitude,
+    Event.longitude,
+    Event.food_type,
+    Event.date,
+    Event.event_type,
+    Event.crowd_level,
+)
+
+
+# ------------------------------------------------------------------
+# Snapshot — immutable column arrays shared by concurrent requests
+# ------------------------------------------------------------------
+
+class CatalogSnapshot:
+    """
+    Column arrays for every scoreable event (events with coordinates).
+
+    Missing values are normalised the same way the scoring engine expects:
+    genre/food/date → "", event_type → "indoor", crowd_level → "MEDIUM",
+    ticket_price → 0.0.
+
+    The string columns scored per distinct value are also kept factorized
+    (integer codes + uniques), so score_batch never re-sorts them.
+    """
+
+    FACTORIZED_COLUMNS = ("genre", "food_type", "event_type", "crowd_level")
+
+    def __init__(self, records: list[tuple]):
+        rows = [r for r in records if r[3] is not None and r[4] is not None]
+
+        self.ids          = np.array([r[0] for r in rows], dtype=object)
+        self.genre        = np.array([r[1] or "" for r in rows], dtype=object)
+        self.ticket_price = np.array([r[2] or 0.0 for r in rows], dtype=np.float64)
+        self.latitude     = np.array([r[3] for r in rows], dtype=np.float64)
+        self.longitude    = np.array([r[4] for r in rows], dtype=np.float64)
+        self.food_type    = np.array([r[5] or "" for r in rows], dtype=object)
+        self.date         = np.array([r[6] or "" for r in rows], dtype=object)
+        self.event_type   = np.array([r[7] or "indoor" for r in rows], dtype=object)
+        self.crowd_level  = np.array([r[8] or "MEDIUM" for r in rows], dtype=object)
+
+        # Dates parsed once per distinct string, not once per score
+        ordinals = {d: TemporalContextService.date_ordinal(d) for d in set(self.date)}
+        self.date_ordinal = np.array([ordinals[d] for d in self.date], dtype=np.int64)
+
+        self.factorized = {
+            name: Factorized.from_values(getattr(self, name)) for name in self.FACTORIZED_COLUMNS
+        }
+
+        # Radius queries for max_distance_km without scanning every row
+        self.spatial_index = GeoGridIndex(self.latitude, self.longitude)
+
+        self._row_of_id = {event_id: i for i, event_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def columns(self, idx: np.ndarray | None = None) -> dict:
+        """
+        Return the scoring columns as a dict of arrays (ScoringEngine.score_batch input),
+        with the FACTORIZED_COLUMNS as Factorized.
+
+        Args:
+            idx: Optional integer index array selecting a subset of rows.
+        """
+        columns = {
+            "id":           self.ids,
+            "genre":        self.genre,
+            "ticket_price": self.ticket_price,
+            "latitude":     self.latitude,
+            "longitude":    self.longitude,
+            "food_type":    self.food_type,
+            "date":         self.date,
+            "date_ordinal": self.date_ordinal,
+            "event_type":   self.event_type,
+            "crowd_level":  self.crowd_level,
+            **self.factorized,
+        }
+        if idx is None:
+            return columns
+        return {name: column[idx] for name, column in columns.items()}
+
+    def with_crowd_levels(self, levels: dict) -> "CatalogSnapshot":
+        """
+        Return a copy with crowd_level replaced for the given event ids.
+        Every other column (and the spatial index) is shared, not copied;
+        ids not in the snapshot are ignored.
+
+        Args:
+            levels: Mapping of event id → "LOW" | "MEDIUM" | "HIGH".
+        """
+        if not levels:
+            return self
+
+        snapshot = copy.copy(self)
+        snapshot.crowd_level = self.crowd_level.copy()
+        for event_id, level in levels.items():
+            row = self._row_of_id.get(event_id)
+            if row is not None:
+                snapshot.crowd_level[row] = level
+        snapshot.factorized = {
+            **self.factorized,
+            "crowd_level": Factorized.from_values(snapshot.crowd_level),
+        }
+        return snapshot
+
+    def event_dict(self, i: int) -> dict:
+        """Return row i as the event dict ScoringEngine.calculate_relevance_score takes."""
+        return {
+            "id":           self.ids[i],
+            "genre":        self.genre[i],
+            "ticket_price": float(self.ticket_price[i]),
+            "latitude":     float(self.latitude[i]),
+            "longitude":    float(self.longitude[i]),
+            "food_type":    self.food_type[i],
+            "date":         self.date[i],
+            "event_type":   self.event_type[i],
+            "crowd_level":  self.crowd_level[i],
+        }
+
+
+# ------------------------------------------------------------------
+# Catalog — process-wide cache with incremental refresh
+# ------------------------------------------------------------------
+
+class EventCatalog:
+    """
+    Process-wide cache of CatalogSnapshot, refreshed from Event.updated_at.
+
+    Rows are kept in a dict keyed by event id so incremental refreshes can
+    patch changed events in place; the NumPy snapshot is rebuilt only when
+    something actually changed.
+    """
+
+    def __init__(self, refresh_seconds: float = EVENT_CATALOG_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+
+        self._lock        = threading.Lock()
+        self._records:    dict[str, tuple] = {}
+        self._base:       CatalogSnapshot | None = None   # stored crowd levels
+        self._snapshot:   CatalogSnapshot | None = None   # _base + estimated crowd levels
+        self._crowd_levels: dict[str, str] = {}
+        self._watermark   = None   # newest Event.updated_at seen so far
+        self._checked_at  = 0.0    # monotonic time of last refresh check
+        self._stale       = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def snapshot(self, db: Session) -> CatalogSnapshot:
+        """
+        Return the current snapshot, loading or refreshing it first if needed.
+
+        The first call does a full load. Later calls check for rows with
+        updated_at >= watermark at most every `refresh_seconds`, or straight
+        away after mark_stale().
+
+        Only one caller loads at a time; the others never wait on it. They
+        get the current snapshot, or during the very first load a one-off
+        snapshot of their own. Waiting would deadlock async requests, which
+        share the event loop thread with the loading request.
+        """
+        if not self._lock.acquire(blocking=False):
+            current = self._snapshot
+            if current is not None:
+                return current
+            snapshot = CatalogSnapshot(db.query(*CATALOG_COLUMNS).all())
+            return snapshot.with_crowd_levels(CrowdEstimator(db).crowd_levels())
+
+        try:
+            if self._snapshot is None:
+                self._full_load(db)
+            elif self._stale or time.monotonic() - self._checked_at >= self.refresh_seconds:
+                self._incremental_refresh(db)
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def mark_stale(self) -> None:
+        """Force an incremental refresh on the next snapshot() call."""
+        self._stale = True
+
+    def invalidate(self) -> None:
+        """
+        Drop everything and reload from scratch on the next snapshot() call.
+        Picks up deletes straight away rather than on the next refresh.
+        """
+        with self._lock:
+            self._records      = {}
+            self._base         = None
+            self._snapshot     = None
+            self._crowd_levels = {}
+            self._watermark    = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _full_load(self, db: Session) -> None:
+        rows = db.query(*CATALOG_COLUMNS, Event.updated_at).all()
+
+        self._records   = {row[0]: tuple(row[:-1]) for row in rows}
+        self._watermark = max((row[-1] for row in rows if row[-1] is not None), default=None)
+        self._base      = CatalogSnapshot(list(self._records.values()))
+        self._refresh_crowd_levels(db, rebuilt=True)
+        self._mark_checked()
+
+        logger.info(f"[EventCatalog] Loaded {len(self._snapshot)} events")
+
+    def _incremental_refresh(self, db: Session) -> None:
+        query = db.query(*CATALOG_COLUMNS, Event.updated_at)
+        if self._watermark is not None:
+            query = query.filter(Event.updated_at >= self._watermark)
+        rows = query.all()
+
+        changed = False
+        for row in rows:
+            record = tuple(row[:-1])
+            if self._records.get(row[0]) != record:
+                self._records[row[0]] = record
+                changed = True
+            if row[-1] is not None and (self._watermark is None or row[-1] > self._watermark):
+                self._watermark = row[-1]
+
+        # updated_at cannot reveal deletes — fewer rows than we hold means some
+        # were deleted (by any worker), so drop the ids no longer in the table
+        if db.query(func.count(Event.id)).scalar() < len(self._records):
+            live_ids = {event_id for (event_id,) in db.query(Event.id)}
+            for event_id in [event_id for event_id in self._records if event_id not in live_ids]:
+                del self._records[event_id]
+            changed = True
+
+        if changed:
+            self._base = CatalogSnapshot(list(self._records.values()))
+            logger.info(f"[EventCatalog] Refreshed — {len(self._base)} events")
+
+        self._refresh_crowd_levels(db, rebuilt=changed)
+        self._mark_checked()
+
+    def _refresh_crowd_levels(self, db: Session, rebuilt: bool) -> None:
+        """Overlay the current CrowdEstimator levels on the base snapshot."""
+        levels = CrowdEstimator(db).crowd_levels()
+        if rebuilt or levels != self._crowd_levels:
+            self._crowd_levels = levels
+            self._snapshot     = self._base.with_crowd_levels(levels)
+
+    def _mark_checked(self) -> None:
+        self._checked_at = time.monotonic()
+        self._stale      = False
+
+
+event_catalog = EventCatalog()
+
+
+# ------------------------------------------------------------------
+# DB prefilter — used when the catalog is disabled
+# ------------------------------------------------------------------
+
+def query_candidates(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    max_distance_km: float | None = None,
+    preferred_genres: list[str] | None = None,
+) -> CatalogSnapshot:
+    """
+    Load only the events a request can possibly return, scoring columns only.
+
+    Pushed into SQL:
+        - distance cap as a lat/lng bounding box (plus ST_DWithin when
+          EVENT_PREFILTER_POSTGIS is on and the DB is PostgreSQL)
+        - preferred genres — recommend() drops genre mismatches anyway
+
+    Past events are not filtered out: they score 0.0 on the temporal factor
+    only, and can still clear MIN_SCORE, as they do on the catalog path.
+
+    Args:
+        db: SQLAlchemy session
+        latitude: User latitude
+        longitude: User longitude
+        max_distance_km: Hard distance cap (None = no cap)
+        preferred_genres: Genres the user asked for (empty/None = any)
+
+    Returns:
+        CatalogSnapshot of the matching events.
+    """
+    query = db.query(*CATALOG_COLUMNS).filter(
+        Event.latitude.isnot(None),
+        Event.longitude.isnot(None),
+    )
+
+    if preferred_genres:
+        query = query.filter(
+            func.lower(Event.genre).in_([g.lower() for g in preferred_genres])
+        )
+
+    if max_distance_km is not None:
+        query = _filter_within(query, db, latitude, longitude, max_distance_km)
+
+    return CatalogSnapshot(query.all())
+
+
+def _filter_within(query, db: Session, latitude: float, longitude: float, radius_km: float):
+    """
+    Restrict a query to events near the user. Deliberately generous — the
+    recommender still applies the exact Haversine cap afterwards.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    query = query.filter(Event.latitude.between(latitude - dlat, latitude + dlat))
+
+    max_abs_lat = abs(latitude) + dlat
+    if max_abs_lat < 90:
+        dlng = dlat / math.cos(math.radians(max_abs_lat))
+        if longitude - dlng >= -180 and longitude + dlng <= 180:
+            query = query.filter(Event.longitude.between(longitude - dlng, longitude + dlng))
+
+    if EVENT_PREFILTER_POSTGIS and db.bind.dialect.name == "postgresql":
+        # geography distances are on the spheroid; pad 0.5% so nothing the
+        # spherical Haversine cap would keep is dropped here
+        query = query.filter(func.ST_DWithin(
+            func.geography(func.ST_SetSRID(func.ST_MakePoint(Event.longitude, Event.latitude), 4326)),
+            func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326)),
+            radius_km * 1000 * 1.005,
+        ))
+
+    return query
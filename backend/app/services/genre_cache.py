@@ -0,0 +1,159 @@
+"""
+Persistent genre cache for scraped events.
+
+The same recurring events ("TRAIL SESSION", weekly club nights) come back
+in every weekly scrape. GenreClassifier.classify_batch() and reclassify_db()
+look up the events keywords can't classify here — keyed by a hash of their
+normalized name and description — before sending them to the LLM, and
+store the genres the LLM answers with.
+
+Only LLM answers are cached: keyword matches are cheap to recompute and
+always run first, so a cached genre is only used while keywords still
+don't match. Entries are stamped with the keywords_version they were
+stored under, so ones from older keyword tables can be cleared.
+
+Usage:
+    cache = GenreCache(db, KEYWORDS_VERSION)
+    cache.load(texts)                     # one query per 500 texts
+    entry = cache.get(name, description)
+    cache.put(name, description, "Music")
+    cache.save()
+"""
+
+import hashlib
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.genre_cache import GenreCacheEntry
+from app.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Hashes per IN (...) lookup
+LOOKUP_CHUNK_SIZE = 500
+
+
+def text_key(name: str, description: str = "") -> str:
+    """Cache key: sha256 of the normalized name and description."""
+    text = f"{normalize_text(name or '')}\x1f{normalize_text(description or '')}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class GenreCache:
+    """
+    Cached LLM genres for one classification run: bulk lookups up front,
+    writes collected and saved together.
+
+    Args:
+        db: SQLAlchemy session (None disables the cache — every lookup misses)
+        keywords_version: Current KEYWORDS_VERSION of the genre classifier
+    """
+
+    def __init__(self, db: Optional[Session], keywords_version: str):
+        self.db               = db
+        self.keywords_version = keywords_version
+
+        self._entries: dict[str, GenreCacheEntry] = {}
+        self._pending: dict[str, str]             = {}   # key → genre
+
+    def load(self, texts: Iterable[tuple[str, str]]) -> None:
+        """Fetch the entries for (name, description) pairs ahead of get()."""
+        if self.db is None:
+            return
+
+        keys = list({text_key(name, description) for name, description in texts})
+        for i in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            rows = (
+                self.db.query(GenreCacheEntry)
+                .filter(GenreCacheEntry.text_hash.in_(keys[i:i + LOOKUP_CHUNK_SIZE]))
+                .all()
+            )
+            self._entries.update((row.text_hash, row) for row in rows)
+
+    def get(self, name: str, description: str = "") -> Optional[GenreCacheEntry]:
+        """Loaded entry for this text, or None."""
+        return self._entries.get(text_key(name, description))
+
+    def put(self, name: str, description: str, genre: str) -> None:
+        """Queue an LLM genre for saving, unless the entry already says exactly that."""
+        if self.db is None:
+            return
+
+        key   = text_key(name, description)
+        entry = self._entries.get(key)
+        if entry and entry.genre == genre:
+            return
+        self._pending[key] = genre
+
+    def save(self) -> int:
+        """
+        Write queued entries in a savepoint, so a failure only loses the
+        cache writes and never the caller's own pending changes.
+        Does not commit. Returns the number of entries written.
+        """
+        if self.db is None or not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        try:
+            with self.db.begin_nested():
+                for key, genre in pending.items():
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        entry = GenreCacheEntry(text_hash=key)
+                        self.db.add(entry)
+                        self._entries[key] = entry
+                    entry.genre            = genre
+                    entry.keywords_version = self.keywords_version
+        except SQLAlchemyError as e:
+            # e.g. a concurrent run inserted the same text first
+            logger.warning(f"[GenreCache] Could not save {len(pending)} entries: {e}")
+            self._entries = {k: v for k, v in self._entries.items() if k not in pending}
+            return 0
+
+        return len(pending)
+
+
+# ------------------------------------------------------------------
+# Maintenance — used by the admin endpoints
+# ------------------------------------------------------------------
+
+def cache_stats(db: Session, keywords_version: str) -> dict:
+    """Entry count, and how many are stale (see clear_cache)."""
+    entries = db.query(func.count()).select_from(GenreCacheEntry).scalar()
+    stale = (
+        db.query(func.count())
+        .select_from(GenreCacheEntry)
+        .filter(GenreCacheEntry.keywords_version != keywords_version)
+        .scalar()
+    )
+    return {
+        "entries":          entries,
+        "stale":            stale,
+        "keywords_version": keywords_version,
+    }
+
+
+def clear_cache(db: Session, keep_version: Optional[str] = None) -> int:
+    """
+    Delete cached genres and commit.
+
+    Args:
+        keep_version: If given, only delete stale entries — stored under
+                      another keywords_version (i.e. older keyword tables).
+
+    Returns:
+        Number of entries deleted.
+    """
+    query = db.query(GenreCacheEntry)
+    if keep_version is not None:
+        query = query.filter(GenreCacheEntry.keywords_version != keep_version)
+
+    deleted = query.delete(synchronize_session=False)
+    db.commit()
+    logger.info(f"[GenreCache] Cleared {deleted} entries")
+    return deleted
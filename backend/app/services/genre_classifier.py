@@ -14,20 +14,34 @@ Usage:
 
 import re
 import json
+import hashlib
 import logging
-import requests
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from app.services.ollama_client import ollama_client
+from app.utils.keyword_matcher import KeywordMatcher
+
+if TYPE_CHECKING:
+    from app.services.genre_cache import GenreCache
 
 logger = logging.getLogger(__name__)
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL      = "qwen2.5:1.5b"
+# Read timeout for a single classification request
+LLM_TIMEOUT_SECONDS = 20
+
+# Multi-event LLM classification (classify_many_with_llm)
+LLM_BATCH_SIZE             = 20    # events per prompt
+LLM_BATCH_TIMEOUT_SECONDS  = 60    # read timeout for one batch prompt
+LLM_CONCURRENCY            = 4     # batch prompts in flight at once
+LLM_BATCH_DESCRIPTION_CHARS = 200  # descriptions are cut to keep prompts within context
 
 # Canonical genre list — all classifications must use these exact strings
 VALID_GENRES = [
     "Music", "Tech", "Food", "Sports", "Business",
     "Education", "Culture", "Travel", "Arts", "Nightlife", "Wellness"
 ]
+_VALID_GENRES_BY_LOWER = {genre.lower(): genre for genre in VALID_GENRES}
 
 # ------------------------------------------------------------------
 # LLM prompt for genre classification
@@ -118,6 +132,27 @@ Output: {"genre": "Culture"}
 Event: "{name}" | Description: "{description}"
 Output:"""
 
+GENRE_BATCH_PROMPT = """You are a JSON-only event genre classifier.
+
+Given a numbered list of events, return ONLY a JSON object mapping every event number to its genre.
+Choose from ONLY these genres: Music, Tech, Food, Sports, Business, Education, Culture, Travel, Arts, Nightlife, Wellness
+If none fit, use the closest match. Never return null or None. Include every number exactly once.
+
+OUTPUT FORMAT (strict JSON, no markdown, no extra text):
+{"1": "Music", "2": "Tech"}
+
+EXAMPLE:
+1. Event: "ISUKUTI FEST EDITION 2" | Description: ""
+2. Event: "26TH INDUSMACH KENYA 2026" | Description: ""
+3. Event: "MOMBASA 2DAYS 1NIGHT KES.9,800" | Description: ""
+4. Event: "BACK & FORTH - OLD SCHOOL PARTY!" | Description: ""
+5. Event: "ARSENAL VS. MONACO" | Description: ""
+Output: {"1": "Music", "2": "Tech", "3": "Travel", "4": "Nightlife", "5": "Sports"}
+
+EVENTS:
+{events}
+Output:"""
+
 
 # ------------------------------------------------------------------
 # Kenya-specific noise filter
@@ -303,6 +338,26 @@ GENRE_KEYWORDS: dict[str, list[str]] = {
 }
 
 
+# ------------------------------------------------------------------
+# Compiled keyword tables — built once at import
+# ------------------------------------------------------------------
+
+# Keyword → (rank, genre, keyword as written). Rank is the position in
+# GENRE_KEYWORDS iteration order, so the lowest-ranked whole-word hit is the
+# match the old genre-by-genre, keyword-by-keyword scan would return first.
+_GENRE_RANKS: dict[str, tuple[int, str, str]] = {}
+for _genre, _keywords in GENRE_KEYWORDS.items():
+    for _keyword in _keywords:
+        _GENRE_RANKS.setdefault(_keyword.lower(), (len(_GENRE_RANKS), _genre, _keyword))
+
+_GENRE_MATCHER = KeywordMatcher(_GENRE_RANKS)
+
+# Changes whenever GENRE_KEYWORDS does; stamped on genre cache entries so
+# the ones stored under older keyword tables can be cleared
+KEYWORDS_VERSION = hashlib.sha256(json.dumps(GENRE_KEYWORDS).encode("utf-8")).hexdigest()[:12]
+_NOISE_MATCHER = KeywordMatcher(k.lower() for k in NOISE_KEYWORDS + NOISE_VENUES)
+
+
 # ------------------------------------------------------------------
 # Classifier
 # ------------------------------------------------------------------
@@ -313,13 +368,7 @@ class GenreClassifier:
     def is_noise(name: str, venue: str = "") -> bool:
         """Check if an event is irrelevant noise (betting, overseas, spam)."""
         text = f"{name} {venue}".lower()
-        for keyword in NOISE_KEYWORDS:
-            if keyword.lower() in text:
-                return True
-        for city in NOISE_VENUES:
-            if city.lower() in text:
-                return True
-        return False
+        return _NOISE_MATCHER.search(text) is not None
 
     @staticmethod
     def classify(name: str, description: str = "") -> Optional[str]:
@@ -330,15 +379,21 @@ class GenreClassifier:
         text = f"{name} {description}".lower()
         text = re.sub(r"[^\w\s]", " ", text)
 
-        for genre, keywords in GENRE_KEYWORDS.items():
-            for keyword in keywords:
-                pattern = r"\b" + re.escape(keyword.lower()) + r"\b"
-                if re.search(pattern, text):
-                    logger.debug(f"[GenreClassifier] '{name}' → '{genre}' (matched: '{keyword}')")
-                    return genre
+        # One pass over the text; keep the earliest-ranked whole-word hit
+        best = None
+        for hit in _GENRE_MATCHER.find(text):
+            if hit.whole_word:
+                rank = _GENRE_RANKS[hit.keyword]
+                if best is None or rank < best:
+                    best = rank
 
-        logger.debug(f"[GenreClassifier] '{name}' → no keyword match")
-        return None
+        if best is None:
+            logger.debug(f"[GenreClassifier] '{name}' → no keyword match")
+            return None
+
+        _, genre, keyword = best
+        logger.debug(f"[GenreClassifier] '{name}' → '{genre}' (matched: '{keyword}')")
+        return genre
 
     @staticmethod
     def classify_with_llm(name: str, description: str = "") -> Optional[str]:
@@ -351,18 +406,15 @@ class GenreClassifier:
             .replace("{name}", name)\
             .replace("{description}", description or "")
 
-        payload = {
-            "model": MODEL,
-            "prompt": prompt,
-            "stream": False,
-            "format": "json",
-            "options": {"temperature": 0, "top_p": 0.1}
-        }
-
         try:
-            resp = requests.post(OLLAMA_URL, json=payload, timeout=20)
-            resp.raise_for_status()
-            text = resp.json().get("response", "").strip()
+            raw = ollama_client.generate(
+                prompt,
+                purpose="genre",
+                format="json",
+                options={"temperature": 0, "top_p": 0.1},
+                timeout=LLM_TIMEOUT_SECONDS,
+            )
+            text = raw.get("response", "").strip()
             parsed = json.loads(text)
             genre = parsed.get("genre")
 
@@ -383,17 +435,119 @@ class GenreClassifier:
         return None
 
     @staticmethod
-    def classify_batch(events: list[dict]) -> list[dict]:
+    def classify_many_with_llm(items: list[tuple[str, str]]) -> list[Optional[str]]:
+        """
+        LLM classification for many events — LLM_BATCH_SIZE events per prompt,
+        up to LLM_CONCURRENCY prompts in flight.
+
+        Each answer is validated against VALID_GENRES. Events a batch answer
+        leaves out or gets wrong, and every event of a batch whose response
+        cannot be parsed, are retried one at a time with classify_with_llm.
+
+        Args:
+            items: (name, description) pairs
+
+        Returns:
+            Genres in input order (None where classification failed).
+        """
+        if not items:
+            return []
+
+        chunks = [items[i:i + LLM_BATCH_SIZE] for i in range(0, len(items), LLM_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=min(LLM_CONCURRENCY, len(chunks))) as pool:
+            results = list(pool.map(GenreClassifier._classify_chunk_with_llm, chunks))
+
+        return [genre for chunk in results for genre in chunk]
+
+    @staticmethod
+    def _classify_chunk_with_llm(items: list[tuple[str, str]]) -> list[Optional[str]]:
+        """One batch prompt, with single-item retries for anything it doesn't settle."""
+        if len(items) == 1:
+            return [GenreClassifier.classify_with_llm(*items[0])]
+
+        answers = GenreClassifier._ask_llm_for_batch(items) or {}
+
+        genres = []
+        for number, (name, description) in enumerate(items, start=1):
+            genre = _VALID_GENRES_BY_LOWER.get(str(answers.get(str(number), "")).strip().lower())
+            if genre:
+                logger.debug(f"[GenreClassifier] LLM batch classified '{name}' → '{genre}'")
+            else:
+                genre = GenreClassifier.classify_with_llm(name, description)
+            genres.append(genre)
+        return genres
+
+    @staticmethod
+    def _ask_llm_for_batch(items: list[tuple[str, str]]) -> Optional[dict]:
+        """Send one batch prompt. Returns the parsed number → genre object, or None."""
+        lines = "\n".join(
+            f"{number}. Event: {json.dumps(name, ensure_ascii=False)} | "
+            f"Description: {json.dumps((description or '')[:LLM_BATCH_DESCRIPTION_CHARS], ensure_ascii=False)}"
+            for number, (name, description) in enumerate(items, start=1)
+        )
+
+        try:
+            raw = ollama_client.generate(
+                GENRE_BATCH_PROMPT.replace("{events}", lines),
+                purpose="genre_batch",
+                format="json",
+                options={"temperature": 0, "top_p": 0.1},
+                timeout=LLM_BATCH_TIMEOUT_SECONDS,
+            )
+            parsed = json.loads(raw.get("response", "").strip())
+            if isinstance(parsed, dict):
+                return parsed
+            logger.warning(f"[GenreClassifier] LLM batch returned {type(parsed).__name__}, not an object")
+
+        except Exception as e:
+            logger.warning(f"[GenreClassifier] LLM batch of {len(items)} failed: {e}")
+
+        return None
+
+    @staticmethod
+    def _classify_cached(texts: list[tuple[str, str]], cache: "GenreCache") -> list[tuple[Optional[str], Optional[str]]]:
+        """
+        Genre for each (name, description) from keywords, else from a cached
+        LLM answer — everything short of the LLM. Only keyword misses are
+        looked up in the cache. Returns (genre, source) per text; source is
+        "keyword", "llm" for a cached LLM answer, or None when the text
+        still needs the LLM.
+        """
+        results = [
+            (genre, "keyword") if genre else (None, None)
+            for genre in (GenreClassifier.classify(name, description) for name, description in texts)
+        ]
+
+        misses = [i for i, (genre, _) in enumerate(results) if genre is None]
+        cache.load(texts[i] for i in misses)
+        for i in misses:
+            entry = cache.get(*texts[i])
+            if entry is not None:
+                results[i] = (entry.genre, "llm")
+
+        return results
+
+    @staticmethod
+    def classify_batch(events: list[dict], db=None) -> list[dict]:
         """
         Classify a list of raw event dicts in place.
-        Order: noise check → keyword → LLM fallback.
+        Order: noise check → keyword → cached LLM genre → LLM fallback.
         Adds/overwrites the 'genre' key on each dict.
         Marks noise events with '_noise': True so upsert can skip them.
+
+        Args:
+            events: Raw event dicts from a scraper
+            db: SQLAlchemy session for the genre cache (None = no cache).
+                Cache writes are flushed in a savepoint, not committed —
+                the caller owns the transaction.
         """
-        matched        = 0
-        llm_classified = 0
-        unmatched      = 0
-        noise          = 0
+        keyword_matched = 0
+        llm_classified  = 0
+        cached          = 0
+        unmatched       = 0
+        noise           = 0
+
+        pending = []
 
         for event in events:
             if GenreClassifier.is_noise(
@@ -405,30 +559,43 @@ class GenreClassifier:
                 continue
 
             if not event.get("genre"):
-                # Try keywords first
-                genre = GenreClassifier.classify(
-                    event.get("name", ""),
-                    event.get("description", "") or ""
-                )
-
-                # LLM fallback
-                if not genre:
-                    genre = GenreClassifier.classify_with_llm(
-                        event.get("name", ""),
-                        event.get("description", "") or ""
-                    )
-                    if genre:
-                        llm_classified += 1
-
-                event["genre"] = genre
-                if genre:
-                    matched += 1
-                else:
-                    unmatched += 1
+                pending.append(event)
+
+        from app.services.genre_cache import GenreCache
+
+        cache = GenreCache(db, KEYWORDS_VERSION)
+        texts = [(event.get("name", ""), event.get("description", "") or "") for event in pending]
+
+        needs_llm = []
+        # Try keywords and the cache first
+        for event, (genre, source) in zip(pending, GenreClassifier._classify_cached(texts, cache)):
+            event["genre"] = genre
+            if source == "keyword":
+                keyword_matched += 1
+            elif source == "llm":
+                llm_classified += 1
+                cached += 1
+            else:
+                needs_llm.append(event)
+
+        # LLM fallback — batched prompts for everything keywords missed
+        llm_genres = GenreClassifier.classify_many_with_llm([
+            (event.get("name", ""), event.get("description", "") or "")
+            for event in needs_llm
+        ])
+        for event, genre in zip(needs_llm, llm_genres):
+            event["genre"] = genre
+            if genre:
+                cache.put(event.get("name", ""), event.get("description", "") or "", genre)
+                llm_classified += 1
+            else:
+                unmatched += 1
+
+        cache.save()
 
         logger.info(
             f"[GenreClassifier] Batch complete — "
-            f"keyword: {matched}, llm: {llm_classified}, "
+            f"keyword: {keyword_matched}, llm: {llm_classified} (cached: {cached}), "
             f"unmatched: {unmatched}, noise: {noise}"
         )
         return events
@@ -437,9 +604,11 @@ class GenreClassifier:
     def reclassify_db(db) -> dict:
         """
         Retroactively classify all null-genre events in DB.
-        Order: noise check → keyword → LLM fallback.
+        Order: noise check → keyword → cached LLM genre → LLM fallback.
         Also normalises 'Technology' → 'Tech' for consistency.
 
+        Changes are flushed, not committed — the caller commits.
+
         Args:
             db: SQLAlchemy session
 
@@ -447,12 +616,16 @@ class GenreClassifier:
             Summary dict with counts.
         """
         from app.models.event import Event
+        from app.services.genre_cache import GenreCache
 
         events         = db.query(Event).filter(Event.genre.is_(None)).all()
         updated        = 0
         skipped        = 0
         removed        = 0
         llm_classified = 0
+        llm_cached     = 0
+
+        pending        = []
 
         for event in events:
             # Remove noise events from DB entirely
@@ -461,33 +634,48 @@ class GenreClassifier:
                 removed += 1
                 continue
 
-            # Try keyword first
-            genre = GenreClassifier.classify(event.name, event.description or "")
+            pending.append(event)
 
-            # LLM fallback
-            if not genre:
-                genre = GenreClassifier.classify_with_llm(
-                    event.name, event.description or ""
-                )
-                if genre:
+        cache = GenreCache(db, KEYWORDS_VERSION)
+        texts = [(event.name, event.description or "") for event in pending]
+
+        needs_llm = []
+        # Try keywords and the cache first
+        for event, (genre, source) in zip(pending, GenreClassifier._classify_cached(texts, cache)):
+            if genre:
+                event.genre = genre
+                updated += 1
+                if source == "llm":
                     llm_classified += 1
+                    llm_cached += 1
+            else:
+                needs_llm.append(event)
 
+        # LLM fallback — batched prompts for everything keywords missed
+        llm_genres = GenreClassifier.classify_many_with_llm([
+            (event.name, event.description or "") for event in needs_llm
+        ])
+        for event, genre in zip(needs_llm, llm_genres):
             if genre:
+                cache.put(event.name, event.description or "", genre)
                 event.genre = genre
                 updated += 1
+                llm_classified += 1
             else:
                 skipped += 1
 
+        cache.save()
+
         # Normalise Technology → Tech
         tech_events = db.query(Event).filter(Event.genre == "Technology").all()
         for e in tech_events:
             e.genre = "Tech"
 
-        db.commit()
+        db.flush()
 
         logger.info(
             f"[GenreClassifier] DB reclassify complete — "
-            f"updated: {updated} (llm: {llm_classified}), "
+            f"updated: {updated} (llm: {llm_classified}, cached: {llm_cached}), "
             f"skipped: {skipped}, removed: {removed}, "
             f"tech_normalized: {len(tech_events)}"
         )
@@ -495,6 +683,7 @@ class GenreClassifier:
         return {
             "updated":         updated,
             "llm_classified":  llm_classified,
+            "llm_cached":      llm_cached,
             "skipped":         skipped,
             "removed":         removed,
             "tech_normalized": len(tech_events)
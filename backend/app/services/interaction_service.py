@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.event_interaction import EventInteraction
+from app.services.crowd import increment_interest_count
+from app.services.learning.user_profile import record_interaction
 
 
 def log_interaction(
@@ -14,6 +16,11 @@ def log_interaction(
         interaction_type=interaction_type,
     )
     db.add(interaction)
+    if interaction_type == "INTERESTED":
+        increment_interest_count(db, str(event_id))
     db.commit()
     db.refresh(interaction)
+
+    # Keep the cached preference profile in step without a full rebuild
+    record_interaction(db, interaction)
     return interaction
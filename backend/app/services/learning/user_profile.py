@@ -3,13 +3,46 @@ User preference profile builder.
 Derives genre and crowd preferences from past event interactions.
 Now that events are in PostgreSQL, we can join interactions with events
 to build a meaningful preference profile.
+
+Profiles are materialized in the user_profiles table so every worker reads
+one row per user. Each load folds in interactions logged since the row was
+written (a single grouped aggregate) and advances its last_interaction_id.
+Ids are handed out before commit, so a lower id can appear after a higher
+one: the watermark only moves past interactions older than
+INTERACTION_SETTLE_SECONDS, and newer ones are tracked by id until then.
+The row is written on a session of its own, never the caller's, and only
+when there was something new to fold in.
+
+Interactions are aggregated under the genre and crowd level their event had
+at the time. The genre reclassify endpoint rebuilds the profiles it affects
+(rebuild_profiles_for_events); after any other bulk edit of event genres or
+crowd levels, rebuild with: python -m app.scripts.backfill_user_profiles --rebuild
+
+Built profiles are cached per user (LRU + TTL). log_interaction() applies
+each new interaction to the cached profile instead of discarding it, so a
+heavy user's history is read from the DB once, not on every request.
 """
 
+import threading
 from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, func, or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.config import (
+    INTERACTION_SETTLE_SECONDS,
+    PROFILE_CACHE_SIZE,
+    PROFILE_CACHE_TTL_SECONDS,
+    PROFILE_WRITE_CONCURRENCY,
+)
 from app.models.event_interaction import EventInteraction
 from app.models.event import Event
+from app.models.user_profile import UserProfile
+from app.utils.ttl_cache import TTLCache
+
+# Bounds the extra connections profile writes take — see UserPreferenceProfile._save
+_write_slots = threading.BoundedSemaphore(PROFILE_WRITE_CONCURRENCY)
 
 
 class UserPreferenceProfile:
@@ -28,69 +61,291 @@ class UserPreferenceProfile:
     DISLIKE_WEIGHT      = -0.15  # stronger negative nudge per NOT_INTERESTED
     CROWD_PENALTY       = -0.05  # applied per NOT_INTERESTED on a HIGH crowd event
     CROWD_BOOST         =  0.03  # applied per INTERESTED on a LOW crowd event
+    CROWD_BIAS_LIMIT    =  0.3   # crowd_bias is clamped to ±this
 
-    def __init__(self, db: Session, user_id: int):
-        self.db      = db
+    def __init__(self, db: Session, user_id: int, rebuild: bool = False):
         self.user_id = user_id
 
         self.genre_bias:   Counter = Counter()
-        self.crowd_bias:   float   = 0.0
         self.interest_count: int   = 0
         self.dislike_count:  int   = 0
 
-        self._build_profile()
+        # Unclamped running total — clamping happens on read so that
+        # incremental updates land exactly where a full rebuild would
+        self._raw_crowd_bias: float = 0.0
+
+        # Every EventInteraction.id up to last_interaction_id is folded in,
+        # plus the (not yet settled) ids in recent_interaction_ids
+        self.last_interaction_id:    int      = 0
+        self.recent_interaction_ids: set[int] = set()
+
+        self._build_profile(db, rebuild)
+
+    @property
+    def crowd_bias(self) -> float:
+        """
+        Crowd adjustment, clamped to a reasonable range so it
+        doesn't dominate the relevance score.
+        """
+        return max(-self.CROWD_BIAS_LIMIT, min(self.CROWD_BIAS_LIMIT, self._raw_crowd_bias))
+
+    def _build_profile(self, db: Session, rebuild: bool = False):
+        """
+        Load the materialized user_profiles row, then fold in any interactions
+        logged since it was written and store the result back.
+
+        Args:
+            db: SQLAlchemy session
+            rebuild: Ignore the stored row and aggregate the full history
+        """
+        row = db.query(UserProfile).filter(UserProfile.user_id == self.user_id).first()
+
+        if row is not None and not rebuild:
+            self.genre_bias             = Counter(row.genre_bias or {})
+            self._raw_crowd_bias        = row.crowd_bias
+            self.interest_count         = row.interest_count
+            self.dislike_count          = row.dislike_count
+            self.last_interaction_id    = row.last_interaction_id
+            self.recent_interaction_ids = set(row.recent_interaction_ids or [])
 
-    def _build_profile(self):
+        if self._advance(db) or rebuild:
+            self._save(db, row, overwrite=rebuild)
+
+    def has_folded(self, interaction_id: int) -> bool:
+        """True if the interaction with this id is already counted in the profile."""
+        return interaction_id <= self.last_interaction_id or interaction_id in self.recent_interaction_ids
+
+    def _advance(self, db: Session) -> bool:
         """
-        Join interactions with events to extract genre and crowd preferences.
+        Fold in interactions that aren't counted yet: settled ones with one
+        grouped aggregate over event_interactions LEFT JOIN events, recent
+        ones (and recent_interaction_ids) row by row.
+
+        last_interaction_id then moves up to the newest settled id, and the
+        folded ids above it are kept in recent_interaction_ids. A lower id
+        committed after a higher one is still above the watermark when it
+        shows up, so it is folded in on the next load instead of skipped.
+
+        Returns:
+            True if the profile changed.
         """
-        # Load all interactions for this user
-        interactions = (
-            self.db.query(EventInteraction)
-            .filter(EventInteraction.user_id == self.user_id)
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=INTERACTION_SETTLE_SECONDS)
+        recent = EventInteraction.timestamp > cutoff
+        unseen = [
+            EventInteraction.user_id == self.user_id,
+            EventInteraction.id > self.last_interaction_id,
+        ]
+        folded = set(self.recent_interaction_ids)
+
+        settled_groups = (
+            db.query(
+                EventInteraction.interaction_type,
+                Event.genre,
+                Event.crowd_level,
+                func.count(EventInteraction.id),
+                func.max(EventInteraction.id),
+            )
+            .outerjoin(Event, Event.id == EventInteraction.event_id)
+            .filter(
+                *unseen,
+                or_(EventInteraction.timestamp.is_(None), EventInteraction.timestamp <= cutoff),
+                EventInteraction.id.notin_(folded),
+            )
+            .group_by(EventInteraction.interaction_type, Event.genre, Event.crowd_level)
+            .all()
+        )
+        recent_rows = (
+            db.query(
+                EventInteraction.id,
+                EventInteraction.interaction_type,
+                Event.genre,
+                Event.crowd_level,
+                case((recent, True), else_=False),
+            )
+            .outerjoin(Event, Event.id == EventInteraction.event_id)
+            .filter(*unseen, or_(recent, EventInteraction.id.in_(folded)))
             .all()
         )
 
-        if not interactions:
-            return
+        watermark = self.last_interaction_id
+        for interaction_type, genre, crowd_level, count, max_id in settled_groups:
+            self.apply_interaction(interaction_type, genre, crowd_level, count)
+            watermark = max(watermark, max_id)
+
+        for interaction_id, interaction_type, genre, crowd_level, is_recent in recent_rows:
+            if interaction_id not in folded:
+                self.apply_interaction(interaction_type, genre, crowd_level)
+                folded.add(interaction_id)
+            if not is_recent:
+                watermark = max(watermark, interaction_id)
 
-        # Collect event IDs so we can batch-load events
-        event_ids = [i.event_id for i in interactions]
+        folded = {interaction_id for interaction_id in folded if interaction_id > watermark}
+        changed = watermark != self.last_interaction_id or folded != self.recent_interaction_ids
+        self.last_interaction_id    = watermark
+        self.recent_interaction_ids = folded
+        return changed
+
+    def _save(self, db: Session, row: UserProfile | None, overwrite: bool = False):
+        """
+        Write the profile back to user_profiles. Another worker may have
+        advanced the row concurrently — an update only lands if it doesn't
+        move last_interaction_id back (or overwrite is set), and a lost insert
+        race is ignored since the winner's row catches up on its next load.
+
+        Runs in its own session and transaction, so loading a profile never
+        commits the caller's session. A failed write only costs the cached
+        aggregate — the next load folds the same interactions in again.
+        That is also why a load skips the write when PROFILE_WRITE_CONCURRENCY
+        writes are already running: waiting for a second pooled connection
+        while holding the caller's can exhaust the pool under load.
+        Rebuilds (overwrite) always wait their turn.
+        """
+        if not _write_slots.acquire(blocking=overwrite):
+            return
 
-        # Load matching events from DB
-        events_by_id = {
-            e.id: e
-            for e in self.db.query(Event).filter(Event.id.in_(event_ids)).all()
+        values = {
+            "genre_bias":             dict(self.genre_bias),
+            "crowd_bias":             self._raw_crowd_bias,
+            "interest_count":         self.interest_count,
+            "dislike_count":          self.dislike_count,
+            "last_interaction_id":    self.last_interaction_id,
+            "recent_interaction_ids": sorted(self.recent_interaction_ids),
         }
 
-        for interaction in interactions:
-            event = events_by_id.get(interaction.event_id)
-            itype = interaction.interaction_type
+        session = Session(bind=db.get_bind())
+        try:
+            if row is None:
+                session.add(UserProfile(user_id=self.user_id, **values))
+            else:
+                query = session.query(UserProfile).filter(UserProfile.user_id == self.user_id)
+                if not overwrite:
+                    query = query.filter(UserProfile.last_interaction_id <= self.last_interaction_id)
+                query.update(values, synchronize_session=False)
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"[UserProfile] Could not save profile for user {self.user_id}: {e}")
+        finally:
+            session.close()
+            _write_slots.release()
 
-            if itype == "INTERESTED":
-                self.interest_count += 1
-                if event and event.genre:
-                    self.genre_bias[event.genre] += self.INTEREST_WEIGHT
-                if event and event.crowd_level == "LOW":
-                    self.crowd_bias += self.CROWD_BOOST
+    def apply_interaction(
+        self,
+        interaction_type: str,
+        genre: str | None,
+        crowd_level: str | None,
+        count: int = 1,
+    ):
+        """
+        Fold `count` identical interactions into the profile.
 
-            elif itype == "NOT_INTERESTED":
-                self.dislike_count += 1
-                if event and event.genre:
-                    self.genre_bias[event.genre] += self.DISLIKE_WEIGHT
-                if event and event.crowd_level == "HIGH":
-                    self.crowd_bias += self.CROWD_PENALTY
+        Args:
+            interaction_type: INTERESTED or NOT_INTERESTED (anything else is ignored)
+            genre: Genre of the interacted event (None if unknown or deleted)
+            crowd_level: Crowd level of the interacted event (None if deleted)
+            count: Number of interactions with this (type, genre, crowd level)
+        """
+        if interaction_type == "INTERESTED":
+            self.interest_count += count
+            if genre:
+                self.genre_bias[genre] += self.INTEREST_WEIGHT * count
+            if crowd_level == "LOW":
+                self._raw_crowd_bias += self.CROWD_BOOST * count
 
-        # Clamp crowd_bias to a reasonable range so it
-        # doesn't dominate the relevance score
-        self.crowd_bias = max(-0.3, min(0.3, self.crowd_bias))
+        elif interaction_type == "NOT_INTERESTED":
+            self.dislike_count += count
+            if genre:
+                self.genre_bias[genre] += self.DISLIKE_WEIGHT * count
+            if crowd_level == "HIGH":
+                self._raw_crowd_bias += self.CROWD_PENALTY * count
 
     def summary(self) -> dict:
         """Return a readable summary of the profile — useful for debugging."""
         return {
-            "user_id":       self.user_id,
-            "interest_count": self.interest_count,
-            "dislike_count":  self.dislike_count,
-            "genre_bias":     dict(self.genre_bias),
-            "crowd_bias":     self.crowd_bias,
+            "user_id":                self.user_id,
+            "interest_count":         self.interest_count,
+            "dislike_count":          self.dislike_count,
+            "genre_bias":             dict(self.genre_bias),
+            "crowd_bias":             self.crowd_bias,
+            "last_interaction_id":    self.last_interaction_id,
+            "recent_interaction_ids": sorted(self.recent_interaction_ids),
         }
+
+
+# ------------------------------------------------------------------
+# Profile cache — one built profile per recently active user
+# ------------------------------------------------------------------
+
+profile_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl_seconds=PROFILE_CACHE_TTL_SECONDS)
+
+# Serialises in-place updates of cached profiles
+_update_lock = threading.Lock()
+
+# Event ids per IN (...) lookup in rebuild_profiles_for_events
+REBUILD_LOOKUP_CHUNK_SIZE = 1000
+
+
+def get_user_profile(db: Session, user_id: int) -> UserPreferenceProfile:
+    """
+    Return the user's profile from the cache, building and caching it on a miss.
+
+    Cached profiles are shared between requests — treat them as read-only and
+    go through record_interaction() to change them.
+    """
+    profile = profile_cache.get(user_id)
+    if profile is None:
+        profile = UserPreferenceProfile(db, user_id)
+        profile_cache.set(user_id, profile)
+    return profile
+
+
+def record_interaction(db: Session, interaction: EventInteraction):
+    """
+    Apply a newly logged interaction to the user's cached profile, if any.
+    Users without a cached profile are left alone — their next
+    get_user_profile() call loads from user_profiles, new row included.
+    The materialized row itself catches up on that next load.
+    """
+    profile = profile_cache.get(interaction.user_id)
+    if profile is None or profile.has_folded(interaction.id):
+        return
+
+    event = db.query(Event).filter(Event.id == interaction.event_id).first()
+    with _update_lock:
+        if profile.has_folded(interaction.id):
+            return
+        profile.apply_interaction(
+            interaction.interaction_type,
+            event.genre if event else None,
+            event.crowd_level if event else None,
+        )
+        # Ids may arrive out of order — remember this one rather than
+        # moving the watermark past lower ids not logged yet
+        profile.recent_interaction_ids.add(interaction.id)
+
+
+def rebuild_profiles_for_events(db: Session, event_ids: list[str]) -> int:
+    """
+    Rebuild the materialized profiles of users who interacted with any of
+    these events, and drop them from the cache. Needed after the events'
+    genre or crowd level changed, since aggregated interactions keep the
+    values they were counted under.
+
+    Returns:
+        Number of profiles rebuilt.
+    """
+    user_ids = set()
+    for i in range(0, len(event_ids), REBUILD_LOOKUP_CHUNK_SIZE):
+        chunk = event_ids[i:i + REBUILD_LOOKUP_CHUNK_SIZE]
+        user_ids.update(
+            user_id for (user_id,) in
+            db.query(EventInteraction.user_id).filter(EventInteraction.event_id.in_(chunk)).distinct()
+        )
+
+    for user_id in sorted(user_ids):
+        profile_cache.pop(user_id)
+        UserPreferenceProfile(db, user_id, rebuild=True)
+
+    return len(user_ids)
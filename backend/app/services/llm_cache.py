@@ -0,0 +1,163 @@
+"""
+Cache of parsed chat preferences, keyed by normalized query text.
+
+Chat users repeat the same searches ("music events near me"), and every
+uncached one costs a full LLM generation. interpret_with_llm() checks this
+cache first and stores each successful LLM parse in it.
+
+Two tiers:
+    memory — TTLCache bounded by entry count and estimated bytes
+    disk   — optional SQLite file (LLM_CACHE_PATH) so a restart keeps
+             the warm cache; hits are promoted back into memory
+
+Usage:
+    from app.services.llm_cache import interpret_cache
+    parsed = interpret_cache.get(message)
+"""
+
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import (
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_PATH,
+    LLM_CACHE_SIZE,
+    LLM_CACHE_TTL_SECONDS,
+)
+from app.utils.text import normalize_text
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+def _entry_size(key: str, value: dict) -> int:
+    """Rough in-memory footprint of one entry, for the byte bound."""
+    return len(key) + len(json.dumps(value)) + 200
+
+
+# ------------------------------------------------------------------
+# Disk tier
+# ------------------------------------------------------------------
+
+class _DiskTier:
+    """SQLite table of normalized query → JSON result, with stored-at time."""
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path        = path
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS interpret_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "DELETE FROM interpret_cache WHERE stored_at < ?",
+                (time.time() - ttl_seconds,),
+            )
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM interpret_cache WHERE key = ? AND stored_at >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO interpret_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM interpret_cache")
+
+
+# ------------------------------------------------------------------
+# Cache
+# ------------------------------------------------------------------
+
+class InterpretCache:
+    """
+    Two-tier cache of interpret_with_llm() results.
+
+    Args:
+        maxsize: Maximum entries in memory
+        max_bytes: Maximum estimated bytes in memory
+        ttl_seconds: Lifetime of an entry in either tier
+        path: SQLite file for the disk tier ("" = memory only)
+    """
+
+    def __init__(
+        self,
+        maxsize: int = LLM_CACHE_SIZE,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        path: str = LLM_CACHE_PATH,
+    ):
+        self.memory = TTLCache(maxsize, ttl_seconds, max_bytes=max_bytes, sizeof=_entry_size)
+
+        self.disk_hits = 0
+        self._disk: _DiskTier | None = None
+        if path:
+            try:
+                self._disk = _DiskTier(path, ttl_seconds)
+            except sqlite3.Error as e:
+                logger.warning(f"[LLMCache] Disk tier disabled — could not open {path}: {e}")
+
+    def get(self, message: str) -> dict | None:
+        """Return a copy of the cached result for message, or None."""
+        key = normalize_text(message)   # case, spacing and punctuation share an entry
+        if not key:
+            return None
+
+        result = self.memory.get(key)
+        if result is None and self._disk is not None:
+            result = self._disk_call("get", key)
+            if result is not None:
+                self.disk_hits += 1
+                self.memory.set(key, result)
+
+        return copy.deepcopy(result) if result is not None else None
+
+    def set(self, message: str, result: dict) -> None:
+        key = normalize_text(message)
+        if not key:
+            return
+
+        result = copy.deepcopy(result)
+        self.memory.set(key, result)
+        if self._disk is not None:
+            self._disk_call("set", key, result)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self._disk is not None:
+            self._disk_call("clear")
+
+    def stats(self) -> dict:
+        """Memory-tier counters plus disk-tier hits (lookups that missed memory)."""
+        return {
+            **self.memory.stats(),
+            "disk_enabled": self._disk is not None,
+            "disk_hits":    self.disk_hits,
+        }
+
+    def _disk_call(self, method: str, *args):
+        """Disk-tier call that degrades to a miss instead of failing the request."""
+        try:
+            return getattr(self._disk, method)(*args)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"[LLMCache] Disk tier {method} failed: {e}")
+            return None
+
+
+interpret_cache = InterpretCache()
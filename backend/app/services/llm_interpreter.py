@@ -4,11 +4,22 @@ Converts user messages into structured JSON preference objects.
 """
 
 import requests
+import httpx
 import json
 import re
-
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL = "qwen2.5:1.5b"
+import threading
+
+from app.core.config import CHAT_FAST_PATH_ENABLED, CHAT_FAST_PATH_MIN_CONFIDENCE
+from app.services.llm_cache import interpret_cache
+from app.services.ollama_client import ollama_client
+from app.utils.keyword_matcher import KeywordMatcher
+
+# Sampling options for preference extraction
+GENERATE_OPTIONS = {
+    "temperature": 0,
+    "top_p": 0.1,
+    "stop": ["\n\n", "User:", "Human:", "Assistant:"]
+}
 
 SYSTEM_PROMPT = """You are a JSON-only data extraction engine. You never write sentences or explanations.
 
@@ -56,6 +67,8 @@ Output:"""
 def interpret_with_llm(message: str) -> dict:
     """
     Extract structured event preferences from a natural language user message.
+    Clear queries are answered by the rule parser without the LLM (see
+    _try_fast_path); repeated ones come from interpret_cache.
 
     Args:
         message: Raw user input string.
@@ -65,47 +78,20 @@ def interpret_with_llm(message: str) -> dict:
         food_preference, weight_emphasis, needs_clarification,
         follow_up_question, confidence.
     """
-    formatted_prompt = SYSTEM_PROMPT.replace("{user_query}", message)
-
-    payload = {
-        "model": MODEL,
-        "prompt": formatted_prompt,
-        "stream": False,
-        "format": "json",
-        "options": {
-            "temperature": 0,
-            "top_p": 0.1,
-            "stop": ["\n\n", "User:", "Human:", "Assistant:"]
-        }
-    }
+    shortcut = interpret_without_llm(message)
+    if shortcut is not None:
+        return shortcut
 
     try:
         print(f"[LLM] Sending query: {message}")
-        response = requests.post(OLLAMA_URL, json=payload, timeout=30)
-        response.raise_for_status()
-
-        raw = response.json()
-        print(f"[LLM] Raw response: {raw}")
-
-        text = raw.get("response", "").strip()
-        print(f"[LLM] Text response: {text}")
-
-        if text:
-            # Attempt 1: direct parse
-            try:
-                parsed = json.loads(text)
-                return _build_result(parsed)
-            except json.JSONDecodeError:
-                pass
-
-            # Attempt 2: extract JSON block from text
-            json_match = re.search(r'\{.*\}', text, re.DOTALL)
-            if json_match:
-                try:
-                    parsed = json.loads(json_match.group())
-                    return _build_result(parsed)
-                except json.JSONDecodeError:
-                    pass
+        raw = ollama_client.generate(
+            _build_prompt(message), purpose="interpret", format="json", options=GENERATE_OPTIONS
+        )
+
+        result = _parse_response(raw)
+        if result is not None:
+            interpret_cache.set(message, result)
+            return result
 
         print("[LLM] Could not parse LLM response, falling back to manual parser.")
 
@@ -119,6 +105,130 @@ def interpret_with_llm(message: str) -> dict:
     return manual_fallback_parse(message)
 
 
+async def interpret_with_llm_async(message: str, stream: bool = False) -> dict:
+    """
+    Async interpret_with_llm() — awaits Ollama on the shared async client
+    so the event loop keeps serving other requests while the model runs.
+
+    Args:
+        message: Raw user input string.
+        stream: See ask_llm_async().
+    """
+    shortcut = interpret_without_llm(message)
+    if shortcut is not None:
+        return shortcut
+    return await ask_llm_async(message, stream=stream)
+
+
+def interpret_without_llm(message: str) -> dict | None:
+    """
+    The answer interpret_with_llm() would give without calling the LLM —
+    from the rule fast path or the cache — or None if it needs the LLM.
+    """
+    if CHAT_FAST_PATH_ENABLED:
+        fast = _try_fast_path(message)
+        if fast is not None:
+            return fast
+
+    cached = interpret_cache.get(message)
+    if cached is not None:
+        print(f"[LLM] Cache hit: {message}")
+    return cached
+
+
+async def ask_llm_async(message: str, stream: bool = False) -> dict:
+    """
+    Interpret message with the LLM itself (no fast path or cache lookup),
+    caching a successful parse. Falls back to the rule parser on failure.
+
+    Args:
+        message: Raw user input string.
+        stream: Use Ollama's streaming mode and stop reading as soon as a
+                complete JSON object has arrived, instead of waiting for
+                the model to finish (it can pad JSON output with whitespace).
+    """
+    try:
+        print(f"[LLM] Sending query: {message}")
+        if stream:
+            text = await ollama_client.astream_text(
+                _build_prompt(message),
+                purpose="interpret",
+                format="json",
+                options=GENERATE_OPTIONS,
+                until=_is_complete_json,
+            )
+            raw = {"response": text}
+        else:
+            raw = await ollama_client.agenerate(
+                _build_prompt(message), purpose="interpret", format="json", options=GENERATE_OPTIONS
+            )
+
+        result = _parse_response(raw)
+        if result is not None:
+            interpret_cache.set(message, result)
+            return result
+
+        print("[LLM] Could not parse LLM response, falling back to manual parser.")
+
+    except httpx.TimeoutException:
+        print("[LLM] Request timed out.")
+    except httpx.ConnectError:
+        print("[LLM] Could not connect to Ollama. Is it running?")
+    except Exception as e:
+        print(f"[LLM] Unexpected error: {e}")
+
+    return manual_fallback_parse(message)
+
+
+def _is_complete_json(text: str) -> bool:
+    """True once streamed text holds a whole JSON object."""
+    text = text.strip()
+    if not text.endswith("}"):
+        return False
+    try:
+        json.loads(text)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+def _build_prompt(message: str) -> str:
+    """Extraction prompt for a user query."""
+    return SYSTEM_PROMPT.replace("{user_query}", message)
+
+
+def _parse_response(raw: dict) -> dict | None:
+    """
+    Turn an Ollama response body into a preference dict.
+    Returns None if no JSON object can be recovered from the text.
+    """
+    print(f"[LLM] Raw response: {raw}")
+
+    text = raw.get("response", "").strip()
+    print(f"[LLM] Text response: {text}")
+
+    if not text:
+        return None
+
+    # Attempt 1: direct parse
+    try:
+        parsed = json.loads(text)
+        return _build_result(parsed)
+    except json.JSONDecodeError:
+        pass
+
+    # Attempt 2: extract JSON block from text
+    json_match = re.search(r'\{.*\}', text, re.DOTALL)
+    if json_match:
+        try:
+            parsed = json.loads(json_match.group())
+            return _build_result(parsed)
+        except json.JSONDecodeError:
+            pass
+
+    return None
+
+
 def _build_result(parsed: dict) -> dict:
     """
     Normalize and validate a parsed LLM JSON response.
@@ -161,13 +271,119 @@ def _build_result(parsed: dict) -> dict:
     return result
 
 
+# ------------------------------------------------------------------
+# Rule-based parser — LLM fallback and confidence-gated fast path
+# ------------------------------------------------------------------
+
+BUDGET_RE = re.compile(r'budget\s*(?:of\s*)?\$?(\d+)')
+DOLLAR_RE = re.compile(r'\$(\d+)')
+UNDER_RE  = re.compile(r'under\s*\$?(\d+)')
+
+# Negations change what a keyword means ("no music", "not far") and the
+# rules cannot read them — such queries always go to the LLM
+NEGATION_RE = re.compile(r"\b(?:not|no|dont|don't|without|except|never|avoid)\b")
+
+GENRE_MAP = {
+    "music": ["music", "concert", "gig", "band", "live music"],
+    "tech": ["tech", "technology", "coding", "startup", "hackathon", "developer"],
+    "food": ["food festival", "food fair", "food event"],
+    "sports": ["sports", "run", "marathon", "football", "basketball", "fitness"],
+    "business": ["business", "expo", "networking", "conference", "summit"],
+    "art": ["art", "gallery", "exhibition", "museum"],
+    "comedy": ["comedy", "stand-up", "standup"],
+}
+
+FOOD_TYPES = ["bbq", "pizza", "snacks", "healthy", "cocktails", "buffet",
+              "international", "vegan", "vegetarian", "seafood", "street food"]
+
+NEAR_WORDS = ["near", "nearby", "around", "close", "local"]
+FAR_WORDS  = ["far", "away", "outside", "travel"]
+
+# Every keyword the rules look for, matched in a single pass
+_RULE_MATCHER = KeywordMatcher(
+    [kw for keywords in GENRE_MAP.values() for kw in keywords]
+    + FOOD_TYPES + NEAR_WORDS + FAR_WORDS + ["cheap", "free", "food"]
+)
+
+# Chat traffic counters for the fast path (see fast_path_stats)
+_fast_path_lock   = threading.Lock()
+_fast_path_counts = {"queries": 0, "bypassed": 0, "negation": 0, "ambiguous": 0, "low_confidence": 0}
+
+
 def manual_fallback_parse(message: str) -> dict:
     """
     Rule-based fallback parser used when the LLM fails to return valid JSON.
     Covers common patterns: budget keywords, genre keywords, distance, food types.
     """
     message_lower = message.lower()
+    return _rule_parse(message_lower, _RULE_MATCHER.matched(message_lower))
 
+
+def fast_path_stats() -> dict:
+    """How much chat traffic the rule fast path answered without the LLM, and why the rest didn't."""
+    with _fast_path_lock:
+        counts = dict(_fast_path_counts)
+    counts["bypass_fraction"] = (
+        round(counts["bypassed"] / counts["queries"], 3) if counts["queries"] else 0.0
+    )
+    return counts
+
+
+def _try_fast_path(message: str) -> dict | None:
+    """
+    Answer from the rule parser alone when it is trustworthy enough to skip
+    the LLM. Returns None (ask the LLM) when:
+        - the message contains a negation
+        - a keyword only matched inside another word ("art" in "party"),
+          i.e. whole-word and substring readings of the rules disagree
+        - the signal-based confidence is below CHAT_FAST_PATH_MIN_CONFIDENCE
+    """
+    message_lower = message.lower()
+
+    if NEGATION_RE.search(message_lower):
+        outcome, result = "negation", None
+    else:
+        hits   = _RULE_MATCHER.find(message_lower)
+        result = _rule_parse(message_lower, {hit.keyword for hit in hits})
+        strict = _rule_parse(message_lower, {hit.keyword for hit in hits if hit.whole_word})
+
+        if result != strict:
+            outcome, result = "ambiguous", None
+        else:
+            result["confidence"] = _rule_confidence(result)
+            if result["confidence"] < CHAT_FAST_PATH_MIN_CONFIDENCE:
+                outcome, result = "low_confidence", None
+            else:
+                outcome = "bypassed"
+
+    with _fast_path_lock:
+        _fast_path_counts["queries"] += 1
+        _fast_path_counts[outcome]   += 1
+
+    if result is not None:
+        print(f"[LLM] Rule fast path: {message} → {result}")
+    return result
+
+
+def _rule_confidence(result: dict) -> float:
+    """0.55 for one extracted slot (budget, genres, distance, food), +0.1 per extra slot."""
+    signals = sum([
+        result["budget"] is not None,
+        bool(result["preferred_genres"]),
+        result["distance_preference"] is not None,
+        result["food_preference"] is not None,
+    ])
+    return round(0.45 + 0.1 * signals, 2) if signals else 0.2
+
+
+def _rule_parse(message_lower: str, found: set[str]) -> dict:
+    """
+    Apply the parsing rules to a lowercased message.
+
+    Args:
+        message_lower: Lowercased user message (for the budget regexes)
+        found: Keywords from _RULE_MATCHER present in the message
+    """
     result = {
         "budget": None,
         "preferred_genres": [],
@@ -180,9 +396,9 @@ def manual_fallback_parse(message: str) -> dict:
     }
 
     # --- Budget ---
-    budget_match = re.search(r'budget\s*(?:of\s*)?\$?(\d+)', message_lower)
-    dollar_match = re.search(r'\$(\d+)', message_lower)
-    under_match = re.search(r'under\s*\$?(\d+)', message_lower)
+    budget_match = BUDGET_RE.search(message_lower)
+    dollar_match = DOLLAR_RE.search(message_lower)
+    under_match = UNDER_RE.search(message_lower)
 
     if budget_match:
         result["budget"] = float(budget_match.group(1))
@@ -190,28 +406,18 @@ def manual_fallback_parse(message: str) -> dict:
         result["budget"] = float(dollar_match.group(1))
     elif under_match:
         result["budget"] = float(under_match.group(1))
-    elif "cheap" in message_lower:
+    elif "cheap" in found:
         result["budget"] = 30.0
-    elif "free" in message_lower:
+    elif "free" in found:
         result["budget"] = 0.0
 
-    if result["budget"] is not None or "cheap" in message_lower or "free" in message_lower:
+    if result["budget"] is not None or "cheap" in found or "free" in found:
         result["weight_emphasis"] = "budget"
 
     # --- Genres ---
-    genre_map = {
-        "music": ["music", "concert", "gig", "band", "live music"],
-        "tech": ["tech", "technology", "coding", "startup", "hackathon", "developer"],
-        "food": ["food festival", "food fair", "food event"],
-        "sports": ["sports", "run", "marathon", "football", "basketball", "fitness"],
-        "business": ["business", "expo", "networking", "conference", "summit"],
-        "art": ["art", "gallery", "exhibition", "museum"],
-        "comedy": ["comedy", "stand-up", "standup"],
-    }
-
     genres = []
-    for genre, keywords in genre_map.items():
-        if any(kw in message_lower for kw in keywords):
+    for genre, keywords in GENRE_MAP.items():
+        if any(kw in found for kw in keywords):
             genres.append(genre)
 
     result["preferred_genres"] = genres
@@ -219,20 +425,18 @@ def manual_fallback_parse(message: str) -> dict:
         result["weight_emphasis"] = "genre"
 
     # --- Distance ---
-    if any(w in message_lower for w in ["near", "nearby", "around", "close", "local"]):
+    if any(w in found for w in NEAR_WORDS):
         result["distance_preference"] = "near"
-    elif any(w in message_lower for w in ["far", "away", "outside", "travel"]):
+    elif any(w in found for w in FAR_WORDS):
         result["distance_preference"] = "far"
 
     # --- Food preference ---
-    food_types = ["bbq", "pizza", "snacks", "healthy", "cocktails", "buffet",
-                  "international", "vegan", "vegetarian", "seafood", "street food"]
-    for food in food_types:
-        if food in message_lower:
+    for food in FOOD_TYPES:
+        if food in found:
             result["food_preference"] = food
             break
 
-    if "food" in message_lower and not result["food_preference"]:
+    if "food" in found and not result["food_preference"]:
         result["food_preference"] = "any"
 
     # --- Determine if clarification still needed ---
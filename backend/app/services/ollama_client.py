@@ -0,0 +1,350 @@
+"""
+Shared Ollama client.
+
+Every call to the local LLM goes through the module-level `ollama_client`:
+one keep-alive connection pool (requests.Session for sync callers,
+httpx.AsyncClient for async ones), one cap on concurrent generations
+shared by both, and latency/failure metrics per call site.
+
+Usage:
+    from app.services.ollama_client import ollama_client
+    body = ollama_client.generate("hi", purpose="warmup")
+    text = body["response"]
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import (
+    OLLAMA_BASE_URL,
+    OLLAMA_CONNECT_TIMEOUT_SECONDS,
+    OLLAMA_MAX_CONCURRENCY,
+    OLLAMA_MODEL,
+    OLLAMA_READ_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_URL = f"{OLLAMA_BASE_URL}/api/generate"
+MODEL      = OLLAMA_MODEL
+
+
+# ------------------------------------------------------------------
+# Metrics
+# ------------------------------------------------------------------
+
+class OllamaMetrics:
+    """Request counts and latency per purpose (call site), thread-safe."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def record(self, purpose: str, seconds: float, ok: bool, timed_out: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(purpose, {
+                "requests":      0,
+                "failures":      0,
+                "timeouts":      0,
+                "total_seconds": 0.0,
+                "max_seconds":   0.0,
+            })
+            stats["requests"]      += 1
+            stats["failures"]      += 0 if ok else 1
+            stats["timeouts"]      += 1 if timed_out else 0
+            stats["total_seconds"] += seconds
+            stats["max_seconds"]    = max(stats["max_seconds"], seconds)
+
+    def snapshot(self) -> dict:
+        """Return a copy of the metrics with average latency added."""
+        with self._lock:
+            return {
+                purpose: {
+                    **stats,
+                    "total_seconds": round(stats["total_seconds"], 3),
+                    "max_seconds":   round(stats["max_seconds"], 3),
+                    "avg_seconds":   round(stats["total_seconds"] / stats["requests"], 3),
+                }
+                for purpose, stats in self._stats.items()
+            }
+
+
+# ------------------------------------------------------------------
+# Concurrency limit
+# ------------------------------------------------------------------
+
+class GenerationSlots:
+    """
+    Counting semaphore shared by threads and coroutines, so sync and async
+    callers draw on one budget of generations in flight. Waiters are served
+    first come, first served; async waiters never block the event loop.
+
+    Use `with slots:` from threads and `async with slots:` from coroutines.
+    """
+
+    def __init__(self, value: int):
+        self._lock    = threading.Lock()
+        self._free    = value
+        self._waiters = deque()   # threading.Event | (loop, future)
+
+    def acquire(self) -> None:
+        """Take a slot, blocking the calling thread until one is free."""
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()   # release() hands its slot straight to us
+
+    async def aacquire(self) -> None:
+        """Take a slot, suspending the calling coroutine until one is free."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                # else a slot is already on its way — _hand_over passes it on
+            raise
+
+    def release(self) -> None:
+        """Give a slot back, handing it to the longest waiter if any."""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:
+                    continue   # loop already closed — try the next waiter
+            self._free += 1
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        """Runs on the waiter's loop: wake it, or pass the slot on if it gave up."""
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self):
+        await self.aacquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+# ------------------------------------------------------------------
+# Client
+# ------------------------------------------------------------------
+
+class OllamaClient:
+    """
+    Pooled, concurrency-limited client for Ollama's /api/generate.
+
+    Errors are not swallowed: sync calls raise requests exceptions and
+    async calls raise httpx exceptions, so callers keep their own fallbacks.
+
+    Args:
+        url: Full /api/generate URL
+        model: Model name sent with every request
+        max_concurrency: Generations in flight at once, sync and async
+                         callers combined (and the size of each pool)
+        connect_timeout: Seconds to establish a connection
+        read_timeout: Default seconds to wait for a response
+    """
+
+    def __init__(
+        self,
+        url: str = OLLAMA_URL,
+        model: str = MODEL,
+        max_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = OLLAMA_READ_TIMEOUT_SECONDS,
+    ):
+        self.url             = url
+        self.model           = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.connect_timeout = connect_timeout
+        self.read_timeout    = read_timeout
+        self.metrics         = OllamaMetrics()
+
+        self._session = requests.Session()
+        self._session.mount(self.url, HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_concurrency
+        ))
+        self._slots = GenerationSlots(self.max_concurrency)
+
+        # Created on first async call, inside the running event loop
+        self._async_client: httpx.AsyncClient | None = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def generate(
+        self,
+        prompt: str,
+        purpose: str = "generate",
+        format: str | None = None,
+        options: dict | None = None,
+        timeout: float | None = None,
+    ) -> dict:
+        """
+        Run a non-streaming generation and return Ollama's JSON body.
+
+        Args:
+            prompt: Full prompt text
+            purpose: Metrics label for the call site (e.g. "interpret")
+            format: "json" to constrain output to JSON
+            options: Ollama sampling options (temperature, stop, ...)
+            timeout: Read timeout override in seconds
+        """
+        payload = self._payload(prompt, format, options)
+
+        with self._slots, self._timed(purpose, (requests.exceptions.Timeout,)):
+            response = self._session.post(
+                self.url,
+                json=payload,
+                timeout=(self.connect_timeout, timeout or self.read_timeout),
+            )
+            response.raise_for_status()
+            return response.json()
+
+    async def agenerate(
+        self,
+        prompt: str,
+        purpose: str = "generate",
+        format: str | None = None,
+        options: dict | None = None,
+        timeout: float | None = None,
+    ) -> dict:
+        """Async generate() on a pooled httpx.AsyncClient."""
+        payload = self._payload(prompt, format, options)
+        client  = self._async()
+
+        async with self._slots:
+            with self._timed(purpose, (httpx.TimeoutException,)):
+                response = await client.post(
+                    self.url,
+                    json=payload,
+                    timeout=httpx.Timeout(timeout or self.read_timeout, connect=self.connect_timeout),
+                )
+                response.raise_for_status()
+                return response.json()
+
+    async def astream_text(
+        self,
+        prompt: str,
+        purpose: str = "generate",
+        format: str | None = None,
+        options: dict | None = None,
+        timeout: float | None = None,
+        until: Callable[[str], bool] | None = None,
+    ) -> str:
+        """
+        Async streaming generation ("stream": true) — returns the generated text.
+
+        The read timeout applies per streamed chunk rather than to the whole
+        generation. If `until` is given, it is called with the text so far
+        after every chunk, and the stream is closed as soon as it returns
+        True (e.g. once a complete JSON object has arrived).
+        """
+        payload = self._payload(prompt, format, options, stream=True)
+        client  = self._async()
+        text    = ""
+
+        async with self._slots:
+            with self._timed(purpose, (httpx.TimeoutException,)):
+                async with client.stream(
+                    "POST",
+                    self.url,
+                    json=payload,
+                    timeout=httpx.Timeout(timeout or self.read_timeout, connect=self.connect_timeout),
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        text += chunk.get("response", "")
+                        if chunk.get("done") or (until is not None and until(text)):
+                            break
+        return text
+
+    async def aclose(self):
+        """Close the async connection pool (called on shutdown)."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _payload(
+        self,
+        prompt: str,
+        format: str | None,
+        options: dict | None,
+        stream: bool = False,
+    ) -> dict:
+        payload = {"model": self.model, "prompt": prompt, "stream": stream}
+        if format:
+            payload["format"] = format
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _async(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ))
+        return self._async_client
+
+    @contextmanager
+    def _timed(self, purpose: str, timeout_errors: tuple):
+        started = time.perf_counter()
+        try:
+            yield
+        except timeout_errors:
+            self.metrics.record(purpose, time.perf_counter() - started, ok=False, timed_out=True)
+            raise
+        except Exception:
+            self.metrics.record(purpose, time.perf_counter() - started, ok=False)
+            raise
+        self.metrics.record(purpose, time.perf_counter() - started, ok=True)
+
+
+ollama_client = OllamaClient()
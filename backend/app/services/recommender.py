@@ -1,17 +1,36 @@
 """
 Content-based event recommendation engine.
-Loads events from PostgreSQL and ranks them using weighted relevance scoring.
+Scores events from the in-memory event catalog (or a prefiltered PostgreSQL
+query when the catalog is disabled) and ranks them using weighted relevance scoring.
 """
 
+from datetime import date, datetime
 from typing import List, Dict
 
-from app.services.scoring import ScoringEngine
-from app.services.learning.user_profile import UserPreferenceProfile
+import numpy as np
+
+from app.core.config import EVENT_CATALOG_ENABLED
+from app.services.crowd import CrowdEstimator
+from app.services.event_catalog import CatalogSnapshot, event_catalog, query_candidates
+from app.services.scoring import ScoringEngine, map_unique
+from app.services.learning.user_profile import UserPreferenceProfile, get_user_profile
+from app.utils.distance import haversine_distance
 
 
 class EventRecommender:
     """Recommends events based on user preferences using content-based scoring."""
 
+    # Candidate sets larger than this are scored with ScoringEngine.score_batch
+    BATCH_SCORING_THRESHOLD = 200
+
+    # Results below this (rounded) relevance score are never returned
+    MIN_SCORE = 0.3
+
+    # Most np.round can differ from Python round() — one unit in the last
+    # place of relevance_score (3 dp) and distance_km (1 dp) — plus float slack
+    RELEVANCE_SLACK = 0.0015
+    DISTANCE_SLACK  = 0.15
+
     def __init__(self, db=None):
         """
         Args:
@@ -49,161 +68,467 @@ class EventRecommender:
             List of recommendation dicts with event, relevance_score,
             distance_km, explanation, and score_breakdown.
         """
-        from app.utils.distance import haversine_distance
-        from app.models.event import Event
+        # One "today" for the whole request, so scores agree across midnight
+        today = datetime.utcnow().date()
 
-        # --- Load events from DB ---
-        events = self.db.query(Event).all()
+        # --- Load scoring columns (in-memory catalog or prefiltered DB query) ---
+        catalog = self._load_catalog(user_preferences, max_distance_km)
 
-        if not events:
+        if not len(catalog):
             return []
 
+        # --- Crowd levels from interest counts (prefiltered candidates only) ---
+        if not EVENT_CATALOG_ENABLED:
+            catalog = self._apply_crowd_estimates(catalog)
+
         # --- Optionally load user profile ---
         profile = None
         if user_id and self.db:
             try:
-                profile = UserPreferenceProfile(self.db, user_id)
+                profile = get_user_profile(self.db, user_id)
             except Exception as e:
                 print(f"[Recommender] Could not load user profile: {e}")
 
-        recommendations = []
+        # --- Score — vectorised for large candidate sets ---
+        if len(catalog) > self.BATCH_SCORING_THRESHOLD:
+            scored = self._score_batch(
+                catalog, user_preferences, profile, max_distance_km, weights, today
+            )
+        else:
+            scored = self._score_each(
+                catalog, user_preferences, profile, max_distance_km, weights, today
+            )
 
-        for event in events:
-            # Skip events with missing location
-            if event.latitude is None or event.longitude is None:
-                continue
+        # Events deleted since the catalog was loaded are found by
+        # _attach_events; their slots are refilled from the next candidates
+        deleted = set()
+        while True:
+            # --- Filter and select the top N for the requested sort order ---
+            candidates = self._select(scored, user_preferences, sort_by, top_n)
+
+            if not candidates:
+                return []
+
+            # --- Describe and attach event details for the returned results only ---
+            results = self._describe(catalog, candidates, user_preferences)
+            results = self._attach_events(results, deleted)
+            if len(results) == len(candidates):
+                return results
+
+            event_catalog.mark_stale()   # drop the deleted rows on the next request
+            scored = self._without_events(scored, catalog, deleted)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    #
+    # Both paths return the same ranking columns: "index" (catalog row),
+    # "score", "distance" and "components" (factor → array), one entry per
+    # event inside the distance cap.
+    # ------------------------------------------------------------------
+
+    def _score_each(
+        self,
+        catalog: CatalogSnapshot,
+        user_preferences: dict,
+        profile: UserPreferenceProfile | None,
+        max_distance_km: float | None,
+        weights: dict | None,
+        today: date,
+    ) -> Dict:
+        """Score events one at a time — used for small candidate sets."""
+        indices, scores, distances = [], [], []
+        components = {}
+
+        for i in range(len(catalog)):
+            event_dict = catalog.event_dict(i)
 
             distance = haversine_distance(
                 user_preferences["latitude"],
                 user_preferences["longitude"],
-                event.latitude,
-                event.longitude,
+                event_dict["latitude"],
+                event_dict["longitude"],
             )
 
             # Hard distance cap
             if max_distance_km is not None and distance > max_distance_km:
                 continue
 
-            # Convert Event model to dict for scoring engine
-            event_dict = {
-                "id":           event.id,
-                "name":         event.name,
-                "genre":        event.genre or "",
-                "ticket_price": event.ticket_price or 0.0,
-                "latitude":     event.latitude,
-                "longitude":    event.longitude,
-                "food_type":    event.food_type or "",
-                "date":         event.date or "",
-                "event_type":   event.event_type or "indoor",
-                "crowd_level":  event.crowd_level or "MEDIUM",
-                "description":  event.description or "",
-            }
-
-            relevance_score, score_breakdown = self.scoring_engine.calculate_relevance_score(
-                event_dict, user_preferences, weights=weights
+            relevance_score, event_components = self.scoring_engine.score_components(
+                event_dict, user_preferences, weights=weights, distance_km=distance, today=today
             )
 
             # --- Personalisation adjustments ---
             if profile:
-                genre_bias = profile.genre_bias.get(event.genre, 0)
+                genre_bias = profile.genre_bias.get(event_dict["genre"], 0)
                 relevance_score += genre_bias * 0.05
 
-                if "crowd" in score_breakdown:
+                if "crowd" in event_components:
                     relevance_score += profile.crowd_bias
 
-            if relevance_score > 0.0:
-                explanation = self._generate_explanation(score_breakdown, relevance_score)
-                recommendations.append({
-                    "event": {
-                        "id":        event.id,
-                        "name":      event.name,
-                        "date":      event.date,
-                        "genre":     event.genre,
-                        "latitude":  event.latitude,
-                        "longitude": event.longitude,
-                        "media": {
-                            "poster_url":    event.poster_url,
-                            "thumbnail_url": event.thumbnail_url,
-                        },
-                        "ticketing": {
-                            "price":      event.ticket_price,
-                            "is_free":    event.is_free,
-                            "ticket_url": event.ticket_url,
-                            "currency":   event.currency,
-                        },
-                        "location": {
-                            "venue_name": event.venue_name,
-                            "address":    event.address,
-                            "city":       event.city,
-                        },
-                        "is_verified": event.is_verified,
-                    },
-                    "relevance_score": round(relevance_score, 3),
-                    "distance_km":     round(distance, 1),
-                    "explanation":     explanation,
-                    "score_breakdown": score_breakdown,
-                })
-                
-                # --- Genre filter — drop mismatches when user specified genres ---
-        preferred_genres = user_preferences.get("preferred_genres", [])
-        if preferred_genres:
-            recommendations = [
-                r for r in recommendations
-                if r["score_breakdown"]["genre"]["value"] > 0
-            ]
-
-        # --- Minimum score filter ---
-        MIN_SCORE = 0.3
-        recommendations = [r for r in recommendations if r["relevance_score"] >= MIN_SCORE]
-
-        if not recommendations:
-            return []
+            indices.append(i)
+            scores.append(relevance_score)
+            distances.append(distance)
+            for factor, value in event_components.items():
+                components.setdefault(factor, []).append(value)
+
+        return {
+            "index":      np.array(indices, dtype=np.int64),
+            "score":      np.array(scores, dtype=np.float64),
+            "distance":   np.array(distances, dtype=np.float64),
+            "components": {factor: np.array(values) for factor, values in components.items()},
+        }
+
+    def _score_batch(
+        self,
+        catalog: CatalogSnapshot,
+        user_preferences: dict,
+        profile: UserPreferenceProfile | None,
+        max_distance_km: float | None,
+        weights: dict | None,
+        today: date,
+    ) -> Dict:
+        """Score the whole catalog with ScoringEngine.score_batch."""
+        user_lat = user_preferences["latitude"]
+        user_lng = user_preferences["longitude"]
+
+        # Hard distance cap — only events in nearby grid cells are touched
+        if max_distance_km is not None:
+            idx, distances = catalog.spatial_index.query_radius(user_lat, user_lng, max_distance_km)
+        else:
+            idx       = np.arange(len(catalog))
+            distances = catalog.spatial_index.distances(user_lat, user_lng)
+
+        columns = catalog.columns(idx)
+        scores, components = self.scoring_engine.score_batch(
+            columns, user_preferences, weights=weights, distance_km=distances, today=today
+        )
 
-        # --- Sort ---
-        recommendations = self._sort(recommendations, sort_by)
+        # --- Personalisation adjustments ---
+        if profile:
+            genre_bias = map_unique(columns["genre"], lambda genre: profile.genre_bias.get(genre, 0))
+            scores = scores + genre_bias * 0.05
+            scores = scores + profile.crowd_bias
 
-        return recommendations[:top_n]
+        return {
+            "index":      idx,
+            "score":      scores,
+            "distance":   distances,
+            "components": components,
+        }
 
     # ------------------------------------------------------------------
-    # Sorting
+    # Selection
     # ------------------------------------------------------------------
 
+    def _select(
+        self,
+        scored: Dict,
+        user_preferences: dict,
+        sort_by: str,
+        top_n: int,
+    ) -> List[Dict]:
+        """
+        Apply the result filters to the ranking columns, then pick the top N
+        for `sort_by` without sorting the whole candidate set.
+
+        Filters: positive score, genre match when the user named genres,
+        and MIN_SCORE on the rounded score.
+        """
+        scores     = scored["score"]
+        components = scored["components"]
+
+        if not len(scores) or top_n <= 0:
+            return []
+
+        # Rank and filter on the values _candidate returns. np.round can land
+        # one unit off Python round() on a .xxx5 value (0.3765 → 0.376, where
+        # round() gives 0.377), so it only narrows the field: round() settles
+        # the rows near MIN_SCORE and the pool that can still make the top N.
+        relevance   = np.round(scores, 3)
+        distance_km = np.round(scored["distance"], 1)
+
+        near_min = np.flatnonzero(np.abs(relevance - self.MIN_SCORE) <= self.RELEVANCE_SLACK)
+        relevance[near_min] = self._round(scores[near_min], 3)
+
+        mask = scores > 0.0
+        if user_preferences.get("preferred_genres", []):
+            mask &= components["genre"] > 0
+        mask &= relevance >= self.MIN_SCORE
+
+        positions = np.flatnonzero(mask)
+        if not len(positions):
+            return []
+
+        pool = positions[
+            self._rank_pool(
+                sort_by,
+                relevance[positions],
+                distance_km[positions],
+                {factor: values[positions] for factor, values in components.items()},
+                top_n,
+            )
+        ]
+        relevance[pool]   = self._round(scores[pool], 3)
+        distance_km[pool] = self._round(scored["distance"][pool], 1)
+
+        order = self._rank(
+            sort_by,
+            relevance[pool],
+            distance_km[pool],
+            {factor: values[pool] for factor, values in components.items()},
+            top_n,
+        )
+
+        return [
+            self._candidate(
+                int(scored["index"][p]),
+                float(scores[p]),
+                float(scored["distance"][p]),
+                {factor: float(values[p]) for factor, values in components.items()},
+            )
+            for p in pool[order]
+        ]
+
+    @classmethod
+    def _rank_pool(
+        cls,
+        sort_by: str,
+        relevance: np.ndarray,
+        distance_km: np.ndarray,
+        components: Dict,
+        top_n: int,
+    ) -> np.ndarray:
+        """
+        Positions that can still make the top N once relevance and distance
+        are rounded exactly — every row whose best case (each rounded value
+        one unit in its favour) ties or beats the N-th best worst case.
+        """
+        # Budget and crowd orders don't read the rounded columns — the
+        # top N itself is the pool
+        if sort_by == "budget" or (sort_by == "crowd" and "crowd" in components):
+            return np.sort(cls._rank(sort_by, relevance, distance_km, components, top_n))
+
+        if len(relevance) <= top_n:
+            return np.arange(len(relevance))
+
+        if sort_by == "distance":
+            lower = distance_km - cls.DISTANCE_SLACK
+            upper = distance_km + cls.DISTANCE_SLACK
+        else:
+            lower = cls._distance_tier(distance_km - cls.DISTANCE_SLACK) * 1000.0 - (relevance + cls.RELEVANCE_SLACK)
+            upper = cls._distance_tier(distance_km + cls.DISTANCE_SLACK) * 1000.0 - (relevance - cls.RELEVANCE_SLACK)
+
+        kth = np.partition(upper, top_n - 1)[top_n - 1]
+        return np.flatnonzero(lower <= kth)
+
     @staticmethod
-    def _sort(recommendations: List[Dict], sort_by: str) -> List[Dict]:
+    def _distance_tier(distance_km: np.ndarray) -> np.ndarray:
+        """Distance band of the "best" order: 0 within 50 km, 1 within 200 km, else 2."""
+        return np.select([distance_km <= 50, distance_km <= 200], [0, 1], default=2)
+
+    @classmethod
+    def _rank(
+        cls,
+        sort_by: str,
+        relevance: np.ndarray,
+        distance_km: np.ndarray,
+        components: Dict,
+        top_n: int,
+    ) -> np.ndarray:
+        """
+        Positions of the top N candidates in `sort_by` order.
+        Ties keep catalog order, as a stable sort would.
+        """
         if sort_by == "distance":
-            return sorted(recommendations, key=lambda x: x["distance_km"])
+            return cls._top_k([distance_km], top_n)
 
         if sort_by == "budget":
-            return sorted(
-                recommendations,
-                key=lambda x: x["score_breakdown"].get("budget", {}).get("value", 0),
-                reverse=True,
-            )
+            return cls._top_k([-components.get("budget", np.zeros(len(relevance)))], top_n)
 
-        if sort_by == "crowd" and "crowd" in recommendations[0]["score_breakdown"]:
-            return sorted(
-                recommendations,
-                key=lambda x: x["score_breakdown"].get("crowd", {}).get("value", 0),
-                reverse=True,
-            )
+        if sort_by == "crowd" and "crowd" in components:
+            return cls._top_k([-components["crowd"]], top_n)
 
         # Default: "best" — tiered by distance band then score
-        def distance_tier(distance: float) -> int:
-            if distance <= 50:
-                return 0
-            if distance <= 200:
-                return 1
-            return 2
-
-        return sorted(
-            recommendations,
-            key=lambda x: (
-                distance_tier(x["distance_km"]),
-                -x["relevance_score"],
-                x["distance_km"],
-            ),
+        distance_tier = cls._distance_tier(distance_km)
+
+        return cls._top_k(
+            [distance_tier, -relevance, distance_km],
+            top_n,
+            # tier then score folded into one key so the partition step
+            # narrows on both — scores are far below the 1000 tier spacing
+            primary=distance_tier * 1000.0 - relevance,
         )
 
+    @staticmethod
+    def _top_k(keys: List[np.ndarray], k: int, primary: np.ndarray | None = None) -> np.ndarray:
+        """
+        Positions of the k smallest rows ordered lexicographically by `keys`.
+
+        Uses argpartition-style selection on the primary key (keys[0] unless
+        given) — O(n) — and fully orders only the rows tied with or ahead of
+        the k-th, instead of sorting all n rows.
+
+        Args:
+            keys: Sort keys, most significant first. All the same length.
+            k: Number of rows to return.
+            primary: Optional key consistent with the order of `keys`
+                     (a coarsening of it) to partition on.
+        """
+        primary = keys[0] if primary is None else primary
+        n = len(primary)
+
+        if n > k:
+            kth  = np.partition(primary, k - 1)[k - 1]
+            pool = np.flatnonzero(primary <= kth)
+        else:
+            pool = np.arange(n)
+
+        # np.lexsort is stable and treats its last key as most significant
+        order = np.lexsort([key[pool] for key in reversed(keys)])
+        return pool[order[:k]]
+
+    @staticmethod
+    def _without_events(scored: Dict, catalog: CatalogSnapshot, event_ids: set) -> Dict:
+        """Ranking columns with the rows of the given event ids removed."""
+        keep = np.array([catalog.ids[i] not in event_ids for i in scored["index"]], dtype=bool)
+        return {
+            "index":      scored["index"][keep],
+            "score":      scored["score"][keep],
+            "distance":   scored["distance"][keep],
+            "components": {factor: values[keep] for factor, values in scored["components"].items()},
+        }
+
+    @staticmethod
+    def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+        """
+        Python round() over an array. np.round scales by 10**ndigits first and
+        can land on the other side of a .xxx5 value (0.3765 → 0.376, where
+        round() gives 0.377), so it would rank differently from the scores shown.
+        """
+        return np.array([round(float(v), ndigits) for v in values], dtype=np.float64)
+
+    @staticmethod
+    def _candidate(index: int, relevance_score: float, distance: float, components: dict) -> Dict:
+        """
+        Ranking-stage record: numbers only. Descriptions and explanation are
+        built later by _describe, for the returned results only.
+        """
+        return {
+            "index":           index,
+            "relevance_score": round(relevance_score, 3),
+            "distance_km":     round(distance, 1),
+            "distance":        distance,
+            "components":      components,
+        }
+
+    def _describe(
+        self,
+        catalog: CatalogSnapshot,
+        candidates: List[Dict],
+        user_preferences: dict,
+    ) -> List[Dict]:
+        """Materialise score_breakdown and explanation for the final candidates."""
+        results = []
+        for candidate in candidates:
+            i = candidate["index"]
+            score_breakdown = self.scoring_engine.describe_components(
+                catalog.event_dict(i),
+                user_preferences,
+                candidate["components"],
+                candidate["distance"],
+            )
+            results.append({
+                "event_id":        catalog.ids[i],
+                "relevance_score": candidate["relevance_score"],
+                "distance_km":     candidate["distance_km"],
+                "explanation":     self._generate_explanation(
+                    score_breakdown, candidate["relevance_score"]
+                ),
+                "score_breakdown": score_breakdown,
+            })
+        return results
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load_catalog(
+        self,
+        user_preferences: dict,
+        max_distance_km: float | None,
+    ) -> CatalogSnapshot:
+        """
+        Scoring columns for candidate events — the whole in-memory catalog when
+        enabled, otherwise only the rows the SQL prefilter lets through.
+        """
+        if EVENT_CATALOG_ENABLED:
+            return event_catalog.snapshot(self.db)
+        return query_candidates(
+            self.db,
+            user_preferences["latitude"],
+            user_preferences["longitude"],
+            max_distance_km=max_distance_km,
+            preferred_genres=user_preferences.get("preferred_genres"),
+        )
+
+    def _apply_crowd_estimates(self, catalog: CatalogSnapshot) -> CatalogSnapshot:
+        """
+        Replace stored crowd levels with CrowdEstimator levels for the
+        candidate events with enough interest. The in-memory catalog does
+        this itself on refresh.
+        """
+        return catalog.with_crowd_levels(CrowdEstimator(self.db).crowd_levels(list(catalog.ids)))
+
+    def _attach_events(self, recommendations: List[Dict], deleted: set) -> List[Dict]:
+        """
+        Load display fields for the final results only and nest them under "event".
+        Results whose event was deleted since the catalog was loaded are dropped
+        and their event ids added to `deleted`.
+        """
+        from app.models.event import Event
+
+        event_ids = [r["event_id"] for r in recommendations]
+        events_by_id = {
+            e.id: e
+            for e in self.db.query(Event).filter(Event.id.in_(event_ids)).all()
+        }
+
+        results = []
+        for rec in recommendations:
+            event_id = rec.pop("event_id")
+            event = events_by_id.get(event_id)
+            if event is None:
+                deleted.add(event_id)
+                continue
+            results.append({
+                "event": {
+                    "id":        event.id,
+                    "name":      event.name,
+                    "date":      event.date,
+                    "genre":     event.genre,
+                    "latitude":  event.latitude,
+                    "longitude": event.longitude,
+                    "media": {
+                        "poster_url":    event.poster_url,
+                        "thumbnail_url": event.thumbnail_url,
+                    },
+                    "ticketing": {
+                        "price":      event.ticket_price,
+                        "is_free":    event.is_free,
+                        "ticket_url": event.ticket_url,
+                        "currency":   event.currency,
+                    },
+                    "location": {
+                        "venue_name": event.venue_name,
+                        "address":    event.address,
+                        "city":       event.city,
+                    },
+                    "is_verified": event.is_verified,
+                },
+                **rec,
+            })
+        return results
+
     # ------------------------------------------------------------------
     # Explanation
     # ------------------------------------------------------------------
@@ -3,7 +3,11 @@ Calculate relevance scores for events based on user preferences.
 Uses weighted scoring across budget, genre, distance, food, temporal, weather, and crowd.
 """
 
-from app.utils.distance import haversine_distance
+from datetime import date, datetime
+
+import numpy as np
+
+from app.utils.distance import haversine_distance, haversine_distance_array
 from app.services.context.temporal import TemporalContextService
 from app.services.context.weather import WeatherContextService
 from app.services.context.crowd import CrowdContextService
@@ -28,6 +32,8 @@ class ScoringEngine:
         event: dict,
         user_preferences: dict,
         weights: dict | None = None,
+        distance_km: float | None = None,
+        today: date | None = None,
     ) -> tuple[float, dict]:
         """
         Compute a weighted relevance score for a single event.
@@ -38,106 +44,224 @@ class ScoringEngine:
             user_preferences: User preferences (budget, preferred_genres,
                               latitude, longitude, food_preference, avoid_crowds).
             weights: Optional weight overrides. Falls back to WEIGHTS.
+            distance_km: Precomputed user → event distance, e.g. from a
+                         distance cap check. Computed when None.
+            today: Reference date for temporal scoring (defaults to UTC today).
 
         Returns:
             Tuple of (relevance_score: float, score_breakdown: dict).
         """
+        if distance_km is None:
+            distance_km = haversine_distance(
+                user_preferences["latitude"],
+                user_preferences["longitude"],
+                event["latitude"],
+                event["longitude"],
+            )
+        relevance_score, components = self.score_components(
+            event, user_preferences, weights=weights, distance_km=distance_km, today=today
+        )
+        score_breakdown = self.describe_components(
+            event, user_preferences, components, distance_km
+        )
+        return relevance_score, score_breakdown
+
+    def score_components(
+        self,
+        event: dict,
+        user_preferences: dict,
+        weights: dict | None = None,
+        distance_km: float | None = None,
+        today: date | None = None,
+    ) -> tuple[float, dict]:
+        """
+        Numeric part of calculate_relevance_score — no descriptions.
+
+        Args:
+            event: Event dictionary (same fields as calculate_relevance_score).
+            user_preferences: User preferences dict.
+            weights: Optional weight overrides. Falls back to WEIGHTS.
+            distance_km: Precomputed user → event distance. Computed when None.
+            today: Reference date for temporal scoring (defaults to UTC today).
+
+        Returns:
+            Tuple of (relevance_score: float, components: dict of factor → value).
+        """
         weights = weights or self.WEIGHTS
-        score_breakdown = {}
 
-        # --- Budget ---
-        budget_score = self._score_budget(
-            event["ticket_price"],
-            user_preferences.get("budget") or 0,
-        )
-        score_breakdown["budget"] = {
-            "value": budget_score,
-            "description": (
-                f"Budget match: ticket ${event['ticket_price']:.2f} "
-                f"vs budget ${user_preferences.get('budget', 0):.2f}"
-            ),
-        }
+        if distance_km is None:
+            distance_km = haversine_distance(
+                user_preferences["latitude"],
+                user_preferences["longitude"],
+                event["latitude"],
+                event["longitude"],
+            )
 
-        # --- Genre ---
-        genre_score = self._score_genre(
-            event["genre"],
-            user_preferences.get("preferred_genres") or [],
-        )
-        score_breakdown["genre"] = {
-            "value": genre_score,
-            "description": (
-                f"Genre match: '{event['genre']}' "
-                f"vs preferences {user_preferences.get('preferred_genres', [])}"
+        base_crowd_score = CrowdContextService.score(event.get("crowd_level", "MEDIUM"))
+
+        components = {
+            "budget": self._score_budget(
+                event["ticket_price"],
+                user_preferences.get("budget") or 0,
+            ),
+            "genre": self._score_genre(
+                event["genre"],
+                user_preferences.get("preferred_genres") or [],
+            ),
+            "distance": self._score_distance(distance_km),
+            "food_preference": self._score_food_preference(
+                event.get("food_type", ""),
+                user_preferences.get("food_preference", ""),
+            ),
+            "temporal": TemporalContextService.score(event["date"], today=today),
+            "weather":  WeatherContextService.score(event.get("event_type", "indoor")),
+            "crowd": (
+                base_crowd_score * 0.7
+                if user_preferences.get("avoid_crowds", False)
+                else base_crowd_score
             ),
         }
 
-        # --- Distance ---
-        distance_km = haversine_distance(
-            user_preferences["latitude"],
-            user_preferences["longitude"],
-            event["latitude"],
-            event["longitude"],
-        )
-        distance_score = self._score_distance(distance_km)
-        score_breakdown["distance"] = {
-            "value": distance_score,
-            "description": f"Location proximity: {distance_km:.1f} km away",
-        }
+        return self._weighted_total(components, weights), components
 
-        # --- Food preference ---
-        food_score = self._score_food_preference(
-            event.get("food_type", ""),
-            user_preferences.get("food_preference", ""),
-        )
-        score_breakdown["food_preference"] = {
-            "value": food_score,
-            "description": (
-                f"Food match: event '{event.get('food_type', 'none')}' "
-                f"vs preference '{user_preferences.get('food_preference', 'none')}'"
+    def score_batch(
+        self,
+        columns: dict,
+        user_preferences: dict,
+        weights: dict | None = None,
+        distance_km: np.ndarray | None = None,
+        today: date | None = None,
+    ) -> tuple[np.ndarray, dict]:
+        """
+        Vectorised score_components for a whole candidate set.
+
+        Produces the same numbers as the scalar path (within float tolerance).
+        String factors (genre, food, date, event type, crowd level) take few
+        distinct values, so each scalar scorer runs once per distinct value and
+        the result is broadcast back with NumPy. Pass those columns as
+        Factorized to skip finding the distinct values on every call.
+
+        Args:
+            columns: Mapping of event field → array, one entry per event
+                     (ticket_price, genre, latitude, longitude, food_type,
+                     date, event_type, crowd_level). String columns may
+                     be Factorized. An optional "date_ordinal" column
+                     (pre-parsed dates) replaces "date".
+            user_preferences: User preferences dict.
+            weights: Optional weight overrides. Falls back to WEIGHTS.
+            distance_km: Precomputed distances array. Computed when None.
+            today: Reference date for temporal scoring (defaults to UTC today).
+
+        Returns:
+            Tuple of (scores array, components dict of factor → array).
+        """
+        weights = weights or self.WEIGHTS
+
+        if distance_km is None:
+            distance_km = haversine_distance_array(
+                user_preferences["latitude"],
+                user_preferences["longitude"],
+                columns["latitude"],
+                columns["longitude"],
+            )
+
+        today = today or datetime.utcnow().date()
+
+        preferred_genres = user_preferences.get("preferred_genres") or []
+        food_preference  = user_preferences.get("food_preference", "")
+
+        if "date_ordinal" in columns:
+            temporal = TemporalContextService.score_ordinals(columns["date_ordinal"], today)
+        else:
+            temporal = map_unique(
+                columns["date"],
+                lambda event_date: TemporalContextService.score(event_date, today=today),
+            )
+
+        crowd = map_unique(columns["crowd_level"], CrowdContextService.score)
+        if user_preferences.get("avoid_crowds", False):
+            crowd = crowd * 0.7
+
+        components = {
+            "budget": self._score_budget_array(
+                np.asarray(columns["ticket_price"], dtype=np.float64),
+                user_preferences.get("budget") or 0,
+            ),
+            "genre": map_unique(
+                columns["genre"],
+                lambda genre: self._score_genre(genre, preferred_genres),
             ),
+            "distance": self._score_distance_array(np.asarray(distance_km, dtype=np.float64)),
+            "food_preference": map_unique(
+                columns["food_type"],
+                lambda food: self._score_food_preference(food, food_preference),
+            ),
+            "temporal": temporal,
+            "weather":  map_unique(columns["event_type"], WeatherContextService.score),
+            "crowd":    crowd,
         }
 
-        # --- Temporal ---
-        temporal_score = TemporalContextService.score(event["date"])
-        score_breakdown["temporal"] = {
-            "value": temporal_score,
-            "description": f"Event timing relevance ({event['date']})",
-        }
+        return self._weighted_total(components, weights), components
 
-        # --- Weather ---
-        event_type = event.get("event_type", "indoor")
-        weather_score = WeatherContextService.score(event_type)
-        score_breakdown["weather"] = {
-            "value": weather_score,
-            "description": f"Weather suitability for '{event_type}' event",
-        }
+    @staticmethod
+    def describe_components(
+        event: dict,
+        user_preferences: dict,
+        components: dict,
+        distance_km: float,
+    ) -> dict:
+        """
+        Build the human-readable score_breakdown for one event.
+
+        Args:
+            event: Event dictionary the components were computed from.
+            user_preferences: User preferences dict.
+            components: Factor → value mapping from score_components.
+            distance_km: User → event distance.
 
-        # --- Crowd ---
-        crowd_level = event.get("crowd_level", "MEDIUM")
-        base_crowd_score = CrowdContextService.score(crowd_level)
+        Returns:
+            Dict of factor → {"value", "description"}.
+        """
         avoid_crowds = user_preferences.get("avoid_crowds", False)
-        crowd_score = base_crowd_score * 0.7 if avoid_crowds else base_crowd_score
-        score_breakdown["crowd"] = {
-            "value": crowd_score,
-            "description": (
-                f"Crowd level: {crowd_level} "
+        descriptions = {
+            "budget": (
+                f"Budget match: ticket ${event['ticket_price']:.2f} "
+                f"vs budget ${user_preferences.get('budget', 0):.2f}"
+            ),
+            "genre": (
+                f"Genre match: '{event['genre']}' "
+                f"vs preferences {user_preferences.get('preferred_genres', [])}"
+            ),
+            "distance": f"Location proximity: {distance_km:.1f} km away",
+            "food_preference": (
+                f"Food match: event '{event.get('food_type', 'none')}' "
+                f"vs preference '{user_preferences.get('food_preference', 'none')}'"
+            ),
+            "temporal": f"Event timing relevance ({event['date']})",
+            "weather":  f"Weather suitability for '{event.get('event_type', 'indoor')}' event",
+            "crowd": (
+                f"Crowd level: {event.get('crowd_level', 'MEDIUM')} "
                 f"(avoid crowds: {avoid_crowds})"
             ),
         }
 
-        # --- Weighted total ---
-        relevance_score = (
-            budget_score       * weights.get("budget", 0)
-            + genre_score      * weights.get("genre", 0)
-            + distance_score   * weights.get("distance", 0)
-            + food_score       * weights.get("food_preference", 0)
-            + temporal_score   * weights.get("temporal", 0)
-            + weather_score    * weights.get("weather", 0)
-            + crowd_score      * weights.get("crowd", 0)
-        )
+        return {
+            factor: {"value": float(value), "description": descriptions[factor]}
+            for factor, value in components.items()
+        }
 
-        return relevance_score, score_breakdown
-    
+    @staticmethod
+    def _weighted_total(components: dict, weights: dict):
+        """Weighted sum of factor values — works on floats and NumPy arrays alike."""
+        return (
+            components["budget"]            * weights.get("budget", 0)
+            + components["genre"]           * weights.get("genre", 0)
+            + components["distance"]        * weights.get("distance", 0)
+            + components["food_preference"] * weights.get("food_preference", 0)
+            + components["temporal"]        * weights.get("temporal", 0)
+            + components["weather"]         * weights.get("weather", 0)
+            + components["crowd"]           * weights.get("crowd", 0)
+        )
 
     # ------------------------------------------------------------------
     # Individual scoring methods
@@ -191,6 +315,31 @@ class ScoringEngine:
             return max(0.1, 0.4 - (distance_km - 20) / 80 * 0.3)
         return max(0.0, 0.1 - (distance_km - 100) / 1000 * 0.1)
 
+    @staticmethod
+    def _score_budget_array(ticket_prices: np.ndarray, user_budget: float) -> np.ndarray:
+        """Array form of _score_budget."""
+        if not user_budget or user_budget <= 0:
+            return np.zeros(len(ticket_prices))
+
+        within = 0.6 + (1.0 - ticket_prices / user_budget) * 0.4
+        excess_ratio = np.minimum((ticket_prices - user_budget) / user_budget, 1.0)
+        over = np.maximum(0.0, 0.3 * (1.0 - excess_ratio))
+        return np.where(ticket_prices <= user_budget, within, over)
+
+    @staticmethod
+    def _score_distance_array(distance_km: np.ndarray) -> np.ndarray:
+        """Array form of _score_distance."""
+        return np.select(
+            [distance_km < 0, distance_km <= 5, distance_km <= 20, distance_km <= 100],
+            [
+                0.0,
+                1.0,
+                np.maximum(0.4, 1.0 - (distance_km - 5) / 15 * 0.6),
+                np.maximum(0.1, 0.4 - (distance_km - 20) / 80 * 0.3),
+            ],
+            default=np.maximum(0.0, 0.1 - (distance_km - 100) / 1000 * 0.1),
+        )
+
     @staticmethod
     def _score_food_preference(event_food: str, user_food_preference: str) -> float:
         """
@@ -213,3 +362,60 @@ class ScoringEngine:
             return 1.0
 
         return 0.2
+
+
+class Factorized:
+    """
+    A column of repeated values stored as integer codes into `uniques`
+    (row i holds uniques[codes[i]]). Indexing selects rows and keeps the
+    uniques, so a catalog factorizes once and every request reuses it.
+    """
+
+    __slots__ = ("codes", "uniques")
+
+    def __init__(self, codes: np.ndarray, uniques: np.ndarray):
+        self.codes   = codes
+        self.uniques = uniques
+
+    @classmethod
+    def from_values(cls, values) -> "Factorized":
+        """Factorize hashable values, uniques in order of first appearance."""
+        positions: dict = {}
+        codes = np.fromiter(
+            (positions.setdefault(value, len(positions)) for value in values),
+            dtype=np.int64,
+            count=len(values),
+        )
+        uniques = np.empty(len(positions), dtype=object)
+        uniques[:] = list(positions)
+        return cls(codes, uniques)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, idx) -> "Factorized":
+        return Factorized(self.codes[idx], self.uniques)
+
+
+def map_unique(values, score_fn) -> np.ndarray:
+    """
+    Apply a scalar scorer to an array by scoring each distinct value once.
+
+    Args:
+        values: Factorized column, or array of hashable, sortable values
+                (e.g. genre strings) — factorized here with a sort.
+        score_fn: Scalar function value → float.
+
+    Returns:
+        Float array with score_fn(values[i]) at position i.
+    """
+    if isinstance(values, Factorized):
+        scores = np.array([score_fn(value) for value in values.uniques], dtype=np.float64)
+        return scores[values.codes]
+
+    values = np.asarray(values, dtype=object)
+    if not len(values):
+        return np.zeros(0)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    scores = np.array([score_fn(value) for value in uniques], dtype=np.float64)
+    return scores[inverse.ravel()]
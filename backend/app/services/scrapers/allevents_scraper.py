@@ -9,21 +9,30 @@ Why Playwright?
     get empty placeholders. Playwright runs a real headless browser,
     waits for JS to populate the cards, then reads the HTML.
 
+Cities are scraped in parallel by a small pool of browser contexts
+(SCRAPER_CONCURRENCY) driven by Playwright's async API.
+
 Usage:
     from app.services.scrapers.allevents_scraper import AlleventsScraper
     scraper = AlleventsScraper()
-    events = scraper.scrape()
+    events = scraper.scrape()          # sync callers (scheduler)
+    events = await scraper.scrape_async()
 """
 
 from os import name
 import re
+import json
+import time
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import Optional
-import requests
+from typing import Mapping, Optional
 from bs4 import BeautifulSoup
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+from app.core.config import SCRAPER_CONCURRENCY, SCRAPER_HEADLESS, SCRAPER_SLOW_MO_MS
+from app.services.scrapers.og_image import OgImageFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -46,10 +55,112 @@ KENYA_CITIES = [
     ("kakamega",  "Kakamega",   0.2827,  34.7519),
 ]
 
-SCROLL_PAUSES  = 4       # scrolls per city page to load more cards
-SCROLL_WAIT_MS = 1500    # ms to wait after each scroll
+# Adaptive scroll loading — keep scrolling while new cards keep appearing
+MAX_SCROLLS      = 20      # hard cap per city page
+SCROLL_SETTLE_MS = 2000    # max wait for the card count to grow after a scroll
+STABLE_SCROLLS   = 2       # stop after this many scrolls in a row add no cards
 PAGE_TIMEOUT   = 30000   # 30 seconds max page load
 
+# Resource types never downloaded — we only need text data
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
+
+# ------------------------------------------------------------------
+# Card extraction — one round-trip per city page
+#
+# HTML structure (mapped by inspecting allevents.in/nairobi):
+#
+# <li class="event-card event-card-link"
+#     data-link="https://allevents.in/nairobi/event-name/ID"
+#     data-eid="ID">
+#     <div class="banner-cont">
+#         <img class="banner-img" data-src="poster-url">
+#     </div>
+#     <div class="meta">
+#         <div class="meta-top">
+#             <div class="meta-top-info">
+#                 <div class="date">Sun, 28 Jun • 09:00 AM</div>
+#             </div>
+#         </div>
+#         <div class="meta-middle">
+#             <div class="title"><a><h3>Event Name</h3></a></div>
+#             <div class="location">Venue Name</div>
+#         </div>
+#         <div class="meta-bottom">
+#             <div class="price-container">
+#                 <span class="price">Free</span>
+#             </div>
+#         </div>
+#     </div>
+# </li>
+# ------------------------------------------------------------------
+
+CARD_SELECTOR = "li.event-card"
+
+# Text fields of a raw card → selector inside the card
+CARD_TEXT_FIELDS = {
+    "name":       "div.meta-middle div.title h3",
+    "venue_name": "div.meta-middle div.location",
+    "date_text":  "div.meta-top div.date",
+    "price_text": "div.meta-bottom span.price",
+}
+
+# Poster <img>: first selector that matches, then first non-empty attribute
+# (Allevents uses data-src for lazy loading)
+POSTER_SELECTORS = [
+    "div.banner-cont img.banner-img",
+    "div.banner-cont img",
+    "img.banner-img",
+    "div.event-img img",
+    "img[data-src]",
+    "img",
+]
+POSTER_ATTRIBUTES = ["data-src", "data-lazy-src", "data-original", "src"]
+
+# Runs in the page via eval_on_selector_all — returns one plain object
+# per card: {source_url, poster_url, img_count, name, venue_name, date_text, price_text}
+CARD_EXTRACT_JS = """
+cards => cards.map(card => {
+    const textFields = TEXT_FIELDS;
+    const img = POSTER_SELECTORS.map(sel => card.querySelector(sel)).find(el => el);
+    const raw = {
+        source_url: card.getAttribute("data-link"),
+        poster_url: img ? (POSTER_ATTRIBUTES.map(attr => img.getAttribute(attr)).find(v => v) || null) : null,
+        img_count:  card.querySelectorAll("img").length,
+    };
+    for (const [field, sel] of Object.entries(textFields)) {
+        const el = card.querySelector(sel);
+        raw[field] = el ? el.innerText.trim() : null;
+    }
+    return raw;
+})
+""".replace("TEXT_FIELDS", json.dumps(CARD_TEXT_FIELDS))\
+   .replace("POSTER_SELECTORS", json.dumps(POSTER_SELECTORS))\
+   .replace("POSTER_ATTRIBUTES", json.dumps(POSTER_ATTRIBUTES))
+
+
+def extract_cards_from_html(html: str) -> list[dict]:
+    """
+    Same raw card dicts as CARD_EXTRACT_JS, read from saved page HTML with
+    BeautifulSoup — lets card parsing be tested against HTML fixtures.
+    """
+    soup  = BeautifulSoup(html, "html.parser")
+    cards = []
+
+    for card in soup.select(CARD_SELECTOR):
+        img = next((el for el in map(card.select_one, POSTER_SELECTORS) if el), None)
+        raw = {
+            "source_url": card.get("data-link"),
+            "poster_url": next((img.get(attr) for attr in POSTER_ATTRIBUTES if img.get(attr)), None) if img else None,
+            "img_count":  len(card.select("img")),
+        }
+        for field, selector in CARD_TEXT_FIELDS.items():
+            el = card.select_one(selector)
+            raw[field] = el.get_text().strip() if el else None
+        cards.append(raw)
+
+    return cards
+
 
 # ------------------------------------------------------------------
 # Scraper
@@ -59,125 +170,222 @@ class AlleventsScraper:
     """
     Scrapes event listings from allevents.in for multiple Kenyan cities.
 
-    We launch ONE browser instance and reuse it across all city pages.
-    This is much more efficient than launching a new browser per city.
+    We launch ONE browser instance and share it across all city pages.
+    Each worker in the pool owns one browser context + page and takes
+    the next city off a queue, so `concurrency` cities load at once.
 
     Flow:
-        1. Launch headless Firefox once
-        2. For each city:
+        1. Launch Firefox once
+        2. Start `concurrency` workers, each with its own context and page
+        3. Each worker, per city:
             a. Navigate to allevents.in/{city}
             b. Wait for event cards to render
             c. Scroll to load more cards
             d. Extract data from each card
-        3. Close browser
-        4. Return all events combined
+        4. Close browser
+        5. Fetch og:image posters for cards that had none, all at once
+        6. Return all events combined, in KENYA_CITIES order
+
+    After a run, `city_timings` holds one entry per city:
+        {"city", "events", "cards", "scrolls", "seconds", "cards_per_second"}
+
+    Args:
+        concurrency: Cities scraped in parallel
+        headless: Run the browser without a window. slow_mo is only
+                  applied to headed (debugging) runs.
+        known_posters: source_url → poster_url already stored, so the
+                       og:image fallback skips those events
     """
 
+    def __init__(
+        self,
+        concurrency: int = SCRAPER_CONCURRENCY,
+        headless: bool = SCRAPER_HEADLESS,
+        known_posters: Optional[Mapping[str, str]] = None,
+    ):
+        self.concurrency   = max(1, concurrency)
+        self.headless      = headless
+        self.known_posters = known_posters or {}
+        self.city_timings: list[dict] = []
+
     def scrape(self) -> list[dict]:
         """
         Scrape all Kenyan cities and return combined event list.
+        Sync wrapper around scrape_async() — call from a thread without
+        a running event loop (scheduler job, sync endpoint).
 
         Returns:
             List of raw event dicts ready for upsert into DB.
         """
-        logger.info(f"[Allevents] Starting scrape for {len(KENYA_CITIES)} cities...")
-        all_events = []
+        return asyncio.run(self.scrape_async())
+
+    async def scrape_async(self) -> list[dict]:
+        """Async version of scrape()."""
+        workers = min(self.concurrency, len(KENYA_CITIES))
+        logger.info(
+            f"[Allevents] Starting scrape for {len(KENYA_CITIES)} cities "
+            f"({workers} in parallel)..."
+        )
+        started = time.perf_counter()
 
-        with sync_playwright() as p:
+        queue = asyncio.Queue()
+        for city in KENYA_CITIES:
+            queue.put_nowait(city)
 
-            # Launch Firefox headless — lighter than Chromium on RAM
-            browser = p.firefox.launch(headless=True, slow_mo=50)
-            page = browser.new_page(viewport={"width": 1280, "height": 800})
+        by_slug: dict[str, list[dict]] = {}
+        self.city_timings = []
 
-            # Block images/fonts/stylesheets — we only need text data
-            # This makes scraping significantly faster and lighter
-            def block_resources(route, request):
-                if request.resource_type in ["image", "media", "font", "stylesheet"]:
-                    route.abort()
-                else:
-                    route.continue_()
+        async with async_playwright() as p:
 
-            page.route("**/*", block_resources)
+            # Launch Firefox — lighter than Chromium on RAM
+            browser = await p.firefox.launch(
+                headless=self.headless,
+                slow_mo=0 if self.headless else SCRAPER_SLOW_MO_MS,
+            )
+            try:
+                await asyncio.gather(*(
+                    self._city_worker(browser, queue, by_slug) for _ in range(workers)
+                ))
+            finally:
+                await browser.close()
+
+        all_events = [event for slug, *_ in KENYA_CITIES for event in by_slug.get(slug, [])]
+
+        # Fallback — grab og:image from event detail pages via HTTP (no browser)
+        missing = [event for event in all_events if not event["poster_url"]]
+        if missing:
+            og_started = time.perf_counter()
+            posters    = await OgImageFetcher(known=self.known_posters).fetch_all(
+                event["source_url"] for event in missing
+            )
+            for event in missing:
+                event["poster_url"] = posters.get(event["source_url"])
+            logger.info(
+                f"[Allevents] og:image fallback for {len(missing)} events "
+                f"in {time.perf_counter() - og_started:.1f}s"
+            )
+
+        # Per-city timings, in KENYA_CITIES order
+        order = {slug: i for i, (slug, *_) in enumerate(KENYA_CITIES)}
+        self.city_timings.sort(key=lambda t: order[t["slug"]])
+        elapsed      = time.perf_counter() - started
+        city_seconds = sum(t["seconds"] for t in self.city_timings)
+        slowest      = max(self.city_timings, key=lambda t: t["seconds"], default=None)
+        logger.info(
+            f"[Allevents] Full scrape complete — {len(all_events)} total events "
+            f"in {elapsed:.1f}s ({city_seconds:.1f}s of city time"
+            + (f", slowest: {slowest['city']} {slowest['seconds']:.1f}s)" if slowest else ")")
+        )
+        return all_events
+
+    async def _city_worker(self, browser, queue: asyncio.Queue, by_slug: dict) -> None:
+        """One pool slot: a browser context + page that scrapes cities until the queue is empty."""
+        context = await browser.new_context(viewport={"width": 1280, "height": 800})
+
+        # Block images/fonts/stylesheets — we only need text data
+        # This makes scraping significantly faster and lighter
+        async def block_resources(route):
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", block_resources)
+        page = await context.new_page()
+
+        try:
+            while True:
+                try:
+                    slug, city_name, city_lat, city_lng = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
 
-            for slug, city_name, city_lat, city_lng in KENYA_CITIES:
                 url = f"https://allevents.in/{slug}"
                 logger.info(f"[Allevents] Scraping {city_name} — {url}")
 
-                city_events = self._scrape_city(
+                started = time.perf_counter()
+                city_events, cards, scrolls = await self._scrape_city(
                     page, url, city_name, city_lat, city_lng
                 )
-                all_events.extend(city_events)
+                seconds          = time.perf_counter() - started
+                cards_per_second = cards / seconds if seconds > 0 else 0.0
+
+                by_slug[slug] = city_events
+                self.city_timings.append({
+                    "slug":             slug,
+                    "city":             city_name,
+                    "events":           len(city_events),
+                    "cards":            cards,
+                    "scrolls":          scrolls,
+                    "seconds":          round(seconds, 2),
+                    "cards_per_second": round(cards_per_second, 2),
+                })
                 logger.info(
                     f"[Allevents] {city_name} done — "
-                    f"{len(city_events)} events found. "
-                    f"Total so far: {len(all_events)}"
+                    f"{len(city_events)} events found ({cards} cards, {scrolls} scrolls) "
+                    f"in {seconds:.1f}s — {cards_per_second:.1f} cards/s"
                 )
-
-            browser.close()
-
-        logger.info(f"[Allevents] Full scrape complete — {len(all_events)} total events")
-        return all_events
+        finally:
+            await context.close()
 
     # ------------------------------------------------------------------
     # Per-city scrape
     # ------------------------------------------------------------------
 
-    def _scrape_city(
+    async def _scrape_city(
         self,
         page,
         url: str,
         city_name: str,
         city_lat: float,
         city_lng: float,
-    ) -> list[dict]:
+    ) -> tuple[list[dict], int, int]:
         """
-        Scrape a single city page and return its events.
+        Scrape a single city page.
+
+        Returns:
+            (events, cards found, scrolls made)
 
         Args:
-            page: Playwright page (reused across cities)
+            page: Playwright page (reused across this worker's cities)
             url: Full allevents.in city URL
             city_name: Human readable city name e.g. "Nairobi"
             city_lat: City center latitude for distance scoring
             city_lng: City center longitude for distance scoring
         """
-        events = []
+        events  = []
+        cards   = 0
+        scrolls = 0
 
         try:
-            page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
+            await page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT)
 
             # Wait for at least one event card to appear
             # If no cards appear within timeout, this city has no events
-            page.wait_for_selector("li.event-card", timeout=PAGE_TIMEOUT)
+            await page.wait_for_selector(CARD_SELECTOR, timeout=PAGE_TIMEOUT)
 
             # Scroll down to trigger lazy loading of more cards
-            for i in range(SCROLL_PAUSES):
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(SCROLL_WAIT_MS)
-                
-                # Wait for lazy-loaded images to inject into the DOM
+            cards, scrolls = await self._scroll_until_stable(page)
+
+            # Wait for lazy-loaded images to inject into the DOM
             try:
-                page.wait_for_selector("li.event-card div.banner-cont img", timeout=8000)
+                await page.wait_for_selector("li.event-card div.banner-cont img", timeout=8000)
             except:
                 pass  # Some pages may have no images — continue anyway
             
             # Scroll back to top so all cards are in view, triggering any
             # remaining lazy loaders that only fire when elements are visible
-            page.evaluate("window.scrollTo(0, 0)")
-            page.wait_for_timeout(1500)
+            await page.evaluate("window.scrollTo(0, 0)")
+            await page.wait_for_timeout(1500)
 
 
-            # Read all rendered event cards
-            cards = page.query_selector_all("li.event-card")
-            logger.info(f"[Allevents] {city_name}: {len(cards)} cards found")
+            # Read all rendered event cards in one call
+            raw_cards = await page.eval_on_selector_all(CARD_SELECTOR, CARD_EXTRACT_JS)
+            cards     = len(raw_cards)
+            logger.info(f"[Allevents] {city_name}: {cards} cards found")
 
-            for card in cards:
-                try:
-                    event = self._parse_card(card, page, city_name, city_lat, city_lng)
-                    if event:
-                        events.append(event)
-                except Exception as e:
-                    logger.warning(f"[Allevents] Card parse error in {city_name}: {e}")
-                    continue
+            # Missing posters are resolved for all cities together afterwards
+            events = self.parse_cards(raw_cards, city_name, city_lat, city_lng)
 
         except PlaywrightTimeout:
             # City page exists but no events loaded — not an error
@@ -185,148 +393,114 @@ class AlleventsScraper:
         except Exception as e:
             logger.error(f"[Allevents] {city_name} scrape failed: {e}")
 
-        return events
+        return events, cards, scrolls
+
+    async def _scroll_until_stable(self, page) -> tuple[int, int]:
+        """
+        Scroll to the bottom until the card count stops growing.
+
+        After each scroll, wait (at most SCROLL_SETTLE_MS) for more cards
+        than before; stop after STABLE_SCROLLS scrolls in a row add none,
+        or after MAX_SCROLLS. Big cities keep scrolling as long as cards
+        keep loading; small ones stop after the first quiet scroll or two.
+
+        Returns:
+            (cards on the page, scrolls made)
+        """
+        count   = await page.eval_on_selector_all(CARD_SELECTOR, "cards => cards.length")
+        scrolls = 0
+        stable  = 0
+
+        while scrolls < MAX_SCROLLS and stable < STABLE_SCROLLS:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            scrolls += 1
+            try:
+                await page.wait_for_function(
+                    "([selector, count]) => document.querySelectorAll(selector).length > count",
+                    arg=[CARD_SELECTOR, count],
+                    timeout=SCROLL_SETTLE_MS,
+                )
+            except PlaywrightTimeout:
+                stable += 1
+                continue
+
+            count  = await page.eval_on_selector_all(CARD_SELECTOR, "cards => cards.length")
+            stable = 0
+
+        return count, scrolls
 
     # ------------------------------------------------------------------
     # Card parser — same HTML structure across all city pages
     # ------------------------------------------------------------------
 
+    def parse_cards(
+        self,
+        raw_cards: list[dict],
+        city_name: str,
+        city_lat: float,
+        city_lng: float,
+    ) -> list[dict]:
+        """
+        Turn raw card dicts (CARD_EXTRACT_JS / extract_cards_from_html)
+        into event dicts, skipping cards without a link or name.
+        """
+        events = []
+        for raw in raw_cards:
+            try:
+                event = self._parse_card(raw, city_name, city_lat, city_lng)
+                if event:
+                    events.append(event)
+            except Exception as e:
+                logger.warning(f"[Allevents] Card parse error in {city_name}: {e}")
+        return events
+
     def _parse_card(
         self,
-        card,
-        page,
+        raw: dict,
         city_name: str,
         city_lat: float,
         city_lng: float,
     ) -> Optional[dict]:
         """
-        Extract event data from a single <li class="event-card"> element.
+        Build an event dict from one raw card.
 
         Args:
-            card: Playwright element handle for the event card
-            page: Playwright page instance for JS evaluation
+            raw: One card as returned by CARD_EXTRACT_JS
             city_name: Human readable city name e.g. "Nairobi"
             city_lat: City center latitude for distance scoring
             city_lng: City center longitude for distance scoring
-
-        HTML structure (mapped by inspecting allevents.in/nairobi):
-
-        <li class="event-card event-card-link"
-            data-link="https://allevents.in/nairobi/event-name/ID"
-            data-eid="ID">
-            <div class="banner-cont">
-                <img class="banner-img" data-src="poster-url">
-            </div>
-            <div class="meta">
-                <div class="meta-top">
-                    <div class="meta-top-info">
-                        <div class="date">Sun, 28 Jun • 09:00 AM</div>
-                    </div>
-                </div>
-                <div class="meta-middle">
-                    <div class="title"><a><h3>Event Name</h3></a></div>
-                    <div class="location">Venue Name</div>
-                </div>
-                <div class="meta-bottom">
-                    <div class="price-container">
-                        <span class="price">Free</span>
-                    </div>
-                </div>
-            </div>
-        </li>
         """
 
         # --- Source URL (required for deduplication) ---
-        source_url = card.get_attribute("data-link")
+        source_url = raw.get("source_url")
         if not source_url:
             return None
 
-        # --- Poster image ---
-        # Allevents uses data-src for lazy loading
-        
-        # Try multiple selectors in order of specificity
-        poster_url = None
-        img = (
-            card.query_selector("div.banner-cont img.banner-img") or
-            card.query_selector("div.banner-cont img") or
-            card.query_selector("img.banner-img") or
-            card.query_selector("div.event-img img") or
-            card.query_selector("img[data-src]") or
-            card.query_selector("img")
-        )
-        if img:
-            poster_url = (
-                img.get_attribute("data-src") or
-                img.get_attribute("data-lazy-src") or
-                img.get_attribute("data-original") or
-                img.get_attribute("src")
-            )
+        # --- Event name (required) ---
+        name = raw.get("name")
+        if not name:
+            return None
 
+        # --- Poster image ---
         # Clean up — reject base64 placeholders and empty strings
+        # (left as None for the og:image fallback)
+        poster_url = raw.get("poster_url")
         if poster_url and (poster_url.startswith("data:") or poster_url.strip() == ""):
             poster_url = None
-            
-        
-
-
-        # Fallback — grab og:image from event detail page via HTTP (fast, no browser)
-        if not poster_url and source_url:
-            try:
-                resp = requests.get(source_url, timeout=8, headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                })
-                if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.text, "html.parser")
-                    og = soup.find("meta", property="og:image")
-                    if og and og.get("content"):
-                        poster_url = og["content"]
-            except Exception:
-                pass    
-        
-        
-
-        # --- Event name (required) ---
-        name = None
-        name_el = card.query_selector("div.meta-middle div.title h3")
-        if name_el:
-            name = name_el.inner_text().strip()
-        if not name:
-            return None
-        
         if not poster_url:
-            all_imgs = card.query_selector_all("img")
-            print(f"[DEBUG] No image for '{name}' — found {len(all_imgs)} img tags")
-            banner = card.query_selector("div.banner-cont")
-            if banner:
-                style = banner.get_attribute("style")
-                bg_style = page.evaluate("el => window.getComputedStyle(el).backgroundImage", banner)
-                print(f"  banner style attr: {style}")
-                print(f"  banner computed bg: {bg_style[:100] if bg_style else None}")
-            for i, debug_img in enumerate(all_imgs):
-                print(f"  img[{i}] src={debug_img.get_attribute('src')[:80] if debug_img.get_attribute('src') else None}")
-                print(f"  img[{i}] data-src={debug_img.get_attribute('data-src')[:80] if debug_img.get_attribute('data-src') else None}")
-                print(f"  img[{i}] class={debug_img.get_attribute('class')}")
+            logger.debug(
+                f"[Allevents] No image for '{name}' — found {raw.get('img_count', 0)} img tags"
+            )
 
         # --- Venue ---
-        venue_name = None
-        location_el = card.query_selector("div.meta-middle div.location")
-        if location_el:
-            venue_name = location_el.inner_text().strip()
+        venue_name = raw.get("venue_name")
 
         # --- Date ---
         # Format: "Sun, 28 Jun • 09:00 AM"
-        date_text = None
-        date_el = card.query_selector("div.meta-top div.date")
-        if date_el:
-            date_text = date_el.inner_text().strip()
-        parsed_date = self._parse_date(date_text)
+        parsed_date = self._parse_date(raw.get("date_text"))
 
         # --- Price ---
-        price_text = None
-        price_el = card.query_selector("div.meta-bottom span.price")
-        if price_el:
-            price_text = price_el.inner_text().strip()
-        price_min, price_max, is_free = self._parse_price(price_text)
+        price_min, price_max, is_free = self._parse_price(raw.get("price_text"))
         if price_min == 0.0:
             is_free = True
 
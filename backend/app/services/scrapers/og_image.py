@@ -0,0 +1,157 @@
+"""
+og:image poster fallback for scraped events.
+
+Cards that render without a poster get one from the og:image meta tag of
+their event page. OgImageFetcher resolves all of a scrape's missing
+posters together, after the browser work is done:
+
+    - bounded concurrency over one shared httpx connection pool
+    - streamed responses, parsed incrementally; reading stops at the
+      og:image tag or the end of <head>, never downloading the body
+    - posters already known (from the DB, or resolved earlier in this
+      process) are not fetched again
+
+Usage:
+    fetcher = OgImageFetcher(known={source_url: poster_url, ...})
+    posters = await fetcher.fetch_all(urls)     # {url: poster_url or None}
+"""
+
+import asyncio
+import logging
+from html.parser import HTMLParser
+from typing import Iterable, Mapping, Optional
+
+import httpx
+
+from app.core.config import SCRAPER_OG_CONCURRENCY
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+OG_TIMEOUT_SECONDS = 8
+MAX_HEAD_CHARS     = 256 * 1024    # give up on pages whose <head> is larger than this
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# source_url → poster resolved in this process; re-scrapes skip these
+poster_cache = TTLCache(maxsize=20_000, ttl_seconds=30 * 24 * 3600)
+
+
+# ------------------------------------------------------------------
+# Streaming <head> parser
+# ------------------------------------------------------------------
+
+class OgImageParser(HTMLParser):
+    """
+    Incremental parser: feed_chunk() until it returns True, then read
+    `og_image`. Done at the first og:image meta tag, once <head> is over,
+    or after MAX_HEAD_CHARS.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.og_image: Optional[str] = None
+        self.done  = False
+        self._read = 0
+
+    def feed_chunk(self, chunk: str) -> bool:
+        """Parse the next chunk of the document. Returns True once done."""
+        self.feed(chunk)
+        self._read += len(chunk)
+        if self._read >= MAX_HEAD_CHARS:
+            self.done = True
+        return self.done
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            attrs = dict(attrs)
+            key   = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key == "og:image" and (attrs.get("content") or "").strip():
+                self.og_image = attrs["content"].strip()
+                self.done     = True
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+
+
+# ------------------------------------------------------------------
+# Fetcher
+# ------------------------------------------------------------------
+
+class OgImageFetcher:
+    """
+    Resolves og:image posters for many event pages at once.
+
+    Args:
+        known: source_url → poster_url already on record (e.g. the DB)
+        concurrency: Pages fetched at once (also the connection pool size)
+    """
+
+    def __init__(self, known: Optional[Mapping[str, str]] = None, concurrency: int = SCRAPER_OG_CONCURRENCY):
+        self.known       = known or {}
+        self.concurrency = max(1, concurrency)
+
+    async def fetch_all(self, urls: Iterable[str]) -> dict[str, Optional[str]]:
+        """
+        Poster for each source URL (None where the page has no og:image
+        or could not be fetched).
+        """
+        posters: dict[str, Optional[str]] = {}
+        to_fetch = []
+
+        for url in dict.fromkeys(urls):
+            poster = self.known.get(url) or poster_cache.get(url)
+            if poster:
+                posters[url] = poster
+            else:
+                to_fetch.append(url)
+
+        if to_fetch:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            limits    = httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            )
+            async with httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=OG_TIMEOUT_SECONDS,
+                limits=limits,
+                follow_redirects=True,
+            ) as client:
+                fetched = await asyncio.gather(*(
+                    self._fetch(client, semaphore, url) for url in to_fetch
+                ))
+
+            for url, poster in zip(to_fetch, fetched):
+                posters[url] = poster
+                if poster:
+                    poster_cache.set(url, poster)
+
+        found = sum(1 for url in to_fetch if posters[url])
+        logger.info(
+            f"[OgImage] {len(posters)} posters needed — "
+            f"{len(posters) - len(to_fetch)} already known, "
+            f"{found}/{len(to_fetch)} fetched"
+        )
+        return posters
+
+    async def _fetch(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str) -> Optional[str]:
+        async with semaphore:
+            try:
+                async with client.stream("GET", url) as resp:
+                    if resp.status_code != 200:
+                        return None
+
+                    parser = OgImageParser()
+                    async for chunk in resp.aiter_text():
+                        if parser.feed_chunk(chunk):
+                            break
+                    return parser.og_image
+
+            except Exception as e:
+                # Timeouts, bad redirects, malformed HTML — the event just keeps no poster
+                logger.debug(f"[OgImage] {url} failed: {e}")
+                return None
@@ -2,7 +2,9 @@
 Scraper scheduler and database upsert service.
 
 - Runs the Allevents scraper on a weekly schedule.
-- Upserts scraped events into the database (insert or update by source_url).
+- Skips scraped events whose content fingerprint matches the stored row,
+  so classification and DB writes scale with churn, not catalog size.
+- Upserts new/changed events into the database (insert or update by source_url).
 - Can be triggered manually via an admin endpoint.
 
 How to start (add to main.py startup):
@@ -14,16 +16,21 @@ How to start (add to main.py startup):
         start_scheduler(SessionLocal)
 """
 
+import hashlib
 import logging
 import uuid
 from datetime import datetime, timezone
-from typing import Callable
+from typing import Callable, Mapping
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.event import Event
+from app.services.event_catalog import event_catalog
 from app.services.scrapers.allevents_scraper import AlleventsScraper
 from app.services.genre_classifier import GenreClassifier
 
@@ -36,6 +43,16 @@ SCRAPE_INTERVAL_DAYS = 7  # re-scrape every 7 days
 # Upsert logic
 # ------------------------------------------------------------------
 
+# Rows per INSERT ... ON CONFLICT statement
+UPSERT_CHUNK_SIZE = 200
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite":     sqlite.insert,
+}
+
+
 def upsert_events(db: Session, raw_events: list[dict]) -> dict:
     """
     Insert new events or update existing ones by source_url.
@@ -46,8 +63,13 @@ def upsert_events(db: Session, raw_events: list[dict]) -> dict:
         If the event already exists we update price and date in case
         they changed. If it's new we insert it fresh.
 
+    Rows are written in chunks of UPSERT_CHUNK_SIZE with one
+    INSERT ... ON CONFLICT (source_url) DO UPDATE each, inside a savepoint.
+    If a chunk fails it is retried row by row, so one bad row is skipped
+    without losing the rest of the batch.
+
     Args:
-        db: SQLAlchemy session
+        db: SQLAlchemy session (PostgreSQL or SQLite)
         raw_events: List of raw dicts from scraper
 
     Returns:
@@ -57,6 +79,12 @@ def upsert_events(db: Session, raw_events: list[dict]) -> dict:
     updated  = 0
     skipped  = 0
 
+    dialect = db.get_bind().dialect.name
+    insert  = _UPSERT_INSERTS.get(dialect)
+    if insert is None:
+        raise ValueError(f"upsert_events needs PostgreSQL or SQLite, not {dialect}")
+
+    rows = {}
     for raw in raw_events:
         source_url = raw.get("source_url")
 
@@ -73,61 +101,231 @@ def upsert_events(db: Session, raw_events: list[dict]) -> dict:
             skipped += 1
             continue
 
-        try:
-            existing = db.query(Event).filter_by(source_url=source_url).first()
-
-            if existing:
-                existing.ticket_price      = raw.get("ticket_price", existing.ticket_price)
-                existing.ticket_price_min  = raw.get("ticket_price_min", existing.ticket_price_min)
-                existing.ticket_price_max  = raw.get("ticket_price_max", existing.ticket_price_max)
-                existing.is_free           = raw.get("is_free", existing.is_free)
-                existing.poster_url        = raw.get("poster_url") or existing.poster_url
-                existing.venue_name        = raw.get("venue_name") or existing.venue_name
-                existing.date              = raw.get("date") or existing.date
-                existing.last_refreshed_at = datetime.now(timezone.utc)
-                updated += 1
-
-            else:
-                event = Event(
-                    id               = str(uuid.uuid4()),  # generate unique ID
-                    name             = raw.get("name", "Untitled Event"),
-                    description      = raw.get("description"),
-                    genre            = raw.get("genre"),
-                    poster_url       = raw.get("poster_url"),
-                    ticket_price     = raw.get("ticket_price", 0.0),
-                    ticket_price_min = raw.get("ticket_price_min", 0.0),
-                    ticket_price_max = raw.get("ticket_price_max", 0.0),
-                    ticket_url       = raw.get("ticket_url"),
-                    is_free          = raw.get("is_free", False),
-                    currency         = raw.get("currency", "KES"),
-                    venue_name       = raw.get("venue_name"),
-                    city             = raw.get("city", "Nairobi"),
-                    latitude         = raw.get("latitude"),
-                    longitude        = raw.get("longitude"),
-                    date             = raw.get("date"),
-                    food_type        = raw.get("food_type"),
-                    crowd_level      = raw.get("crowd_level", "MEDIUM"),
-                    event_type       = raw.get("event_type", "indoor"),
-                    source           = raw.get("source", "allevents"),
-                    source_url       = source_url,
-                    scraped_at       = raw.get("scraped_at", datetime.now(timezone.utc)),
-                    last_refreshed_at = raw.get("last_refreshed_at", datetime.now(timezone.utc)),
-                )
-                db.add(event)
-                inserted += 1
-
-        except Exception as e:
-            logger.error(f"[Upsert] Failed for {source_url}: {e}")
-            db.rollback()
+        # Same event listed under two cities — the first listing wins
+        if source_url in rows:
             skipped += 1
             continue
 
+        rows[source_url] = _event_row(raw)
+
+    rows = list(rows.values())
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk_inserted, chunk_updated, chunk_skipped = _upsert_chunk(
+            db, insert, rows[i:i + UPSERT_CHUNK_SIZE]
+        )
+        inserted += chunk_inserted
+        updated  += chunk_updated
+        skipped  += chunk_skipped
+
     db.commit()
+    event_catalog.mark_stale()  # pick up the new/changed rows on the next request
+
     summary = {"inserted": inserted, "updated": updated, "skipped": skipped}
     logger.info(f"[Upsert] Complete: {summary}")
     return summary
 
 
+def _event_row(raw: dict) -> dict:
+    """Column values for one scraped event (every row has the same keys)."""
+    now = datetime.now(timezone.utc)
+    return {
+        "id":                str(uuid.uuid4()),  # generate unique ID
+        "name":              raw.get("name") or "Untitled Event",
+        "description":       raw.get("description"),
+        "genre":             raw.get("genre"),
+        "poster_url":        raw.get("poster_url") or None,
+        "ticket_price":      raw.get("ticket_price", 0.0),
+        "ticket_price_min":  raw.get("ticket_price_min", 0.0),
+        "ticket_price_max":  raw.get("ticket_price_max", 0.0),
+        "ticket_url":        raw.get("ticket_url"),
+        "is_free":           raw.get("is_free", False),
+        "currency":          raw.get("currency", "KES"),
+        "venue_name":        raw.get("venue_name") or None,
+        "city":              raw.get("city", "Nairobi"),
+        "latitude":          raw.get("latitude"),
+        "longitude":         raw.get("longitude"),
+        "date":              raw.get("date"),
+        "food_type":         raw.get("food_type"),
+        "crowd_level":       raw.get("crowd_level", "MEDIUM"),
+        "event_type":        raw.get("event_type", "indoor"),
+        "source":            raw.get("source", "allevents"),
+        "source_url":        raw["source_url"],
+        "scraped_at":        raw.get("scraped_at", now),
+        "last_refreshed_at": raw.get("last_refreshed_at", now),
+        "created_at":        now,
+        "updated_at":        now,
+    }
+
+
+def _upsert_chunk(db: Session, insert, rows: list[dict]) -> tuple[int, int, int]:
+    """
+    Upsert rows in one statement inside a savepoint; on failure, split
+    into single rows so only the bad ones are skipped.
+
+    Returns:
+        (inserted, updated, skipped)
+    """
+    try:
+        with db.begin_nested():
+            inserted = _execute_upsert(db, insert, rows)
+        return inserted, len(rows) - inserted, 0
+
+    except SQLAlchemyError as e:
+        e = getattr(e, "orig", None) or e   # driver message, without the SQL dump
+        if len(rows) == 1:
+            logger.error(f"[Upsert] Failed for {rows[0]['source_url']}: {e}")
+            return 0, 0, 1
+
+        logger.warning(f"[Upsert] Batch of {len(rows)} failed — retrying row by row: {e}")
+        totals = [0, 0, 0]
+        for row in rows:
+            for n, count in enumerate(_upsert_chunk(db, insert, [row])):
+                totals[n] += count
+        return tuple(totals)
+
+
+def _execute_upsert(db: Session, insert, rows: list[dict]) -> int:
+    """
+    INSERT ... ON CONFLICT (source_url) DO UPDATE for rows.
+    Existing events get price, free flag, name, poster, venue and date
+    (poster/venue/date only when the scrape has one). Returns rows inserted.
+    """
+    stmt     = insert(Event).values(rows)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Event.source_url],
+        set_={
+            "name":              excluded.name,
+            "ticket_price":      excluded.ticket_price,
+            "ticket_price_min":  excluded.ticket_price_min,
+            "ticket_price_max":  excluded.ticket_price_max,
+            "is_free":           excluded.is_free,
+            "poster_url":        func.coalesce(excluded.poster_url, Event.poster_url),
+            "venue_name":        func.coalesce(excluded.venue_name, Event.venue_name),
+            "date":              func.coalesce(excluded.date, Event.date),
+            "last_refreshed_at": excluded.last_refreshed_at,
+            "updated_at":        excluded.updated_at,   # ON CONFLICT skips the ORM onupdate
+        },
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        # xmax is 0 only for rows this statement inserted
+        return sum(db.execute(stmt.returning(literal_column("xmax = 0"))).scalars())
+
+    # SQLite: look up which source_urls already exist first
+    existing = db.query(func.count(Event.id)).filter(
+        Event.source_url.in_([row["source_url"] for row in rows])
+    ).scalar()
+    db.execute(stmt)
+    return len(rows) - existing
+
+
+# ------------------------------------------------------------------
+# Change detection — only new/changed events are classified and upserted
+# ------------------------------------------------------------------
+
+# Scraped fields a re-scrape can change (and upsert_events writes back)
+FINGERPRINT_FIELDS = (
+    "name", "date", "ticket_price_min", "ticket_price_max",
+    "is_free", "venue_name", "poster_url",
+)
+
+# Source URLs per IN (...) statement
+TOUCH_CHUNK_SIZE = 500
+
+
+def event_fingerprint(values: Mapping) -> str:
+    """Hash of FINGERPRINT_FIELDS — equal for a scraped dict and its unchanged stored row."""
+    parts = []
+    for field in FINGERPRINT_FIELDS:
+        value = values.get(field)
+        if value is None:
+            value = ""
+        elif isinstance(value, float):
+            value = f"{value:.2f}"
+        parts.append(str(value).strip())
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _known_events(db: Session) -> dict[str, dict]:
+    """source_url → stored FINGERPRINT_FIELDS for every scraped event in the DB."""
+    columns = [getattr(Event, field) for field in FINGERPRINT_FIELDS]
+    rows    = db.query(Event.source_url, *columns).filter(Event.source_url.isnot(None)).all()
+    return {row[0]: dict(zip(FINGERPRINT_FIELDS, row[1:])) for row in rows}
+
+
+def split_by_change(raw_events: list[dict], known: Mapping[str, dict]) -> tuple[list, list, list]:
+    """
+    Split scraped events into (new, changed, unchanged) against the stored rows.
+
+    A missing poster or venue counts as unchanged when the row has one,
+    matching upsert_events, which keeps the stored value in that case.
+    """
+    new, changed, unchanged = [], [], []
+
+    for raw in raw_events:
+        stored = known.get(raw.get("source_url"))
+        if stored is None:
+            new.append(raw)
+            continue
+
+        effective = {
+            **raw,
+            "poster_url": raw.get("poster_url") or stored["poster_url"],
+            "venue_name": raw.get("venue_name") or stored["venue_name"],
+        }
+        if event_fingerprint(effective) == event_fingerprint(stored):
+            unchanged.append(raw)
+        else:
+            changed.append(raw)
+
+    return new, changed, unchanged
+
+
+def _touch_unchanged(db: Session, raw_events: list[dict]) -> None:
+    """Bump last_refreshed_at for events seen again without changes, in bulk."""
+    source_urls = [raw["source_url"] for raw in raw_events]
+    now         = datetime.now(timezone.utc)
+
+    for i in range(0, len(source_urls), TOUCH_CHUNK_SIZE):
+        (
+            db.query(Event)
+            .filter(Event.source_url.in_(source_urls[i:i + TOUCH_CHUNK_SIZE]))
+            .update(
+                # Setting updated_at to itself skips its onupdate, so the
+                # event catalog doesn't reload rows whose content is the same
+                {Event.last_refreshed_at: now, Event.updated_at: Event.updated_at},
+                synchronize_session=False,
+            )
+        )
+    db.commit()
+
+
+def scrape_and_upsert(db: Session) -> dict:
+    """
+    Full scrape → change detection → classify + upsert of new/changed events.
+
+    Returns:
+        upsert_events() summary plus new/changed/unchanged counts.
+    """
+    known      = _known_events(db)
+    posters    = {url: row["poster_url"] for url, row in known.items() if row["poster_url"]}
+    raw_events = AlleventsScraper(known_posters=posters).scrape()
+
+    new, changed, unchanged = split_by_change(raw_events, known)
+    logger.info(
+        f"[Scheduler] {len(raw_events)} scraped — new: {len(new)}, "
+        f"changed: {len(changed)}, unchanged: {len(unchanged)}"
+    )
+
+    # Classify genres before inserting into DB
+    emitted = GenreClassifier.classify_batch(new + changed, db=db)
+    summary = upsert_events(db, emitted)
+    _touch_unchanged(db, unchanged)
+
+    return {**summary, "new": len(new), "changed": len(changed), "unchanged": len(unchanged)}
+
+
 # ------------------------------------------------------------------
 # Scheduler
 # ------------------------------------------------------------------
@@ -140,10 +338,7 @@ def _scrape_and_store(db_factory: Callable[[], Session]) -> None:
     logger.info("[Scheduler] Starting scheduled scrape job...")
     db = db_factory()
     try:
-        raw_events = AlleventsScraper().scrape()
-        # Classify genres before inserting into DB
-        raw_events = GenreClassifier.classify_batch(raw_events)
-        summary    = upsert_events(db, raw_events)
+        summary = scrape_and_upsert(db)
         logger.info(f"[Scheduler] Done. Summary: {summary}")
     except Exception as e:
         logger.error(f"[Scheduler] Job failed: {e}")
@@ -185,8 +380,6 @@ def trigger_manual_scrape(db_factory: Callable[[], Session]) -> dict:
     logger.info("[Scheduler] Manual scrape triggered.")
     db = db_factory()
     try:
-        raw_events = AlleventsScraper().scrape()
-        raw_events = GenreClassifier.classify_batch(raw_events)  # classify before upsert
-        return upsert_events(db, raw_events)
+        return scrape_and_upsert(db)
     finally:
         db.close()
\ No newline at end of file
@@ -4,6 +4,8 @@ Calculate geographic distances using the Haversine formula.
 
 import math
 
+import numpy as np
+
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -37,3 +39,51 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     
     distance = R * c
     return distance
+
+
+def haversine_distance_array(lat1: float, lon1: float, lat2, lon2):
+    """
+    Vectorised Haversine: distances from one point to many points.
+
+    Args:
+        lat1: Latitude of the origin point (degrees)
+        lon1: Longitude of the origin point (degrees)
+        lat2: Array of latitudes (degrees)
+        lon2: Array of longitudes (degrees)
+
+    Returns:
+        NumPy array of distances in kilometers, same length as lat2/lon2
+    """
+    lat2_rad = np.radians(np.asarray(lat2, dtype=np.float64))
+    lon2_rad = np.radians(np.asarray(lon2, dtype=np.float64))
+    return haversine_distance_from_radians(lat1, lon1, lat2_rad, lon2_rad, np.cos(lat2_rad))
+
+
+def haversine_distance_from_radians(lat1: float, lon1: float, lat2_rad, lon2_rad, cos_lat2):
+    """
+    Vectorised Haversine against points whose radians and cos(latitude)
+    were precomputed once (e.g. when the event catalog is built), so a
+    query only pays for the terms that depend on the origin point.
+
+    Args:
+        lat1: Latitude of the origin point (degrees)
+        lon1: Longitude of the origin point (degrees)
+        lat2_rad: Array of latitudes (radians)
+        lon2_rad: Array of longitudes (radians)
+        cos_lat2: Array of cos(lat2_rad)
+
+    Returns:
+        NumPy array of distances in kilometers
+    """
+    R = 6371.0
+
+    lat1_rad = math.radians(lat1)
+    lon1_rad = math.radians(lon1)
+
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * cos_lat2 * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(a))
+
+    return R * c
@@ -0,0 +1,107 @@
+"""
+Aho-Corasick multi-keyword matcher.
+
+Finds every occurrence of a fixed set of keywords in one pass over the
+text, instead of one `keyword in text` scan per keyword. Matching is plain
+substring matching (like `in`); each hit also records whether it sits on
+word boundaries the way `re.search(r"\b" + keyword + r"\b")` would, for
+callers that want whole-word semantics.
+
+Usage:
+    matcher = KeywordMatcher(["music", "live music", "art"])
+    matcher.matched("live music party")                    # {"music", "live music", "art"}
+    matcher.matched("live music party", whole_words=True)  # {"music", "live music"}
+"""
+
+from collections import deque
+from typing import Iterable, NamedTuple
+
+
+class KeywordHit(NamedTuple):
+    keyword:    str
+    start:      int
+    end:        int    # exclusive
+    whole_word: bool   # a regex \b holds at start and at end
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """
+    Automaton over a fixed keyword set. Keywords are matched as given —
+    lowercase both keywords and text for case-insensitive matching.
+
+    Args:
+        keywords: Keywords to look for (duplicates and empty strings ignored)
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+
+        # Whether each keyword starts / ends with a word character, for \b checks
+        self._edges = [(_is_word_char(k[0]), _is_word_char(k[-1])) for k in self.keywords]
+
+        # Trie: per state, char → next state; outputs are keyword indexes
+        self._goto:   list[dict[str, int]] = [{}]
+        self._fail:   list[int]            = [0]
+        self._output: list[list[int]]      = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = nxt
+            self._output[state].append(index)
+
+        # Failure links, breadth-first; outputs inherit their fallback's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def find(self, text: str) -> list[KeywordHit]:
+        """Every keyword occurrence in text, overlapping ones included, by end position."""
+        return list(self._scan(text))
+
+    def search(self, text: str) -> KeywordHit | None:
+        """First keyword occurrence in text (by end position), or None — stops scanning there."""
+        return next(self._scan(text), None)
+
+    def _scan(self, text: str):
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for index in output[state]:
+                keyword = self.keywords[index]
+                start   = i - len(keyword) + 1
+                end     = i + 1
+                starts_word, ends_word = self._edges[index]
+                # \b: word character on exactly one side of each edge
+                whole_word = (
+                    starts_word != (start > 0 and _is_word_char(text[start - 1]))
+                    and ends_word != (end < len(text) and _is_word_char(text[end]))
+                )
+                yield KeywordHit(keyword, start, end, whole_word)
+
+    def matched(self, text: str, whole_words: bool = False) -> set[str]:
+        """Set of keywords that occur in text (only whole-word hits if asked)."""
+        return {hit.keyword for hit in self.find(text) if hit.whole_word or not whole_words}
@@ -0,0 +1,151 @@
+"""
+Grid spatial index over event coordinates.
+
+Scraped events are placed at their city's center, so thousands of events
+share a handful of distinct points. The index groups rows by distinct
+point, buckets the points into a lat/lng grid, and answers radius queries
+by computing Haversine distances only for points in nearby cells — then
+expanding each point back to its rows.
+"""
+
+import math
+
+import numpy as np
+
+from app.utils.distance import haversine_distance_from_radians
+
+# Great-circle km per degree of latitude (Earth radius 6371 km)
+KM_PER_DEGREE = 6371.0 * math.pi / 180
+
+
+class GeoGridIndex:
+    """
+    Radius queries over a fixed set of (latitude, longitude) rows.
+
+    Args:
+        latitudes: Array of row latitudes (degrees)
+        longitudes: Array of row longitudes (degrees)
+        cell_degrees: Grid cell size in degrees (0.5° ≈ 55 km)
+    """
+
+    def __init__(self, latitudes, longitudes, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+
+        coords = np.column_stack([
+            np.asarray(latitudes, dtype=np.float64),
+            np.asarray(longitudes, dtype=np.float64),
+        ])
+
+        # Distinct points, and the point each row sits on
+        if len(coords):
+            self.points, point_of_row = np.unique(coords, axis=0, return_inverse=True)
+            self.point_of_row = point_of_row.ravel()
+        else:
+            self.points       = np.empty((0, 2))
+            self.point_of_row = np.empty(0, dtype=np.int64)
+
+        # Radians and cos(latitude) of each point, computed once per snapshot
+        self._lat_rad = np.radians(self.points[:, 0])
+        self._lng_rad = np.radians(self.points[:, 1])
+        self._cos_lat = np.cos(self._lat_rad)
+
+        # Rows grouped by point: rows of point p are
+        # _rows_by_point[_point_starts[p]:_point_starts[p + 1]], in row order
+        self._rows_by_point = np.argsort(self.point_of_row, kind="stable")
+        self._point_starts  = np.concatenate([
+            [0], np.cumsum(np.bincount(self.point_of_row, minlength=len(self.points)))
+        ])
+
+        # Points grouped by grid cell
+        cells: dict[tuple[int, int], list[int]] = {}
+        for p, (lat, lng) in enumerate(self.points):
+            cells.setdefault(self._cell(lat, lng), []).append(p)
+        self._cells = {cell: np.array(ids, dtype=np.int64) for cell, ids in cells.items()}
+
+    def __len__(self) -> int:
+        return len(self.point_of_row)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def distances(self, lat: float, lng: float) -> np.ndarray:
+        """Distance in km from (lat, lng) to every row, one Haversine per distinct point."""
+        point_distances = haversine_distance_from_radians(
+            lat, lng, self._lat_rad, self._lng_rad, self._cos_lat
+        )
+        return point_distances[self.point_of_row]
+
+    def query_radius(self, lat: float, lng: float, radius_km: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rows within radius_km of (lat, lng).
+
+        Returns:
+            Tuple of (row indices in ascending order, their distances in km).
+        """
+        point_ids = self._points_near(lat, lng, radius_km)
+
+        point_distances = haversine_distance_from_radians(
+            lat, lng, self._lat_rad[point_ids], self._lng_rad[point_ids], self._cos_lat[point_ids]
+        )
+        keep = point_distances <= radius_km
+        point_ids, point_distances = point_ids[keep], point_distances[keep]
+
+        if not len(point_ids):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        rows = np.concatenate([
+            self._rows_by_point[self._point_starts[p]:self._point_starts[p + 1]]
+            for p in point_ids
+        ])
+        row_distances = np.repeat(
+            point_distances, self._point_starts[point_ids + 1] - self._point_starts[point_ids]
+        )
+
+        order = np.argsort(rows, kind="stable")
+        return rows[order], row_distances[order]
+
+    # ------------------------------------------------------------------
+    # Grid helpers
+    # ------------------------------------------------------------------
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def _points_near(self, lat: float, lng: float, radius_km: float) -> np.ndarray:
+        """
+        Candidate point ids from the cells overlapping a bounding box around
+        (lat, lng). Conservative: may include points beyond radius_km, never
+        misses one inside it.
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        max_abs_lat = abs(lat) + dlat
+
+        # Box reaches a pole or wraps the antimeridian — check every point
+        if max_abs_lat >= 90:
+            return np.arange(len(self.points))
+        dlng = dlat / math.cos(math.radians(max_abs_lat))
+        if dlng >= 180 or lng - dlng < -180 or lng + dlng > 180:
+            return np.arange(len(self.points))
+
+        lat_lo, lng_lo = self._cell(lat - dlat, lng - dlng)
+        lat_hi, lng_hi = self._cell(lat + dlat, lng + dlng)
+
+        n_box_cells = (lat_hi - lat_lo + 1) * (lng_hi - lng_lo + 1)
+        if n_box_cells <= len(self._cells):
+            cells = (
+                (i, j)
+                for i in range(lat_lo, lat_hi + 1)
+                for j in range(lng_lo, lng_hi + 1)
+            )
+        else:
+            # Large radius — cheaper to scan the occupied cells
+            cells = (
+                (i, j) for (i, j) in self._cells
+                if lat_lo <= i <= lat_hi and lng_lo <= j <= lng_hi
+            )
+
+        found = [self._cells[cell] for cell in cells if cell in self._cells]
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(found)
@@ -0,0 +1,18 @@
+"""
+Text normalization shared by the caches keyed on free text
+(chat interpretations, event genres).
+"""
+
+import re
+
+# Prices ("$50", "49.99") stay one token; everything else splits on
+# punctuation and whitespace
+_TOKEN_RE = re.compile(r"\$?\d+(?:\.\d+)?|\w+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase words and numbers joined by single spaces, so case, spacing
+    and punctuation differences normalize to the same string.
+    """
+    return " ".join(_TOKEN_RE.findall(text.lower()))
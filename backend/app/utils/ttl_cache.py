@@ -0,0 +1,115 @@
+"""
+Thread-safe LRU cache with a per-entry time-to-live.
+
+Entries are evicted least-recently-used first once `maxsize` entries (or
+`max_bytes`, when a sizeof function is given) is reached, and treated as
+missing once they are older than `ttl_seconds`. Hits and misses are counted.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    Bounded mapping of key → value with LRU eviction and expiry.
+
+    Args:
+        maxsize: Maximum number of entries kept
+        ttl_seconds: Seconds an entry stays valid after it was stored
+        max_bytes: Optional bound on the summed sizeof() of stored entries
+        sizeof: Estimated size in bytes of (key, value); required with max_bytes
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Hashable, Any], int] | None = None,
+    ):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes needs a sizeof function")
+
+        self.maxsize     = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes   = max_bytes
+        self.sizeof      = sizeof
+
+        self.hits   = 0
+        self.misses = 0
+
+        self._lock  = threading.Lock()
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value for key (marking it recently used), else default."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            stored_at, value, _ = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entries if full."""
+        if self.maxsize <= 0:
+            return
+
+        size = self.sizeof(key, value) if self.sizeof else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.monotonic(), value, size)
+            self._bytes += size
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._data)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value (expired or not), else default."""
+        with self._lock:
+            entry = self._remove(key)
+            return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Entry count, estimated bytes and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries":  len(self._data),
+                "bytes":    self._bytes,
+                "hits":     self.hits,
+                "misses":   self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def _remove(self, key: Hashable):
+        """Drop key if present (caller holds the lock) and return its entry."""
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+        return entry
@@ -0,0 +1,57 @@
+"""
+Shared helpers for the tests that touch the database.
+
+Importing this module points DATABASE_URL at SQLite when it isn't set —
+app.core.database builds its engine at import, and the tests must never
+reach for PostgreSQL — so import it right after the backend path setup,
+before anything from app.
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.event import Event
+
+
+def raw_event(n: int, **overrides) -> dict:
+    """A scraped event dict like AlleventsScraper.parse_cards() returns."""
+    raw = {
+        "name":             f"Event {n}",
+        "source_url":       f"https://allevents.in/nairobi/event-{n}/{n}",
+        "date":             "2026-06-28",
+        "poster_url":       f"https://cdn.allevents.in/banners/{n}.jpg",
+        "venue_name":       "KICC",
+        "ticket_price":     500.0,
+        "ticket_price_min": 500.0,
+        "ticket_price_max": 500.0,
+        "is_free":          False,
+        "city":             "Nairobi",
+        "genre":            "Music",
+    }
+    raw.update(overrides)
+    return raw
+
+
+def events_sessionmaker(*tables) -> sessionmaker:
+    """Sessions on a new in-memory SQLite database holding the events table (plus `tables`)."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    for table in (Event.__table__, *tables):
+        table.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def empty_events(session_factory: sessionmaker) -> Session:
+    """A new session on an emptied events table."""
+    db = session_factory()
+    db.query(Event).delete()
+    db.commit()
+    return db
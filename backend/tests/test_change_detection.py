@@ -0,0 +1,164 @@
+"""
+Unit tests for scrape change detection.
+Runs split_by_change against rows actually written by upsert_events to an
+in-memory SQLite database, so a re-scrape of the same listings must come
+back unchanged, and checks that _touch_unchanged bumps last_refreshed_at
+without moving updated_at (the event catalog's refresh watermark).
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from helpers import empty_events, events_sessionmaker, raw_event
+
+from app.models.event import Event
+from app.services.scrapers import scheduler
+from app.services.scrapers.scheduler import (
+    _known_events,
+    _touch_unchanged,
+    event_fingerprint,
+    split_by_change,
+    upsert_events,
+)
+
+
+def _urls(raw_events: list[dict]) -> list[str]:
+    return [raw["source_url"] for raw in raw_events]
+
+
+class TestChangeDetection:
+    """Test cases for event_fingerprint, split_by_change and _touch_unchanged."""
+
+    def __init__(self):
+        self.Session = events_sessionmaker()
+
+    def _session(self, stored: list[dict]):
+        """Fresh session on an events table holding the upserted `stored` listings."""
+        db = empty_events(self.Session)
+        upsert_events(db, stored)
+        return db
+
+    def test_fingerprint(self):
+        """Only FINGERPRINT_FIELDS count; None, blanks and float formatting compare equal."""
+        print("\n" + "="*80)
+        print("TEST: Event fingerprint")
+        print("="*80)
+
+        base = raw_event(1)
+        assert event_fingerprint(base) == event_fingerprint(
+            raw_event(1, genre="Sports", city="Mombasa", ticket_price=1.0)
+        )
+        assert event_fingerprint(base) == event_fingerprint(raw_event(1, name=" Event 1 ", ticket_price_min=500.001))
+        assert event_fingerprint(raw_event(1, poster_url=None)) == event_fingerprint(raw_event(1, poster_url=""))
+
+        for field, value in [
+            ("name", "Event 1 (Moved)"), ("date", "2026-07-05"), ("ticket_price_min", 400.0),
+            ("ticket_price_max", 2000.0), ("is_free", True), ("venue_name", "Carnivore"),
+            ("poster_url", "https://cdn.allevents.in/banners/new.jpg"),
+        ]:
+            assert event_fingerprint(base) != event_fingerprint(raw_event(1, **{field: value})), field
+        print("✓ PASSED\n")
+
+    def test_split_against_stored_rows(self):
+        """A re-scrape of stored listings is unchanged; edits are changed; unknown URLs are new."""
+        print("\n" + "="*80)
+        print("TEST: split_by_change against upserted rows")
+        print("="*80)
+
+        free  = dict(is_free=True, ticket_price_min=0.0, ticket_price_max=0.0)
+        db    = self._session([raw_event(n) for n in range(6)] + [raw_event(9, **free)])
+        known = _known_events(db)
+        db.close()
+
+        rescrape = [
+            raw_event(0),                                              # same listing
+            raw_event(9, **free),
+            raw_event(1, poster_url=None),                             # poster missing — kept on upsert
+            raw_event(2, venue_name=""),                               # venue missing — kept on upsert
+            raw_event(3, ticket_price_min=800.0),                      # price changed
+            raw_event(4, name="Event 4 (Rescheduled)", date="2026-07-04"),
+            raw_event(5, poster_url="https://cdn.allevents.in/banners/5b.jpg"),
+            raw_event(7),                                              # not stored yet
+            raw_event(8, source_url=None),
+        ]
+        new, changed, unchanged = split_by_change(rescrape, known)
+        print(f"new: {len(new)} | changed: {len(changed)} | unchanged: {len(unchanged)}")
+
+        assert _urls(unchanged) == _urls([raw_event(0), raw_event(9), raw_event(1), raw_event(2)])
+        assert _urls(changed) == _urls([raw_event(3), raw_event(4), raw_event(5)])
+        assert _urls(new) == [raw_event(7)["source_url"], None]
+
+        # What upsert_events writes for a changed listing reads back as unchanged
+        db = self.Session()
+        upsert_events(db, changed)
+        _, changed_again, _ = split_by_change(changed, _known_events(db))
+        assert changed_again == [], "Upserted changes should match the stored rows"
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_touch_unchanged(self):
+        """Unchanged rows get a new last_refreshed_at; updated_at and other rows stay put."""
+        print("\n" + "="*80)
+        print("TEST: _touch_unchanged")
+        print("="*80)
+
+        db    = self._session([raw_event(n) for n in range(7)])
+        old   = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        db.query(Event).update(
+            {Event.last_refreshed_at: old, Event.updated_at: old}, synchronize_session=False
+        )
+        db.commit()
+
+        chunk_size, scheduler.TOUCH_CHUNK_SIZE = scheduler.TOUCH_CHUNK_SIZE, 2
+        try:
+            started = datetime.now(timezone.utc) - timedelta(seconds=1)
+            _touch_unchanged(db, [raw_event(n) for n in range(5)])
+        finally:
+            scheduler.TOUCH_CHUNK_SIZE = chunk_size
+
+        db.expire_all()
+        for event in db.query(Event).order_by(Event.source_url):
+            touched = event.source_url in _urls([raw_event(n) for n in range(5)])
+            refreshed = event.last_refreshed_at.replace(tzinfo=timezone.utc)
+            assert event.updated_at.replace(tzinfo=timezone.utc) == old, f"{event.name} updated_at moved"
+            assert (refreshed >= started) == touched, f"{event.name} last_refreshed_at"
+
+        _touch_unchanged(db, [])
+        db.close()
+        print("5 of 7 rows refreshed across 3 chunks, updated_at untouched")
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("CHANGE DETECTION TESTS")
+    print("="*80)
+
+    test_suite = TestChangeDetection()
+
+    try:
+        test_suite.test_fingerprint()
+        test_suite.test_split_against_stored_rows()
+        test_suite.test_touch_unchanged()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
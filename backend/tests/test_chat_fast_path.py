@@ -0,0 +1,188 @@
+"""
+Unit tests for the rule-based chat fast path.
+Checks each gate in _try_fast_path — negation, whole-word vs substring
+ambiguity and the CHAT_FAST_PATH_MIN_CONFIDENCE threshold — and that
+interpret_with_llm only calls the model for the queries it turns away.
+
+ollama_client.generate is replaced with a recording stub, so no Ollama
+server is needed.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services import llm_interpreter
+from app.services.llm_cache import interpret_cache
+from app.services.llm_interpreter import _try_fast_path, fast_path_stats, interpret_with_llm
+from app.services.ollama_client import ollama_client
+
+LLM_ANSWER = {
+    "budget": None, "preferred_genres": ["music"], "distance_preference": None,
+    "food_preference": None, "weight_emphasis": "genre", "needs_clarification": False,
+    "follow_up_question": None, "confidence": 0.9,
+}
+
+
+class TestChatFastPath:
+    """Test cases for _try_fast_path and its use in interpret_with_llm."""
+
+    def _outcome(self, message: str) -> tuple[str, dict | None]:
+        """Run the fast path and report which counter it bumped."""
+        before = fast_path_stats()
+        result = _try_fast_path(message)
+        after  = fast_path_stats()
+        moved  = [k for k in ("bypassed", "negation", "ambiguous", "low_confidence") if after[k] != before[k]]
+        assert len(moved) == 1 and after["queries"] == before["queries"] + 1
+        assert (result is not None) == (moved[0] == "bypassed")
+        return moved[0], result
+
+    def test_clear_queries_bypass(self):
+        """Queries with two or more whole-word signals are answered by the rules."""
+        print("\n" + "="*80)
+        print("TEST: Clear queries skip the LLM")
+        print("="*80)
+
+        outcome, result = self._outcome("cheap music events near me")
+        print(f"Result: {result}")
+        assert outcome == "bypassed"
+        assert result["budget"] == 30.0 and result["preferred_genres"] == ["music"]
+        assert result["distance_preference"] == "near" and result["confidence"] == 0.75
+        assert result["needs_clarification"] is False
+
+        outcome, result = self._outcome("football near me with pizza under $40")
+        assert outcome == "bypassed" and result["confidence"] == 0.85
+        assert result["food_preference"] == "pizza" and result["budget"] == 40.0
+
+        # "north" and "notebook" start with a negation word but are not one
+        outcome, _ = self._outcome("hackathon up north, bring a notebook, nearby")
+        assert outcome == "bypassed"
+        print("✓ PASSED\n")
+
+    def test_negation_gate(self):
+        """Any negation sends the query to the LLM, however confident the rules are."""
+        print("\n" + "="*80)
+        print("TEST: Negation gate")
+        print("="*80)
+
+        for message in [
+            "no music please, near me",
+            "cheap concerts but not far",
+            "I don't want to travel for food",
+            "Dont show sports, tech events nearby",
+            "art exhibitions without the crowds, near me",
+            "anything except comedy near me under $20",
+        ]:
+            outcome, _ = self._outcome(message)
+            print(f"{message!r} → {outcome}")
+            assert outcome == "negation", message
+        print("✓ PASSED\n")
+
+    def test_ambiguity_gate(self):
+        """A keyword found only inside another word means the readings disagree."""
+        print("\n" + "="*80)
+        print("TEST: Ambiguity gate")
+        print("="*80)
+
+        # "art" in "party", "run" in "brunch" — substring hits only
+        for message in ["a party near me", "brunch spots nearby under $30"]:
+            outcome, _ = self._outcome(message)
+            print(f"{message!r} → {outcome}")
+            assert outcome == "ambiguous", message
+
+        # The same keyword as a whole word elsewhere in the message is fine
+        outcome, result = self._outcome("art party near me")
+        assert outcome == "bypassed" and result["preferred_genres"] == ["art"]
+        print("✓ PASSED\n")
+
+    def test_confidence_gate(self):
+        """One signal (0.55) stays below the default 0.65; the threshold is configurable."""
+        print("\n" + "="*80)
+        print("TEST: Confidence gate")
+        print("="*80)
+
+        for message in ["music events", "events this weekend", "something fun"]:
+            outcome, _ = self._outcome(message)
+            print(f"{message!r} → {outcome}")
+            assert outcome == "low_confidence", message
+
+        original = llm_interpreter.CHAT_FAST_PATH_MIN_CONFIDENCE
+        try:
+            llm_interpreter.CHAT_FAST_PATH_MIN_CONFIDENCE = 0.55
+            outcome, result = self._outcome("music events")
+            assert outcome == "bypassed" and result["confidence"] == 0.55
+
+            llm_interpreter.CHAT_FAST_PATH_MIN_CONFIDENCE = 0.8
+            outcome, _ = self._outcome("cheap music events near me")
+            assert outcome == "low_confidence", "0.75 is below a 0.8 threshold"
+        finally:
+            llm_interpreter.CHAT_FAST_PATH_MIN_CONFIDENCE = original
+        print("✓ PASSED\n")
+
+    def test_interpret_routes_to_llm(self):
+        """interpret_with_llm calls the model only for queries the fast path turned away."""
+        print("\n" + "="*80)
+        print("TEST: interpret_with_llm routing")
+        print("="*80)
+
+        prompts = []
+
+        def generate(prompt, purpose=None, **kwargs):
+            prompts.append(prompt)
+            return {"response": json.dumps(LLM_ANSWER)}
+
+        interpret_cache.clear()
+        ollama_client.generate = generate
+        try:
+            fast = interpret_with_llm("cheap music events near me")
+            assert prompts == [] and fast["confidence"] == 0.75
+
+            for message in ["no music near me", "a party near me", "music events"]:
+                assert interpret_with_llm(message)["confidence"] == 0.9, message
+            assert len(prompts) == 3
+
+            # Turned-away queries are cached, so a repeat skips the model too
+            assert interpret_with_llm("Music events!")["confidence"] == 0.9
+            assert len(prompts) == 3
+        finally:
+            del ollama_client.generate      # back to the class method
+            interpret_cache.clear()
+
+        print(f"Fast path stats: {fast_path_stats()}")
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("CHAT FAST PATH TESTS")
+    print("="*80)
+
+    test_suite = TestChatFastPath()
+
+    try:
+        test_suite.test_clear_queries_bypass()
+        test_suite.test_negation_gate()
+        test_suite.test_ambiguity_gate()
+        test_suite.test_confidence_gate()
+        test_suite.test_interpret_routes_to_llm()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,230 @@
+"""
+Unit tests for batched LLM genre classification.
+Replaces ollama_client.generate with a scripted model (no Ollama needed)
+and checks that classify_many_with_llm keeps input order and falls back to
+single-event prompts for answers a batch leaves out, gets wrong or garbles,
+and that genre cache writes are left for the caller to commit.
+
+Event names script the fake model: "Jazz Night =Music" is answered Music;
+markers in the name change the batch answer for that event or its batch.
+"""
+
+import json
+import re
+import sys
+import threading
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from helpers import events_sessionmaker
+
+from app.models.event import Event
+from app.models.genre_cache import GenreCacheEntry
+from app.services import genre_classifier
+from app.services.genre_classifier import GenreClassifier
+from app.services.ollama_client import ollama_client
+
+_BATCH_LINE = re.compile(r'^(\d+)\. Event: (".*?") \| Description', re.M)
+_SINGLE_EVENT = re.compile(r'Event: "(.*)" \| Description: ".*"\nOutput:$')
+
+
+def _expected(name: str) -> str:
+    return re.search(r"=(\w+)", name).group(1)
+
+
+class ScriptedModel:
+    """Stands in for ollama_client.generate; records every prompt it answers."""
+
+    def __init__(self):
+        self.batches = []   # list of event names per batch prompt
+        self.singles = []   # event names sent one at a time
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, purpose=None, **kwargs):
+        if purpose == "genre_batch":
+            events = prompt.split("EVENTS:\n", 1)[1]
+            lines  = {int(n): json.loads(name) for n, name in _BATCH_LINE.findall(events)}
+            with self._lock:
+                self.batches.append(list(lines.values()))
+
+            if any("[badjson]" in name for name in lines.values()):
+                return {"response": '{"1": "Music", "2": '}
+            if any("[list]" in name for name in lines.values()):
+                return {"response": '["Music", "Sports"]'}
+
+            answer = {}
+            for number, name in lines.items():
+                genre = _expected(name)
+                if "[missing]" in name:
+                    continue
+                if "[invalid]" in name:
+                    genre = "Party"
+                if "[lower]" in name:
+                    genre = genre.lower()
+                answer[str(number)] = genre
+            return {"response": json.dumps(answer)}
+
+        name = _SINGLE_EVENT.search(prompt).group(1)
+        with self._lock:
+            self.singles.append(name)
+        if "[nogenre]" in name:
+            return {"response": '{"genre": "None"}'}
+        return {"response": json.dumps({"genre": _expected(name)})}
+
+
+class TestGenreLLMBatch:
+    """Test cases for GenreClassifier.classify_many_with_llm."""
+
+    def _run(self, names, batch_size=None):
+        model = ScriptedModel()
+        original_size = genre_classifier.LLM_BATCH_SIZE
+        ollama_client.generate = model.generate
+        if batch_size:
+            genre_classifier.LLM_BATCH_SIZE = batch_size
+        try:
+            genres = GenreClassifier.classify_many_with_llm([(name, "") for name in names])
+        finally:
+            del ollama_client.generate      # back to the class method
+            genre_classifier.LLM_BATCH_SIZE = original_size
+        return genres, model
+
+    def test_clean_batches_keep_order(self):
+        """Several concurrent batches, every answer valid — no single retries, input order kept."""
+        print("\n" + "="*80)
+        print("TEST: Clean batches")
+        print("="*80)
+
+        genres_cycle = ["Music", "Sports", "Tech", "Food", "Arts"]
+        names  = [f"Event {i} ={genres_cycle[i % 5]}" for i in range(11)]
+        genres, model = self._run(names, batch_size=3)
+
+        print(f"Batches: {[len(b) for b in model.batches]} | singles: {len(model.singles)}")
+        assert genres == [_expected(name) for name in names]
+        assert sorted(len(b) for b in model.batches) == [2, 3, 3, 3]
+        assert model.singles == []
+        print("✓ PASSED\n")
+
+    def test_short_and_invalid_answers(self):
+        """Events left out or given an unknown genre are retried alone; lowercase is accepted."""
+        print("\n" + "="*80)
+        print("TEST: Short / invalid batch answers")
+        print("="*80)
+
+        names = [
+            "Jazz Night =Music",
+            "Trail Run =Sports [missing]",
+            "Pitch Day =Business [invalid]",
+            "Food Fair =Food [lower]",
+            "Odd Thing =Culture [missing] [nogenre]",
+        ]
+        genres, model = self._run(names)
+
+        print(f"Genres: {genres} | singles: {model.singles}")
+        assert genres == ["Music", "Sports", "Business", "Food", None]
+        assert sorted(model.singles) == sorted([names[1], names[2], names[4]])
+        print("✓ PASSED\n")
+
+    def test_malformed_batch_response(self):
+        """Unparseable JSON or a non-object answer retries every event of that batch only."""
+        print("\n" + "="*80)
+        print("TEST: Malformed batch responses")
+        print("="*80)
+
+        names = [
+            "A =Music [badjson]", "B =Sports",         # batch 1 — truncated JSON
+            "C =Tech [list]", "D =Arts",               # batch 2 — JSON list
+            "E =Food", "F =Wellness",                  # batch 3 — fine
+        ]
+        genres, model = self._run(names, batch_size=2)
+
+        print(f"Genres: {genres} | singles: {sorted(model.singles)}")
+        assert genres == [_expected(name) for name in names]
+        assert sorted(model.singles) == sorted(names[:4])
+        print("✓ PASSED\n")
+
+    def test_cache_writes_left_to_caller(self):
+        """classify_batch and reclassify_db flush cache writes but never commit the caller's session."""
+        print("\n" + "="*80)
+        print("TEST: Caller owns the transaction")
+        print("="*80)
+
+        Session = events_sessionmaker(GenreCacheEntry.__table__)
+        db = Session()
+        db.add(Event(id="PENDING", name="Pending =Music", source="manual"))   # caller's uncommitted work
+        names = ["Odd Gathering =Arts", "Odder Gathering =Food"]
+
+        model = ScriptedModel()
+        ollama_client.generate = model.generate
+        try:
+            events = GenreClassifier.classify_batch([{"name": name} for name in names], db=db)
+            assert [event["genre"] for event in events] == ["Arts", "Food"]
+            assert db.query(GenreCacheEntry).count() == 2, "Cache writes should be flushed"
+            db.rollback()
+
+            check = Session()
+            assert check.get(Event, "PENDING") is None, "classify_batch committed the caller's session"
+            assert check.query(GenreCacheEntry).count() == 0
+            check.close()
+
+            db.add_all([Event(id=f"E{i}", name=name, source="manual") for i, name in enumerate(names)])
+            db.commit()
+            db.add(Event(id="PENDING", name="Pending =Music", source="manual"))
+            summary = GenreClassifier.reclassify_db(db)
+            db.rollback()
+        finally:
+            del ollama_client.generate      # back to the class method
+
+        print(f"Reclassify summary: {summary}")
+        assert summary["updated"] == 3
+        check = Session()
+        assert check.get(Event, "PENDING") is None, "reclassify_db committed the caller's session"
+        assert check.get(Event, "E0").genre is None
+        check.close()
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_single_item_skips_batch_prompt(self):
+        """One event goes straight to the single-event prompt."""
+        print("\n" + "="*80)
+        print("TEST: Single event")
+        print("="*80)
+
+        genres, model = self._run(["Solo Gig =Music"])
+        assert genres == ["Music"] and model.batches == [] and model.singles == ["Solo Gig =Music"]
+        assert GenreClassifier.classify_many_with_llm([]) == []
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("GENRE LLM BATCH TESTS")
+    print("="*80)
+
+    test_suite = TestGenreLLMBatch()
+
+    try:
+        test_suite.test_clean_batches_keep_order()
+        test_suite.test_short_and_invalid_answers()
+        test_suite.test_malformed_batch_response()
+        test_suite.test_cache_writes_left_to_caller()
+        test_suite.test_single_item_skips_batch_prompt()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
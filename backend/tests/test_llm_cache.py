@@ -0,0 +1,230 @@
+"""
+Unit tests for the chat interpretation cache.
+Covers TTLCache (LRU order, entry and byte bounds, expiry) and the two-tier
+InterpretCache: normalized keys, copies out, and disk-tier round-trips
+across instances with hits promoted back into memory.
+
+Clocks are replaced with a settable fake, so nothing sleeps.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services import llm_cache
+from app.services.llm_cache import InterpretCache
+from app.utils import ttl_cache
+from app.utils.ttl_cache import TTLCache
+
+PARSED = {"genres": ["Music"], "location": "Nairobi", "crowd_preference": None}
+
+
+class FakeClock:
+    """Stands in for time.monotonic / time.time."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLLMCache:
+    """Test cases for TTLCache and InterpretCache."""
+
+    def __init__(self):
+        self._dir = tempfile.TemporaryDirectory()
+
+    def _with_clock(self, test):
+        """Run test(clock) with both cache modules reading the fake clock."""
+        clock = FakeClock()
+        originals = ttl_cache.time.monotonic, llm_cache.time.time
+        ttl_cache.time.monotonic = clock
+        llm_cache.time.time = clock
+        try:
+            test(clock)
+        finally:
+            ttl_cache.time.monotonic, llm_cache.time.time = originals
+
+    def test_lru_eviction(self):
+        """Full cache drops the least recently used entry; get() refreshes recency."""
+        print("\n" + "="*80)
+        print("TEST: TTLCache LRU eviction")
+        print("="*80)
+
+        cache = TTLCache(maxsize=3, ttl_seconds=60)
+        for key in "abc":
+            cache.set(key, key.upper())
+
+        assert cache.get("a") == "A"          # a is now most recent
+        cache.set("d", "D")                   # evicts b
+        assert cache.get("b") is None
+        assert [cache.get(k) for k in "acd"] == ["A", "C", "D"]
+
+        cache.set("c", "C2")                  # overwrite keeps the size
+        assert len(cache) == 3 and cache.get("c") == "C2"
+
+        assert cache.pop("a") == "A" and cache.pop("a", "gone") == "gone"
+        cache.clear()
+        assert len(cache) == 0 and cache.stats()["bytes"] == 0
+
+        stats = cache.stats()
+        print(f"Stats: {stats}")
+        assert (stats["hits"], stats["misses"]) == (5, 1)
+
+        disabled = TTLCache(maxsize=0, ttl_seconds=60)
+        disabled.set("a", 1)
+        assert len(disabled) == 0
+        print("✓ PASSED\n")
+
+    def test_byte_bound(self):
+        """Entries are evicted oldest-first to stay under max_bytes; oversized values are skipped."""
+        print("\n" + "="*80)
+        print("TEST: TTLCache byte bound")
+        print("="*80)
+
+        cache = TTLCache(maxsize=100, ttl_seconds=60, max_bytes=100, sizeof=lambda k, v: len(v))
+        cache.set("a", "x" * 40)
+        cache.set("b", "x" * 40)
+        cache.set("c", "x" * 40)              # 120 bytes — a goes
+        assert cache.get("a") is None and cache.stats()["bytes"] == 80
+
+        cache.set("big", "x" * 101)           # larger than the whole cache
+        assert cache.get("big") is None and len(cache) == 2
+
+        cache.set("b", "x" * 10)              # replacing an entry releases its bytes
+        assert cache.stats()["bytes"] == 50
+
+        try:
+            TTLCache(maxsize=10, ttl_seconds=60, max_bytes=100)
+            assert False, "max_bytes without sizeof should raise"
+        except ValueError:
+            pass
+        print("✓ PASSED\n")
+
+    def test_ttl_expiry(self):
+        """Entries expire ttl_seconds after they were stored, and are dropped on read."""
+        print("\n" + "="*80)
+        print("TEST: TTLCache expiry")
+        print("="*80)
+
+        def test(clock):
+            cache = TTLCache(maxsize=10, ttl_seconds=60, max_bytes=1000, sizeof=lambda k, v: 10)
+            cache.set("a", 1)
+            clock.now += 30
+            cache.set("b", 2)
+            assert cache.get("a") == 1        # reading does not extend the lifetime
+
+            clock.now += 30
+            assert cache.get("a") is None, "a is 60s old"
+            assert cache.get("b") == 2
+            assert len(cache) == 1 and cache.stats()["bytes"] == 10
+
+            cache.set("b", 3)                 # storing again restarts the clock
+            clock.now += 59
+            assert cache.get("b") == 3
+
+            clock.now += 1
+            assert cache.pop("b") == 3, "pop returns expired values"
+
+        self._with_clock(test)
+        print("✓ PASSED\n")
+
+    def test_interpret_cache_memory(self):
+        """Normalized messages share an entry; callers get copies they can change."""
+        print("\n" + "="*80)
+        print("TEST: InterpretCache memory tier")
+        print("="*80)
+
+        cache = InterpretCache(path="")
+        cache.set("Music events near me!", PARSED)
+        assert cache.get("  music   EVENTS near me ") == PARSED
+
+        result = cache.get("music events near me")
+        result["genres"].append("Sports")
+        assert cache.get("music events near me") == PARSED, "Cached value was mutated"
+
+        cache.set("?!", PARSED)
+        assert cache.get("?!") is None and len(cache.memory) == 1
+
+        stats = cache.stats()
+        print(f"Stats: {stats}")
+        assert stats["disk_enabled"] is False and stats["disk_hits"] == 0
+        print("✓ PASSED\n")
+
+    def test_disk_round_trip(self):
+        """A new instance on the same file serves earlier results and promotes them to memory."""
+        print("\n" + "="*80)
+        print("TEST: InterpretCache disk tier")
+        print("="*80)
+
+        path = f"{self._dir.name}/interpret.db"
+
+        def test(clock):
+            first = InterpretCache(ttl_seconds=3600, path=path)
+            first.set("Jazz this weekend", PARSED)
+            first.set("comedy tonight", {"genres": ["Comedy"]})
+
+            # Fresh process: memory is empty, disk is warm
+            second = InterpretCache(ttl_seconds=3600, path=path)
+            assert len(second.memory) == 0
+            assert second.get("jazz this weekend") == PARSED
+            assert second.disk_hits == 1 and len(second.memory) == 1
+
+            assert second.get("jazz this weekend") == PARSED
+            assert second.disk_hits == 1, "Second lookup should come from memory"
+
+            # Entries past the TTL are ignored on read and purged on open
+            clock.now += 3601
+            assert second.get("comedy tonight") is None
+            third = InterpretCache(ttl_seconds=3600, path=path)
+            assert third._disk._conn.execute("SELECT COUNT(*) FROM interpret_cache").fetchone()[0] == 0
+
+            third.set("jazz this weekend", PARSED)
+            third.clear()
+            assert InterpretCache(ttl_seconds=3600, path=path).get("jazz this weekend") is None
+            print(f"Stats: {second.stats()}")
+
+        self._with_clock(test)
+
+        broken = InterpretCache(path=f"{self._dir.name}/missing/dir/interpret.db")
+        assert broken.stats()["disk_enabled"] is False, "Unopenable path should disable the disk tier"
+        broken.set("jazz", PARSED)
+        assert broken.get("jazz") == PARSED
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("LLM CACHE TESTS")
+    print("="*80)
+
+    test_suite = TestLLMCache()
+
+    try:
+        test_suite.test_lru_eviction()
+        test_suite.test_byte_bound()
+        test_suite.test_ttl_expiry()
+        test_suite.test_interpret_cache_memory()
+        test_suite.test_disk_round_trip()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
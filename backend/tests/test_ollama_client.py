@@ -0,0 +1,200 @@
+"""
+Unit tests for the shared Ollama client's concurrency limit.
+Sync generate() calls from threads and async agenerate() calls on an event
+loop draw on one budget of max_concurrency generations in flight.
+
+The HTTP layer is faked (requests.Session.post and an httpx MockTransport),
+so no Ollama server is needed.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+import httpx
+
+from app.services.ollama_client import GenerationSlots, OllamaClient
+
+
+class InFlight:
+    """Counts overlapping fake generations and remembers the peak."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak    = 0
+        self._lock   = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.current -= 1
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"response": "{}"}
+
+
+class TestOllamaClient:
+    """Test cases for GenerationSlots and OllamaClient's shared limit."""
+
+    def _client(self, max_concurrency: int, seconds: float) -> tuple[OllamaClient, InFlight]:
+        client    = OllamaClient(url="http://ollama.test/api/generate", max_concurrency=max_concurrency)
+        in_flight = InFlight()
+
+        def post(url, json=None, timeout=None):
+            with in_flight:
+                time.sleep(seconds)
+            return FakeResponse()
+
+        async def handle(request):
+            with in_flight:
+                await asyncio.sleep(seconds)
+            return httpx.Response(200, json={"response": "{}"})
+
+        client._session.post = post
+        client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+        return client, in_flight
+
+    def test_sync_and_async_share_limit(self):
+        """Threads and coroutines together never exceed max_concurrency."""
+        print("\n" + "="*80)
+        print("TEST: One limit for sync and async callers")
+        print("="*80)
+
+        client, in_flight = self._client(max_concurrency=3, seconds=0.05)
+
+        threads = [threading.Thread(target=client.generate, args=("hi",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+
+        async def run_async():
+            await asyncio.gather(*[client.agenerate("hi") for _ in range(6)])
+            await client.aclose()
+
+        asyncio.run(run_async())
+        for thread in threads:
+            thread.join()
+
+        calls = client.metrics.snapshot()["generate"]["requests"]
+        print(f"Calls: {calls} | peak in flight: {in_flight.peak}")
+        assert calls == 12
+        assert in_flight.peak == 3, f"Expected 3 at most in flight, saw {in_flight.peak}"
+        print("✓ PASSED\n")
+
+    def test_cancelled_waiter_keeps_no_slot(self):
+        """A coroutine cancelled while waiting (or while being handed a slot) doesn't leak it."""
+        print("\n" + "="*80)
+        print("TEST: Cancelled async waiters")
+        print("="*80)
+
+        slots = GenerationSlots(1)
+
+        async def scenario():
+            slots.acquire()                                   # held by "another thread"
+            waiter = asyncio.ensure_future(slots.aacquire())
+            await asyncio.sleep(0)
+            waiter.cancel()                                   # gives up before a slot frees
+            await asyncio.gather(waiter, return_exceptions=True)
+
+            handed = asyncio.ensure_future(slots.aacquire())
+            await asyncio.sleep(0)
+            slots.release()                                   # slot handed to `handed`...
+            handed.cancel()                                   # ...which is cancelled first
+            await asyncio.gather(handed, return_exceptions=True)
+            await asyncio.sleep(0)
+
+            await asyncio.wait_for(slots.aacquire(), timeout=1)
+            slots.release()
+
+        asyncio.run(scenario())
+        print(f"Free slots after: {slots._free}")
+        assert slots._free == 1 and not slots._waiters
+        print("✓ PASSED\n")
+
+    def test_fifo_across_modes(self):
+        """Waiting threads and coroutines are served in arrival order."""
+        print("\n" + "="*80)
+        print("TEST: First come, first served")
+        print("="*80)
+
+        slots = GenerationSlots(1)
+        order = []
+        slots.acquire()
+
+        def thread_waiter(name):
+            with slots:
+                order.append(name)
+
+        async def scenario():
+            first = threading.Thread(target=thread_waiter, args=("thread-1",))
+            first.start()
+            while len(slots._waiters) < 1:
+                await asyncio.sleep(0.001)
+
+            async def coroutine_waiter():
+                async with slots:
+                    order.append("coroutine")
+
+            task = asyncio.ensure_future(coroutine_waiter())
+            while len(slots._waiters) < 2:
+                await asyncio.sleep(0.001)
+
+            second = threading.Thread(target=thread_waiter, args=("thread-2",))
+            second.start()
+            while len(slots._waiters) < 3:
+                await asyncio.sleep(0.001)
+
+            slots.release()
+            await task
+            for thread in (first, second):
+                await asyncio.to_thread(thread.join)
+
+        asyncio.run(scenario())
+        print(f"Order: {order}")
+        assert order == ["thread-1", "coroutine", "thread-2"]
+        assert slots._free == 1
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("OLLAMA CLIENT TESTS")
+    print("="*80)
+
+    test_suite = TestOllamaClient()
+
+    try:
+        test_suite.test_sync_and_async_share_limit()
+        test_suite.test_cancelled_waiter_keeps_no_slot()
+        test_suite.test_fifo_across_modes()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
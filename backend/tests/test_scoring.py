@@ -10,7 +10,12 @@ from pathlib import Path
 backend_path = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_path))
 
-from app.services.scoring import ScoringEngine
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.services.scoring import Factorized, ScoringEngine
+from app.services.context.temporal import TemporalContextService
 from app.utils.distance import haversine_distance
 
 
@@ -454,6 +459,84 @@ class TestScoringEngine:
         assert 3500 < distance < 4300, "Distance should be approximately 3944 km"
         print(f"✓ PASSED (Distance is {distance:.2f} km)\n")
 
+    # ==================== BATCH SCORING PARITY ====================
+
+    def test_score_batch_parity(self):
+        """Test that score_batch matches calculate_relevance_score event by event."""
+        print("="*80)
+        print("TEST: Batch Scoring Parity")
+        print("="*80)
+
+        today = datetime.utcnow().date()
+        dates = [
+            (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+            for offset in (-3, 0, 1, 5, 7, 15, 30, 45, 60, 90)
+        ] + ["", "not-a-date"]
+
+        events = []
+        for i in range(240):
+            events.append({
+                'id': f'E{i:03d}',
+                'genre': ['Music', 'music', 'Tech', 'Food', ''][i % 5],
+                'ticket_price': [0.0, 20.0, 50.0, 99.99, 100.0, 150.0, 250.0][i % 7],
+                'latitude': 40.7128 + (i % 11) * 0.05 * (-1) ** i,
+                'longitude': -74.0060 + (i % 13) * 0.4,
+                'food_type': ['Pizza', 'vegan ', 'BBQ', ''][i % 4],
+                'date': dates[i % len(dates)],
+                'event_type': ['indoor', 'Outdoor', 'festival', 'open-air'][i % 4],
+                'crowd_level': ['LOW', 'MEDIUM', 'HIGH', 'unknown'][i % 4],
+            })
+
+        columns = {
+            field: np.array([event[field] for event in events], dtype=object)
+            for field in events[0]
+        }
+        # Same events with dates pre-parsed, as the event catalog provides them
+        ordinal_columns = {
+            **columns,
+            'date_ordinal': np.array(
+                [TemporalContextService.date_ordinal(event['date']) for event in events],
+                dtype=np.int64,
+            ),
+        }
+        # String columns factorized once (and subset by index), as the catalog does
+        subset = np.arange(len(events))[::-1]
+        factorized_columns = {
+            **{field: column[subset] for field, column in ordinal_columns.items()},
+            **{
+                field: Factorized.from_values(columns[field])[subset]
+                for field in ('genre', 'food_type', 'event_type', 'crowd_level')
+            },
+        }
+
+        preference_sets = [
+            {'budget': 100.0, 'preferred_genres': ['Music', 'Tech'], 'food_preference': 'Vegan'},
+            {'budget': 0.0, 'preferred_genres': [], 'food_preference': 'any', 'avoid_crowds': True},
+            {'budget': 60.0, 'preferred_genres': ['food'], 'food_preference': ''},
+        ]
+
+        for prefs in preference_sets:
+            user_prefs = {'latitude': 40.7128, 'longitude': -74.0060, **prefs}
+            scores, components = self.engine.score_batch(columns, user_prefs)
+
+            for i, event in enumerate(events):
+                score, breakdown = self.engine.calculate_relevance_score(event, user_prefs)
+                assert np.isclose(scores[i], score), f"Score mismatch for {event['id']}"
+                for factor, data in breakdown.items():
+                    assert np.isclose(components[factor][i], data['value']), (
+                        f"{factor} mismatch for {event['id']}"
+                    )
+
+            ordinal_scores, _ = self.engine.score_batch(ordinal_columns, user_prefs, today=today)
+            assert np.allclose(ordinal_scores, scores), "date_ordinal path mismatch"
+
+            factorized_scores, _ = self.engine.score_batch(factorized_columns, user_prefs, today=today)
+            assert np.allclose(factorized_scores, scores[subset]), "Factorized path mismatch"
+
+        print(f"Events compared: {len(events)} x {len(preference_sets)} preference sets")
+        print(f"Expected: Batch scores and components match the scalar path")
+        print("✓ PASSED\n")
+
 
 def run_all_tests():
     """Run all test cases."""
@@ -485,6 +568,9 @@ def run_all_tests():
         # Haversine tests
         test_suite.test_haversine_same_location()
         test_suite.test_haversine_known_distance()
+
+        # Batch scoring tests
+        test_suite.test_score_batch_parity()
         
         print("="*80)
         print("ALL TESTS PASSED ✓")
@@ -0,0 +1,177 @@
+"""
+Unit tests for EventRecommender._select.
+Checks the partial top-N selection against the original full sort
+(filter, round, sorted(), slice) — including score and distance ties
+and .xxx5 scores, where the rounding used for ranking must match the
+rounding shown in relevance_score.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+import helpers  # noqa: F401 — SQLite DATABASE_URL, before any app import
+
+import numpy as np
+
+from app.services.recommender import EventRecommender
+
+SORT_ORDERS = ["best", "distance", "budget", "crowd"]
+
+
+# ------------------------------------------------------------------
+# Original implementation, kept here as the reference
+# ------------------------------------------------------------------
+
+def _sort_reference(recommendations, sort_by):
+    if sort_by == "distance":
+        return sorted(recommendations, key=lambda x: x["distance_km"])
+
+    if sort_by == "budget":
+        return sorted(recommendations, key=lambda x: x["components"].get("budget", 0), reverse=True)
+
+    if sort_by == "crowd" and "crowd" in recommendations[0]["components"]:
+        return sorted(recommendations, key=lambda x: x["components"].get("crowd", 0), reverse=True)
+
+    def distance_tier(distance):
+        if distance <= 50:
+            return 0
+        if distance <= 200:
+            return 1
+        return 2
+
+    return sorted(
+        recommendations,
+        key=lambda x: (distance_tier(x["distance_km"]), -x["relevance_score"], x["distance_km"]),
+    )
+
+
+def _select_reference(scored, user_preferences, sort_by, top_n):
+    recommendations = []
+    for p in range(len(scored["score"])):
+        recommendations.append({
+            "index":           int(scored["index"][p]),
+            "relevance_score": round(float(scored["score"][p]), 3),
+            "distance_km":     round(float(scored["distance"][p]), 1),
+            "components":      {f: float(v[p]) for f, v in scored["components"].items()},
+        })
+
+    if user_preferences.get("preferred_genres", []):
+        recommendations = [r for r in recommendations if r["components"]["genre"] > 0]
+    recommendations = [r for r in recommendations if r["relevance_score"] >= EventRecommender.MIN_SCORE]
+    if not recommendations:
+        return []
+    return _sort_reference(recommendations, sort_by)[:top_n]
+
+
+def _scored(scores, distances, seed=0):
+    """Ranking columns as _score_each/_score_batch return them."""
+    rng = np.random.default_rng(seed)
+    n   = len(scores)
+    return {
+        "index":      np.arange(n, dtype=np.int64),
+        "score":      np.array(scores, dtype=np.float64),
+        "distance":   np.array(distances, dtype=np.float64),
+        "components": {
+            "genre":  rng.choice([0.0, 1.0], size=n, p=[0.2, 0.8]),
+            "budget": rng.choice([0.3, 0.6, 0.8, 1.0], size=n),
+            "crowd":  rng.choice([0.5, 0.85, 1.0], size=n),
+        },
+    }
+
+
+class TestSelection:
+    """Test cases for EventRecommender._select."""
+
+    def __init__(self):
+        self.recommender = EventRecommender()
+
+    def _compare(self, scored, user_preferences, sort_by, top_n):
+        got = self.recommender._select(scored, user_preferences, sort_by, top_n)
+        expected = _select_reference(scored, user_preferences, sort_by, top_n)
+        got_rows      = [(c["index"], c["relevance_score"], c["distance_km"]) for c in got]
+        expected_rows = [(r["index"], r["relevance_score"], r["distance_km"]) for r in expected]
+        assert got_rows == expected_rows, \
+            f"sort_by={sort_by} top_n={top_n}\n  got      {got_rows}\n  expected {expected_rows}"
+
+    def test_half_value_tie_break(self):
+        """A 0.3765 score ranks as the 0.377 it is shown as, tie broken on distance."""
+        print("\n" + "="*80)
+        print("TEST: .xxx5 score ties")
+        print("="*80)
+
+        # Far event first in catalog order; the near one only wins on distance
+        scored = _scored([0.377, 0.3765, 0.4], [39.0, 1.4, 10.0])
+        picked = self.recommender._select(scored, {}, "best", 2)
+        print(f"Picked: {[(c['index'], c['relevance_score'], c['distance_km']) for c in picked]}")
+        assert [c["index"] for c in picked] == [2, 1], "0.3765 @ 1.4 km should beat 0.377 @ 39 km"
+        assert picked[1]["relevance_score"] == 0.377
+        print("✓ PASSED\n")
+
+    def test_min_score_edge(self):
+        """MIN_SCORE applies to the score as shown: 0.2995 rounds to 0.299 and is dropped."""
+        print("\n" + "="*80)
+        print("TEST: MIN_SCORE on rounded score")
+        print("="*80)
+
+        scored = _scored([0.2995, 0.3005, 0.3], [5.0, 5.0, 5.0])
+        picked = self.recommender._select(scored, {}, "best", 10)
+        print(f"Picked: {[(c['index'], c['relevance_score']) for c in picked]}")
+        assert [c["index"] for c in picked] == [1, 2]
+        print("✓ PASSED\n")
+
+    def test_matches_reference(self):
+        """Random catalogs dense in ties and .xxx5 values, every sort order."""
+        print("\n" + "="*80)
+        print("TEST: _select vs original sort")
+        print("="*80)
+
+        rng = np.random.default_rng(42)
+        for seed in range(20):
+            n = int(rng.integers(5, 400))
+            # Scores on a 0.0005 grid (half of them at .xxx5), distances on a
+            # 0.05 km grid around the 50/200 km tier edges
+            scores    = rng.integers(560, 900, size=n) * 0.0005
+            distances = rng.choice([1.45, 1.4, 39.0, 49.95, 50.0, 50.05, 120.25, 199.95, 200.05, 350.0], size=n)
+            scored = _scored(scores, distances, seed=seed)
+
+            for sort_by in SORT_ORDERS:
+                for top_n in (1, 10, n + 5):
+                    for prefs in ({}, {"preferred_genres": ["Music"]}):
+                        self._compare(scored, prefs, sort_by, top_n)
+
+        print("20 catalogs × 4 sort orders × 3 sizes × 2 genre filters agree")
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("RECOMMENDATION SELECTION TESTS")
+    print("="*80)
+
+    test_suite = TestSelection()
+
+    try:
+        test_suite.test_half_value_tie_break()
+        test_suite.test_min_score_edge()
+        test_suite.test_matches_reference()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
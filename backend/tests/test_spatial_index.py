@@ -0,0 +1,162 @@
+"""
+Unit tests for GeoGridIndex.
+Checks query_radius against a brute-force Haversine scan over every row —
+with points and queries on and around grid-cell edges, shared city-center
+points, tiny and huge radii, and near the poles and the antimeridian.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+import numpy as np
+
+from app.utils.distance import haversine_distance
+from app.utils.spatial_index import GeoGridIndex, KM_PER_DEGREE
+
+# Rows this close to the radius may land either side of it in float math
+EDGE_TOLERANCE_KM = 1e-6
+
+
+def _brute_force(lats, lngs, lat, lng, radius_km):
+    distances = np.array([haversine_distance(lat, lng, a, b) for a, b in zip(lats, lngs)])
+    return distances, distances <= radius_km
+
+
+class TestSpatialIndex:
+    """Test cases for GeoGridIndex.query_radius and distances."""
+
+    def _check(self, index, lats, lngs, lat, lng, radius_km):
+        rows, distances = index.query_radius(lat, lng, radius_km)
+        expected_distances, inside = _brute_force(lats, lngs, lat, lng, radius_km)
+
+        assert np.all(np.diff(rows) > 0), "Rows should come back in ascending order"
+        assert np.allclose(distances, expected_distances[rows], atol=1e-9), "Row distances differ"
+
+        got      = set(rows.tolist())
+        expected = set(np.flatnonzero(inside).tolist())
+        for row in got ^ expected:
+            assert abs(expected_distances[row] - radius_km) < EDGE_TOLERANCE_KM, (
+                f"Row {row} at ({lats[row]}, {lngs[row]}) — {expected_distances[row]:.6f} km — "
+                f"{'missed' if row in expected else 'wrongly included'} "
+                f"for query ({lat}, {lng}) r={radius_km}"
+            )
+
+    def test_cell_edges(self):
+        """Points on, just inside and just outside cell boundaries; queries straddling them."""
+        print("\n" + "="*80)
+        print("TEST: Grid cell edges")
+        print("="*80)
+
+        cell = 0.5
+        lats, lngs = [], []
+        for i in range(-4, 5):
+            for j in range(70, 76):
+                for dlat, dlng in [(0, 0), (1e-9, -1e-9), (-1e-9, 1e-9), (0.25, 0.25)]:
+                    lats.append(i * cell + dlat)
+                    lngs.append(j * cell + dlng)
+        lats, lngs = np.array(lats), np.array(lngs)
+        index = GeoGridIndex(lats, lngs, cell_degrees=cell)
+
+        queries = 0
+        for qlat in [-1.0, -1e-9, 0.0, 0.25, 0.5 - 1e-9, 1.0]:
+            for qlng in [35.0, 36.0, 36.25, 36.5 + 1e-9]:
+                for radius in [0.0, 1.0, 27.8, cell * KM_PER_DEGREE, 60.0, 120.0]:
+                    self._check(index, lats, lngs, qlat, qlng, radius)
+                    queries += 1
+
+        print(f"{queries} queries over {len(lats)} rows agree with brute force")
+        print("✓ PASSED\n")
+
+    def test_random_city_points(self):
+        """Many rows sharing a few city centers plus scattered rows, random queries."""
+        print("\n" + "="*80)
+        print("TEST: Random queries vs brute force")
+        print("="*80)
+
+        rng = np.random.default_rng(7)
+        cities = np.array([[-1.2921, 36.8219], [-4.0435, 39.6682], [-0.0917, 34.7680], [0.5143, 35.2698]])
+        picks  = rng.integers(0, len(cities), size=3000)
+        lats   = np.concatenate([cities[picks, 0], rng.uniform(-5, 5, 500)])
+        lngs   = np.concatenate([cities[picks, 1], rng.uniform(33, 42, 500)])
+        index  = GeoGridIndex(lats, lngs)
+
+        assert len(index) == len(lats)
+        assert np.allclose(index.distances(-1.28, 36.8), _brute_force(lats, lngs, -1.28, 36.8, 0)[0])
+
+        for _ in range(200):
+            lat, lng = rng.uniform(-6, 6), rng.uniform(32, 43)
+            radius   = float(rng.choice([5.0, 50.0, 200.0, 500.0, 2000.0]))
+            self._check(index, lats, lngs, lat, lng, radius)
+
+        # Exactly on a city center with a zero radius
+        rows, _ = index.query_radius(cities[0, 0], cities[0, 1], 0.0)
+        assert len(rows) == int(np.sum(picks == 0))
+        print("200 random queries agree with brute force")
+        print("✓ PASSED\n")
+
+    def test_poles_and_antimeridian(self):
+        """Bounding boxes that reach a pole or wrap ±180° fall back to checking every point."""
+        print("\n" + "="*80)
+        print("TEST: Poles and antimeridian")
+        print("="*80)
+
+        lats = np.array([89.9, 89.5, -89.8, 10.0, 10.0, -10.0, 0.0])
+        lngs = np.array([0.0, 179.0, -120.0, 179.9, -179.9, 180.0, -180.0])
+        index = GeoGridIndex(lats, lngs)
+
+        for lat, lng, radius in [
+            (89.0, 90.0, 200.0), (-89.5, 60.0, 100.0),
+            (10.0, 179.95, 50.0), (10.0, -179.95, 50.0), (-10.0, -179.99, 20.0), (0.0, 179.999, 5.0),
+        ]:
+            self._check(index, lats, lngs, lat, lng, radius)
+
+        rows, _ = index.query_radius(10.0, 179.95, 50.0)
+        assert rows.tolist() == [3, 4], "Both sides of the antimeridian should match"
+        print("✓ PASSED\n")
+
+    def test_empty_index(self):
+        """No rows — every query is empty."""
+        print("\n" + "="*80)
+        print("TEST: Empty index")
+        print("="*80)
+
+        index = GeoGridIndex(np.empty(0), np.empty(0))
+        rows, distances = index.query_radius(-1.29, 36.82, 100.0)
+        assert len(index) == 0 and len(rows) == 0 and len(distances) == 0
+        assert len(index.distances(-1.29, 36.82)) == 0
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("SPATIAL INDEX TESTS")
+    print("="*80)
+
+    test_suite = TestSpatialIndex()
+
+    try:
+        test_suite.test_cell_edges()
+        test_suite.test_random_city_points()
+        test_suite.test_poles_and_antimeridian()
+        test_suite.test_empty_index()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,142 @@
+"""
+Unit tests for upsert_events.
+Runs the INSERT ... ON CONFLICT upsert against an in-memory SQLite
+database: insert/update counts, which columns a re-scrape overwrites,
+duplicate source URLs and bad-row isolation.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from helpers import empty_events, events_sessionmaker, raw_event
+
+from app.models.event import Event
+from app.services.scrapers import scheduler
+from app.services.scrapers.scheduler import upsert_events
+
+
+class TestUpsertEvents:
+    """Test cases for upsert_events on SQLite."""
+
+    def __init__(self):
+        self.Session = events_sessionmaker()
+
+    def _session(self):
+        return empty_events(self.Session)
+
+    def test_insert_then_update(self):
+        """First scrape inserts, the re-scrape updates — counts match."""
+        print("\n" + "="*80)
+        print("TEST: Insert then update")
+        print("="*80)
+
+        db = self._session()
+        summary = upsert_events(db, [raw_event(n) for n in range(5)])
+        print(f"First scrape:  {summary}")
+        assert summary == {"inserted": 5, "updated": 0, "skipped": 0}
+
+        summary = upsert_events(db, [raw_event(n, ticket_price_min=800.0) for n in range(3, 8)])
+        print(f"Second scrape: {summary}")
+        assert summary == {"inserted": 3, "updated": 2, "skipped": 0}
+        assert db.query(Event).count() == 8
+
+        event = db.query(Event).filter_by(source_url=raw_event(3)["source_url"]).one()
+        assert event.ticket_price_min == 800.0
+        assert event.crowd_level == "MEDIUM" and event.timezone == "Africa/Nairobi"
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_keeps_existing_poster_and_venue(self):
+        """A re-scrape without poster/venue leaves the stored ones alone."""
+        print("\n" + "="*80)
+        print("TEST: Missing poster/venue keep stored values")
+        print("="*80)
+
+        db = self._session()
+        upsert_events(db, [raw_event(1)])
+        upsert_events(db, [raw_event(1, name="Event 1 (Moved)", poster_url=None, venue_name="")])
+
+        event = db.query(Event).one()
+        print(f"Event: {event.name} | {event.poster_url} | {event.venue_name}")
+        assert event.name == "Event 1 (Moved)"
+        assert event.poster_url == raw_event(1)["poster_url"]
+        assert event.venue_name == "KICC"
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_skips_and_duplicates(self):
+        """Noise, missing URL/date and repeated source URLs are skipped."""
+        print("\n" + "="*80)
+        print("TEST: Skipped rows")
+        print("="*80)
+
+        db = self._session()
+        raw_events = [
+            raw_event(1),
+            raw_event(1, name="Event 1 again"),   # same source_url
+            raw_event(2, _noise=True),
+            raw_event(3, source_url=None),
+            raw_event(4, date=None),
+        ]
+        summary = upsert_events(db, raw_events)
+        print(f"Summary: {summary}")
+        assert summary == {"inserted": 1, "updated": 0, "skipped": 4}
+        assert db.query(Event).one().name == "Event 1", "First listing should win"
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_bad_row_isolated(self):
+        """One row violating NOT NULL is skipped; the rest of its chunk is written."""
+        print("\n" + "="*80)
+        print("TEST: Bad row isolation")
+        print("="*80)
+
+        db = self._session()
+        chunk_size, scheduler.UPSERT_CHUNK_SIZE = scheduler.UPSERT_CHUNK_SIZE, 4
+        try:
+            raw_events = [raw_event(n) for n in range(10)]
+            raw_events[5]["crowd_level"] = None
+            summary = upsert_events(db, raw_events)
+        finally:
+            scheduler.UPSERT_CHUNK_SIZE = chunk_size
+
+        print(f"Summary: {summary}")
+        assert summary == {"inserted": 9, "updated": 0, "skipped": 1}
+        assert db.query(Event).filter_by(source_url=raw_event(5)["source_url"]).first() is None
+        db.close()
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("UPSERT EVENTS TESTS")
+    print("="*80)
+
+    test_suite = TestUpsertEvents()
+
+    try:
+        test_suite.test_insert_then_update()
+        test_suite.test_keeps_existing_poster_and_venue()
+        test_suite.test_skips_and_duplicates()
+        test_suite.test_bad_row_isolated()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,293 @@
+"""
+Unit tests for user preference profiles.
+Runs against a throwaway SQLite database: materialized user_profiles rows,
+writes kept out of the caller's session, the per-user profile cache kept
+current by record_interaction, and rebuilding profiles after their events
+are reclassified.
+"""
+
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+import helpers  # noqa: F401 — SQLite DATABASE_URL, before any app import
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.event import Event
+from app.models.event_interaction import EventInteraction
+from app.models.event_interest_count import EventInterestCount
+from app.models.user_profile import UserProfile
+from app.services.learning.user_profile import (
+    UserPreferenceProfile,
+    get_user_profile,
+    profile_cache,
+    rebuild_profiles_for_events,
+    record_interaction,
+)
+
+TABLES = [Event.__table__, EventInteraction.__table__, EventInterestCount.__table__, UserProfile.__table__]
+
+
+def _event(event_id: str, genre: str | None, crowd_level: str = "MEDIUM") -> Event:
+    return Event(
+        id=event_id, name=f"Event {event_id}", genre=genre, crowd_level=crowd_level,
+        latitude=-1.28, longitude=36.82, date="2026-06-28", source="manual",
+    )
+
+
+class TestUserProfile:
+    """Test cases for UserPreferenceProfile and its helpers."""
+
+    def __init__(self):
+        self._dir = tempfile.TemporaryDirectory()
+        engine = create_engine(f"sqlite:///{self._dir.name}/profiles.db")
+        Base.metadata.create_all(engine, tables=TABLES)
+        self.Session = sessionmaker(bind=engine, autoflush=False)   # as SessionLocal
+
+    def _session(self):
+        """Fresh session on emptied tables, with a cold profile cache."""
+        db = self.Session()
+        for table in reversed(TABLES):
+            db.execute(table.delete())
+        db.commit()
+        profile_cache.clear()
+        return db
+
+    def _interact(self, db, user_id: int, event_id: str, interaction_type: str = "INTERESTED", **columns):
+        interaction = EventInteraction(
+            user_id=user_id, event_id=event_id, interaction_type=interaction_type, **columns
+        )
+        db.add(interaction)
+        db.commit()
+        return interaction
+
+    def test_materialized_row(self):
+        """A load folds interactions into user_profiles; the next load reads the row."""
+        print("\n" + "="*80)
+        print("TEST: Materialized profile row")
+        print("="*80)
+
+        db = self._session()
+        db.add_all([_event("E1", "Music", "LOW"), _event("E2", "Sports", "HIGH")])
+        db.commit()
+        self._interact(db, 1, "E1")
+        self._interact(db, 1, "E2", "NOT_INTERESTED")
+
+        profile = UserPreferenceProfile(db, 1)
+        print(f"Profile: {profile.summary()}")
+        assert profile.interest_count == 1 and profile.dislike_count == 1
+        assert round(profile.genre_bias["Music"], 2) == 0.1
+        assert round(profile.genre_bias["Sports"], 2) == -0.15
+        assert round(profile.crowd_bias, 2) == -0.02
+
+        row = db.query(UserProfile).filter_by(user_id=1).one()
+        assert row.last_interaction_id == profile.last_interaction_id
+
+        # Interactions deleted from the log stay counted in the stored row
+        db.query(EventInteraction).delete()
+        db.commit()
+        again = UserPreferenceProfile(db, 1)
+        assert again.summary() == profile.summary(), "Second load should come from the row"
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_load_does_not_commit_caller(self):
+        """Saving the profile never commits the caller's pending changes."""
+        print("\n" + "="*80)
+        print("TEST: Profile write stays out of the caller's session")
+        print("="*80)
+
+        db = self._session()
+        db.add(_event("E1", "Music"))
+        db.commit()
+        self._interact(db, 1, "E1")
+
+        db.add(_event("PENDING", "Comedy"))   # caller's uncommitted work
+        UserPreferenceProfile(db, 1)
+        db.rollback()
+
+        check = self.Session()
+        print(f"Pending event after rollback: {check.get(Event, 'PENDING')}")
+        assert check.get(Event, "PENDING") is None, "Caller's session was committed"
+        assert check.query(UserProfile).filter_by(user_id=1).one().interest_count == 1
+        check.close()
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_profile_cache(self):
+        """get_user_profile builds once per user and serves later calls from the cache."""
+        print("\n" + "="*80)
+        print("TEST: Profile cache hits")
+        print("="*80)
+
+        db = self._session()
+        db.add(_event("E1", "Music"))
+        db.commit()
+        self._interact(db, 1, "E1")
+
+        first = get_user_profile(db, 1)
+        assert profile_cache.get(1) is first
+
+        # A cached profile is served without touching the database
+        db.query(EventInteraction).delete()
+        db.query(UserProfile).delete()
+        db.commit()
+        assert get_user_profile(db, 1) is first, "Second call should hit the cache"
+        assert first.interest_count == 1
+
+        profile_cache.clear()
+        assert get_user_profile(db, 1).interest_count == 0, "A miss rebuilds from the database"
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_record_interaction(self):
+        """New interactions update the cached profile in place, landing where a rebuild would."""
+        print("\n" + "="*80)
+        print("TEST: record_interaction on cached profiles")
+        print("="*80)
+
+        db = self._session()
+        db.add_all([_event("E1", "Music", "LOW"), _event("E2", "Sports", "HIGH")])
+        db.commit()
+        self._interact(db, 1, "E1")
+
+        profile = get_user_profile(db, 1)
+        liked    = self._interact(db, 1, "E1")
+        disliked = self._interact(db, 1, "E2", "NOT_INTERESTED")
+        gone     = self._interact(db, 1, "DELETED")
+        for interaction in (liked, disliked, gone):
+            record_interaction(db, interaction)
+
+        # Replays and interactions already folded in are skipped
+        record_interaction(db, disliked)
+        record_interaction(db, liked)
+
+        print(f"Cached: {profile.summary()}")
+        assert get_user_profile(db, 1) is profile
+        assert profile.interest_count == 3 and profile.dislike_count == 1
+        assert all(profile.has_folded(interaction.id) for interaction in (liked, disliked, gone))
+
+        rebuilt = UserPreferenceProfile(db, 1, rebuild=True)
+        assert profile.genre_bias.keys() == rebuilt.genre_bias.keys()
+        for genre, bias in rebuilt.genre_bias.items():
+            assert abs(profile.genre_bias[genre] - bias) < 1e-9, f"{genre} bias drifted from a rebuild"
+        assert abs(profile.crowd_bias - rebuilt.crowd_bias) < 1e-9
+        assert (profile.interest_count, profile.dislike_count) == (rebuilt.interest_count, rebuilt.dislike_count)
+
+        # Users without a cached profile are left for their next load
+        record_interaction(db, self._interact(db, 2, "E1"))
+        assert profile_cache.get(2) is None
+        assert get_user_profile(db, 2).interest_count == 1
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_out_of_order_ids(self):
+        """A lower id committed after a higher one is still counted, cached and materialized."""
+        print("\n" + "="*80)
+        print("TEST: Interaction ids committed out of order")
+        print("="*80)
+
+        db = self._session()
+        db.add_all([_event("E1", "Music", "LOW"), _event("E2", "Sports", "HIGH")])
+        db.commit()
+        self._interact(db, 1, "E1", id=1)
+        self._interact(db, 1, "E1", id=3)
+
+        cached = get_user_profile(db, 1)
+        assert cached.interest_count == 2
+
+        # Id 2 was handed out before 3 but its transaction commits last
+        late = self._interact(db, 1, "E2", "NOT_INTERESTED", id=2)
+        record_interaction(db, late)
+        record_interaction(db, late)
+        loaded = UserPreferenceProfile(db, 1)
+        print(f"Cached: {cached.summary()}")
+        print(f"Loaded: {loaded.summary()}")
+
+        rebuilt = UserPreferenceProfile(db, 1, rebuild=True)
+        for profile in (cached, loaded):
+            assert (profile.interest_count, profile.dislike_count) == (2, 1), "Late id was skipped"
+            assert abs(profile.genre_bias["Sports"] - rebuilt.genre_bias["Sports"]) < 1e-9
+            assert abs(profile.crowd_bias - rebuilt.crowd_bias) < 1e-9
+        assert loaded.recent_interaction_ids == {1, 2, 3}, "Unsettled ids stay above the watermark"
+
+        # Once settled, the watermark moves past them and the row stops tracking ids
+        old = datetime.now(timezone.utc) - timedelta(hours=1)
+        db.query(EventInteraction).update({EventInteraction.timestamp: old}, synchronize_session=False)
+        db.commit()
+        settled = UserPreferenceProfile(db, 1)
+        row = db.query(UserProfile).filter_by(user_id=1).one()
+        print(f"Settled row: last_interaction_id={row.last_interaction_id}, recent={row.recent_interaction_ids}")
+        assert (settled.interest_count, settled.dislike_count) == (2, 1), "Settling must not re-count"
+        assert (row.last_interaction_id, row.recent_interaction_ids) == (3, [])
+        assert row.interest_count == 2 and row.dislike_count == 1
+        db.close()
+        print("✓ PASSED\n")
+
+    def test_rebuild_after_reclassify(self):
+        """Profiles counted under a null genre pick up the new genre on rebuild."""
+        print("\n" + "="*80)
+        print("TEST: Rebuild profiles for reclassified events")
+        print("="*80)
+
+        db = self._session()
+        db.add_all([_event("E1", None), _event("E2", "Music")])
+        db.commit()
+        self._interact(db, 1, "E1")
+        self._interact(db, 2, "E2")
+
+        assert not UserPreferenceProfile(db, 1).genre_bias
+        UserPreferenceProfile(db, 2)
+
+        db.get(Event, "E1").genre = "Comedy"
+        db.commit()
+        assert not UserPreferenceProfile(db, 1).genre_bias, "Stored row is stale until rebuilt"
+
+        rebuilt = rebuild_profiles_for_events(db, ["E1"])
+        profile = UserPreferenceProfile(db, 1)
+        print(f"Rebuilt: {rebuilt} | user 1 genre_bias: {dict(profile.genre_bias)}")
+        assert rebuilt == 1, "Only user 1 interacted with E1"
+        assert round(profile.genre_bias["Comedy"], 2) == 0.1
+        db.close()
+        print("✓ PASSED\n")
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("\n" + "="*80)
+    print("USER PROFILE TESTS")
+    print("="*80)
+
+    test_suite = TestUserProfile()
+
+    try:
+        test_suite.test_materialized_row()
+        test_suite.test_load_does_not_commit_caller()
+        test_suite.test_profile_cache()
+        test_suite.test_record_interaction()
+        test_suite.test_out_of_order_ids()
+        test_suite.test_rebuild_after_reclassify()
+
+        print("="*80)
+        print("ALL TESTS PASSED ✓")
+        print("="*80)
+
+    except AssertionError as e:
+        print(f"\n✗ TEST FAILED: {e}")
+        print("="*80)
+        return False
+
+    return True
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)